@@ -1,8 +1,11 @@
-import fdk
 import json
 import sys
 import os
 
+# Keep module scope to the standard library: the `basic` and `auth` test types
+# must answer without loading LangChain, PIL or the OCI SDK, and every other
+# path imports only what it uses (see development/tests/test_cold_start.py).
+
 # Ensure src/ modules are importable when running in OCI Functions
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 SRC_PATH = os.path.join(CURRENT_DIR, "src")
@@ -118,8 +121,9 @@ def handler(ctx, data=None):
                 })
         
         elif test_type == "extract":
+            # Storage access and EXIF parsing only; the LangChain tool wrappers are not needed
             from oci_delivery_agent.handlers import load_config
-            from oci_delivery_agent.tools import ObjectRetrievalTool, ExifExtractionTool
+            from oci_delivery_agent.tools import ObjectStorageClient, extract_exif
 
             object_name = (
                 request.get("object_name")
@@ -133,11 +137,8 @@ def handler(ctx, data=None):
                 })
 
             config = load_config()
-            retrieval_tool = ObjectRetrievalTool(config)
-            retrieval_result = json.loads(retrieval_tool._run(object_name))
-
-            exif_tool = ExifExtractionTool()
-            exif_data = json.loads(exif_tool._run(retrieval_result["payload"]))
+            image = ObjectStorageClient(config).get_object(object_name)
+            exif_data = json.loads(json.dumps(extract_exif(image["data"]), default=str))
 
             gps_info = exif_data.get("GPSInfo", {})
 
@@ -145,7 +146,7 @@ def handler(ctx, data=None):
                 "status": "success",
                 "test_type": "extract",
                 "object_name": object_name,
-                "metadata": retrieval_result["metadata"],
+                "metadata": image["metadata"],
                 "gps": gps_info,
                 "exif": exif_data,
             })
@@ -187,4 +188,6 @@ def handler(ctx, data=None):
         })
 
 if __name__ == "__main__":
+    import fdk
+
     fdk.handle(handler)
@@ -0,0 +1,152 @@
+"""In-process image handles shared by reference between workflow stages.
+
+A delivery photo is downloaded once into an :class:`ImageArtifact`. Stages
+receive the handle itself; derived forms such as the SHA-256 digest and the
+base64 data URL sent to GenAI are computed lazily, at most once, and shared.
+LangChain tools only accept strings, so :class:`ArtifactRegistry` maps short
+``artifact:<id>`` references back to live handles for that adapter path.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+
+ARTIFACT_REF_PREFIX = "artifact:"
+DEFAULT_REGISTRY_MAX_BYTES = 64 * 1024 * 1024
+
+
+def prepare_for_inference(data: bytes, max_long_edge: int, jpeg_quality: int) -> Tuple[bytes, int, int]:
+    """Downscale ``data`` for GenAI; PIL loads here, not with the package."""
+    from .imaging import prepare_for_inference as prepare
+
+    return prepare(data, max_long_edge, jpeg_quality)
+
+
+class ImageArtifact:
+    """Image bytes stored once plus lazily derived, cached representations."""
+
+    def __init__(
+        self,
+        data: Union[bytes, bytearray, memoryview],
+        metadata: Optional[Dict[str, Any]] = None,
+        content_type: str = "image/jpeg",
+        digest: Optional[str] = None,
+    ):
+        self._data = data
+        self.metadata: Dict[str, Any] = metadata or {}
+        self.content_type = content_type
+        self._digest = digest
+        self._data_url: Optional[str] = None
+        self._prepared: Dict[Tuple[int, int], "ImageArtifact"] = {}
+        self._lock = threading.Lock()
+        self._prepare_lock = threading.Lock()
+
+    @property
+    def data(self) -> Union[bytes, bytearray, memoryview]:
+        return self._data
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    @property
+    def digest(self) -> str:
+        """Hex SHA-256 of the image bytes."""
+        if self._digest is None:
+            with self._lock:
+                if self._digest is None:
+                    self._digest = hashlib.sha256(self._data).hexdigest()
+        return self._digest
+
+    def data_url(self) -> str:
+        """Return the ``data:`` URL used for inline GenAI image content."""
+        if self._data_url is None:
+            with self._lock:
+                if self._data_url is None:
+                    encoded = base64.b64encode(self._data).decode("ascii")
+                    self._data_url = f"data:{self.content_type};base64,{encoded}"
+        return self._data_url
+
+    def prepared(self, max_long_edge: int, jpeg_quality: int) -> "ImageArtifact":
+        """Return the downscaled JPEG variant sent to GenAI, built at most once.
+
+        A ``max_long_edge`` of 0 disables preparation and returns ``self``.
+        """
+        if max_long_edge <= 0:
+            return self
+        key = (max_long_edge, jpeg_quality)
+        with self._prepare_lock:
+            variant = self._prepared.get(key)
+            if variant is None:
+                data, width, height = prepare_for_inference(self._data, max_long_edge, jpeg_quality)
+                variant = ImageArtifact(
+                    data,
+                    metadata={**self.metadata, "prepared_width": width, "prepared_height": height},
+                    content_type="image/jpeg",
+                )
+                self._prepared[key] = variant
+            return variant
+
+
+class ArtifactRegistry:
+    """Thread-safe map of string references to live artifacts.
+
+    Entries are evicted least-recently-used once the registered bytes exceed
+    ``max_bytes`` so abandoned references cannot grow memory without bound.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_REGISTRY_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, ImageArtifact]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def register(self, artifact: ImageArtifact) -> str:
+        ref = f"{ARTIFACT_REF_PREFIX}{uuid.uuid4().hex}"
+        with self._lock:
+            self._entries[ref] = artifact
+            self._bytes += artifact.size
+            while self._bytes > self._max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+        return ref
+
+    def get(self, ref: str) -> ImageArtifact:
+        with self._lock:
+            artifact = self._entries.get(ref)
+            if artifact is None:
+                raise KeyError(f"Unknown or expired image artifact reference: {ref}")
+            self._entries.move_to_end(ref)
+            return artifact
+
+    def release(self, ref: str) -> None:
+        with self._lock:
+            artifact = self._entries.pop(ref, None)
+            if artifact is not None:
+                self._bytes -= artifact.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+default_registry = ArtifactRegistry()
+
+
+def resolve_image(
+    payload: Union[str, bytes, bytearray, memoryview, ImageArtifact],
+    registry: Optional[ArtifactRegistry] = None,
+) -> ImageArtifact:
+    """Return an artifact for a handle, raw bytes, a reference or legacy base64."""
+    if isinstance(payload, ImageArtifact):
+        return payload
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        return ImageArtifact(payload)
+    if payload.startswith(ARTIFACT_REF_PREFIX):
+        return (registry or default_registry).get(payload)
+    # Legacy adapter: callers that still hand over base64-encoded payloads
+    return ImageArtifact(base64.b64decode(payload))
@@ -0,0 +1,126 @@
+"""Rules-based OK/Review verdicts that stand in for the LLM review.
+
+:func:`assess` produces the same ``assessment`` shape as the review chain
+(``status``, ``issues``, ``insights``) from the quality metrics, the damage
+report and the scene caption, using the thresholds in
+:class:`~oci_delivery_agent.config.ReviewConfig`. Clear-cut deliveries,
+which are most of them, skip both text LLM calls; deliveries it cannot
+decide are marked ``borderline`` so the pipeline can escalate them.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .config import SEVERITY_LEVELS, ReviewConfig
+
+
+@dataclass(frozen=True)
+class RuleAssessment:
+    """Outcome of the rules; ``borderline`` ones need an LLM review."""
+
+    status: str
+    issues: Tuple[str, ...]
+    insights: str
+    borderline: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "issues": list(self.issues), "insights": self.insights}
+
+
+def _severity(damage_report: Mapping[str, Any]) -> Optional[str]:
+    overall = damage_report.get("overall")
+    severity = overall.get("severity") if isinstance(overall, dict) else None
+    severity = str(severity).lower() if severity is not None else None
+    return severity if severity in SEVERITY_LEVELS else None
+
+
+def assess(
+    quality_metrics: Mapping[str, Any],
+    damage_report: Mapping[str, Any],
+    caption: Optional[Mapping[str, Any]],
+    config: ReviewConfig,
+) -> RuleAssessment:
+    """Decide OK or Review from the scores alone, or flag the delivery as borderline."""
+    issues: List[str] = []
+    doubts: List[str] = []
+    quality_index = float(quality_metrics.get("quality_index", 0.0))
+
+    severity = _severity(damage_report)
+    if "error" in damage_report or severity is None:
+        doubts.append("Damage assessment unavailable")
+    else:
+        rank = SEVERITY_LEVELS.index(severity)
+        rationale = (damage_report.get("overall") or {}).get("rationale")
+        if rank >= SEVERITY_LEVELS.index(config.flag_min_damage_severity):
+            issues.append(f"Package damage: {severity}" + (f" ({rationale})" if rationale else ""))
+        elif rank > SEVERITY_LEVELS.index(config.ok_max_damage_severity):
+            doubts.append(f"Possible {severity} package damage")
+
+    if not isinstance(caption, Mapping) or "error" in caption or "unstructured" in caption:
+        doubts.append("Scene analysis unavailable")
+    elif caption.get("packageVisible") is False:
+        issues.append("No package visible in delivery photo")
+
+    location_accuracy = float(quality_metrics.get("location_accuracy", 0.0))
+    if location_accuracy < config.min_location_accuracy:
+        issues.append(f"Photo location far from delivery address (accuracy {location_accuracy:.2f})")
+    timeliness = float(quality_metrics.get("timeliness", 0.0))
+    if timeliness < config.min_timeliness:
+        issues.append(f"Late delivery (timeliness {timeliness:.2f})")
+    if quality_index <= config.flag_max_quality_index:
+        issues.append(f"Quality index {quality_index:.3f} at or below {config.flag_max_quality_index}")
+
+    if issues:
+        return RuleAssessment(
+            status="Review",
+            issues=tuple(issues + doubts),
+            insights=f"Rules review: {len(issues)} failed check(s), quality index {quality_index:.3f}.",
+            borderline=False,
+        )
+    if doubts or quality_index < config.ok_min_quality_index:
+        if quality_index < config.ok_min_quality_index:
+            doubts.append(f"Quality index {quality_index:.3f} below {config.ok_min_quality_index}")
+        return RuleAssessment(
+            status="Review",
+            issues=tuple(doubts),
+            insights="Rules review: borderline delivery, not clearly OK.",
+            borderline=True,
+        )
+    return RuleAssessment(
+        status="OK",
+        issues=(),
+        insights=f"Rules review: all checks passed, quality index {quality_index:.3f}.",
+        borderline=False,
+    )
+
+
+def degraded_assessment(quality_metrics: Mapping[str, Any], config: ReviewConfig) -> Dict[str, Any]:
+    """Verdict for a delivery scored without GenAI.
+
+    Location and timeliness failures still mean Review; otherwise the status
+    is ``Pending`` until the photo is re-assessed, never OK.
+    """
+    issues: List[str] = []
+    location_accuracy = float(quality_metrics.get("location_accuracy", 0.0))
+    if location_accuracy < config.min_location_accuracy:
+        issues.append(f"Photo location far from delivery address (accuracy {location_accuracy:.2f})")
+    timeliness = float(quality_metrics.get("timeliness", 0.0))
+    if timeliness < config.min_timeliness:
+        issues.append(f"Late delivery (timeliness {timeliness:.2f})")
+    return {
+        "status": "Review" if issues else "Pending",
+        "issues": issues + ["Photo not assessed: GenAI unavailable"],
+        "insights": "Degraded result from EXIF location and timeliness only.",
+    }
+
+
+def caption_summary(caption: Optional[Mapping[str, Any]]) -> str:
+    """Summary text taken from the structured caption instead of the summary chain."""
+    if not isinstance(caption, Mapping):
+        return ""
+    if caption.get("overallDescription"):
+        return str(caption["overallDescription"])
+    if caption.get("unstructured"):
+        return str(caption["unstructured"])
+    return str(caption.get("packageDescription") or "")
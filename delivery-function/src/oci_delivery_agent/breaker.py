@@ -0,0 +1,126 @@
+"""Per-endpoint circuit breaker for GenAI calls.
+
+When the GenAI endpoint is failing or stalled, every delivery otherwise
+waits out its own retries and timeout before scoring with an empty damage
+report. :class:`CircuitBreaker` watches call outcomes per endpoint and, once
+failures or slow calls dominate a recent window, opens: calls are refused
+immediately and the pipeline scores deliveries without GenAI (see
+:func:`~oci_delivery_agent.chains.run_quality_pipeline`). After a cool-down a
+few probe calls are let through to decide whether to close again.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import astuple
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from .config import CircuitBreakerConfig
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker driven by error rate and latency."""
+
+    def __init__(self, config: CircuitBreakerConfig, clock: Callable[[], float] = time.monotonic):
+        self._config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()
+        self.trips = 0
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self._config.open_seconds:
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def admits(self) -> bool:
+        """Whether calls may currently be attempted (probes included); no side effects."""
+        return self.state != OPEN
+
+    def allow(self) -> bool:
+        """Claim permission for one call; in half-open state only the probes get it."""
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self._config.half_open_probes:
+                self._state = HALF_OPEN
+                self._probes += 1
+                return True
+            return False
+
+    def record(self, success: bool, seconds: float) -> None:
+        """Report how a permitted call ended and how long it took."""
+        config = self._config
+        slow = seconds >= config.slow_call_seconds
+        with self._lock:
+            now = self._clock()
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if success and not slow:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip(now)
+                return
+            if self._state == OPEN:
+                return  # A call that started before the breaker opened
+            self._outcomes.append((now, success, slow))
+            while self._outcomes and now - self._outcomes[0][0] > config.window_seconds:
+                self._outcomes.popleft()
+            calls = len(self._outcomes)
+            if calls < config.min_calls:
+                return
+            failures = sum(1 for _, ok, _ in self._outcomes if not ok)
+            slow_calls = sum(1 for _, _, was_slow in self._outcomes if was_slow)
+            if failures >= config.failure_rate * calls or slow_calls >= config.slow_call_rate * calls:
+                self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+        self._outcomes.clear()
+        self.trips += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(self._clock()),
+                "window_calls": len(self._outcomes),
+                "trips": self.trips,
+            }
+
+
+_breakers: Dict[Tuple[Any, ...], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(config: CircuitBreakerConfig, endpoint: str) -> Optional[CircuitBreaker]:
+    """Return the process-wide breaker for ``endpoint``, or ``None`` when disabled.
+
+    Every kind of request to one endpoint (vision and text) shares a breaker,
+    since they share its capacity.
+    """
+    if not config.enabled:
+        return None
+    key = (endpoint,) + astuple(config)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(config)
+            _breakers[key] = breaker
+        return breaker
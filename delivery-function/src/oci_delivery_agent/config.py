@@ -1,7 +1,9 @@
 """Configuration models for the OCI delivery agent workflow."""
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
 from typing import Dict, Optional
 
 
@@ -12,6 +14,34 @@ class ObjectStorageConfig:
     namespace: str
     bucket_name: str
     delivery_prefix: str = ""
+    # Leading bytes fetched first when reading only the EXIF segment
+    exif_probe_bytes: int = 32 * 1024
+    # Downloads are streamed in chunks and rejected once they exceed this size
+    max_object_bytes: int = 64 * 1024 * 1024
+    read_chunk_bytes: int = 1024 * 1024
+    chunk_timeout_seconds: float = 30.0
+    hash_while_streaming: bool = True
+
+    def __post_init__(self):
+        if self.exif_probe_bytes < 1024:
+            raise ValueError("exif_probe_bytes must be at least 1024.")
+        if self.max_object_bytes < 1 or self.read_chunk_bytes < 1:
+            raise ValueError("max_object_bytes and read_chunk_bytes must be positive.")
+        if self.chunk_timeout_seconds <= 0:
+            raise ValueError("chunk_timeout_seconds must be positive.")
+
+
+@dataclass
+class GenAIConfig:
+    """OCI Generative AI endpoint used for the vision and text calls.
+
+    ``model_ocid`` also names the endpoint's circuit breaker and adaptive
+    concurrency limit.
+    """
+
+    model_ocid: str = ""
+    compartment_id: str = ""
+    hostname: str = ""
 
 
 @dataclass
@@ -22,17 +52,27 @@ class VisionConfig:
     image_caption_model_endpoint: str
     damage_detection_model_endpoint: Optional[str] = None
     confidence_threshold: float = 0.5
+    # Photos are fit within this many pixels before GenAI calls (0 sends originals)
+    max_image_long_edge: int = 1568
+    jpeg_quality: int = 85
 
+    def __post_init__(self):
+        if self.max_image_long_edge < 0:
+            raise ValueError("max_image_long_edge must be 0 (disabled) or positive.")
+        if not 1 <= self.jpeg_quality <= 95:
+            raise ValueError("jpeg_quality must be between 1 and 95.")
 
-@dataclass
+
+@dataclass(frozen=True)
 class GeolocationConfig:
     """Parameters for validating delivery coordinates."""
 
     max_distance_meters: float = 50.0
     geocoding_api_endpoint: Optional[str] = None
+    stops_path: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True)
 class DamageTypeWeights:
     """Weights for different damage types in MVP scoring."""
     
@@ -54,7 +94,7 @@ class DamageTypeWeights:
         }
 
 
-@dataclass
+@dataclass(frozen=True)
 class SeverityScores:
     """Configurable severity score mapping."""
     
@@ -64,7 +104,7 @@ class SeverityScores:
     severe: float = 0.9
 
 
-@dataclass
+@dataclass(frozen=True)
 class DamageScoringConfig:
     """Configuration for damage severity scoring thresholds."""
 
@@ -89,7 +129,7 @@ class DamageScoringConfig:
             )
 
 
-@dataclass
+@dataclass(frozen=True)
 class QualityIndexWeights:
     """Weights applied when computing the delivery quality index."""
 
@@ -108,15 +148,346 @@ class QualityIndexWeights:
         }
 
 
+@dataclass
+class PipelineConfig:
+    """Stage scheduling options for the quality pipeline.
+
+    ``damage_mode`` controls how damage detection relates to captioning:
+    ``sequential`` waits for the caption and passes it as context,
+    ``independent`` runs damage detection concurrently without caption context,
+    ``speculative`` starts it concurrently and cancels it when the caption
+    reports that no package is visible, and ``combined`` asks for the caption
+    and the damage report in a single request that uploads the image once.
+    """
+
+    max_workers: int = 4
+    damage_mode: str = "sequential"
+
+    def __post_init__(self):
+        if self.max_workers < 1:
+            raise ValueError("Pipeline max_workers must be at least 1.")
+        if self.damage_mode not in {"sequential", "independent", "speculative", "combined"}:
+            raise ValueError(
+                "Pipeline damage_mode must be one of: sequential, independent, speculative, combined"
+            )
+
+
+SEVERITY_LEVELS = ("none", "minor", "moderate", "severe")
+
+
+@dataclass
+class ReviewConfig:
+    """How the OK/Review verdict for a delivery is reached.
+
+    ``mode`` ``llm`` asks the LLM to summarize and review every delivery.
+    ``hybrid`` applies the rule thresholds below first and only calls the LLM
+    for borderline deliveries, and ``rules`` never calls it (borderline
+    deliveries are marked Review). A delivery is clearly OK when its quality
+    index is at least ``ok_min_quality_index``, damage is no worse than
+    ``ok_max_damage_severity`` and both models returned structured output. It
+    is clearly Review when any check fails outright: damage at or above
+    ``flag_min_damage_severity``, no package visible, location accuracy or
+    timeliness below their minimums, or a quality index at or below
+    ``flag_max_quality_index``.
+    """
+
+    mode: str = "llm"
+    ok_min_quality_index: float = 0.85
+    flag_max_quality_index: float = 0.5
+    min_location_accuracy: float = 0.5
+    min_timeliness: float = 0.75
+    ok_max_damage_severity: str = "none"
+    flag_min_damage_severity: str = "moderate"
+
+    def __post_init__(self):
+        if self.mode not in {"llm", "hybrid", "rules"}:
+            raise ValueError("Review mode must be one of: llm, hybrid, rules")
+        if not 0.0 <= self.flag_max_quality_index < self.ok_min_quality_index <= 1.0:
+            raise ValueError(
+                "Review thresholds must satisfy 0 <= flag_max_quality_index < ok_min_quality_index <= 1."
+            )
+        for name in ("ok_max_damage_severity", "flag_min_damage_severity"):
+            if getattr(self, name) not in SEVERITY_LEVELS:
+                raise ValueError(f"Review {name} must be one of: {', '.join(SEVERITY_LEVELS)}")
+        if SEVERITY_LEVELS.index(self.ok_max_damage_severity) >= SEVERITY_LEVELS.index(
+            self.flag_min_damage_severity
+        ):
+            raise ValueError("Review ok_max_damage_severity must be below flag_min_damage_severity.")
+
+
+@dataclass
+class ConcurrencyConfig:
+    """Per-service limits on blocking calls in flight for async pipelines.
+
+    The OCI SDK is synchronous, so each admitted call occupies a worker thread
+    while it waits; these limits bound that thread count regardless of how
+    many deliveries an event loop is driving.
+    """
+
+    object_storage: int = 16
+    genai: int = 8
+    compute: int = 4
+
+    def __post_init__(self):
+        for service in ("object_storage", "genai", "compute"):
+            if getattr(self, service) < 1:
+                raise ValueError(f"Concurrency limit for {service} must be at least 1.")
+
+    def limits(self) -> Dict[str, int]:
+        return {
+            "object_storage": self.object_storage,
+            "genai": self.genai,
+            "compute": self.compute,
+        }
+
+
+@dataclass
+class AdaptiveConcurrencyConfig:
+    """AIMD limit on GenAI requests in flight per endpoint, across all threads.
+
+    Dedicated endpoints have fixed capacity. Starting from ``initial_limit``,
+    the limit grows by one per round of requests while they keep it full and
+    their latency stays within ``latency_tolerance`` times its running
+    baseline, and is multiplied by ``backoff_ratio`` when a request is
+    throttled (429) or slower than that, staying within
+    ``[min_limit, max_limit]``.
+    """
+
+    enabled: bool = True
+    initial_limit: int = 4
+    min_limit: int = 1
+    max_limit: int = 64
+    latency_tolerance: float = 2.0
+    backoff_ratio: float = 0.5
+
+    def __post_init__(self):
+        if not 1 <= self.min_limit <= self.initial_limit <= self.max_limit:
+            raise ValueError("Adaptive concurrency limits must satisfy 1 <= min <= initial <= max.")
+        if self.latency_tolerance <= 1:
+            raise ValueError("Adaptive concurrency latency_tolerance must be greater than 1.")
+        if not 0 < self.backoff_ratio < 1:
+            raise ValueError("Adaptive concurrency backoff_ratio must be in (0, 1).")
+
+
+@dataclass
+class CallPolicyConfig:
+    """Retries, deadlines and hedging for GenAI chat calls.
+
+    Calls failing with throttling (429), server (5xx) or timeout errors are
+    retried up to ``max_attempts`` times after a jittered exponential backoff
+    (``backoff_base_seconds`` doubling up to ``backoff_max_seconds``), but
+    never past the delivery's deadline: ``deadline_seconds`` per delivery (0
+    for none) and, inside an OCI Function, the invocation deadline less
+    ``deadline_reserve_seconds``. A retry is only started with at least
+    ``min_attempt_seconds`` left. With ``hedge`` set, a duplicate request is
+    sent once a call outlasts the endpoint's observed ``hedge_percentile``
+    latency (after ``hedge_min_samples`` timed calls); the first answer wins.
+    """
+
+    max_attempts: int = 3
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    deadline_seconds: float = 0.0
+    deadline_reserve_seconds: float = 5.0
+    min_attempt_seconds: float = 1.0
+    hedge: bool = False
+    hedge_percentile: float = 0.95
+    hedge_min_samples: int = 20
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("Call policy max_attempts must be at least 1.")
+        if self.backoff_base_seconds < 0 or self.backoff_max_seconds < self.backoff_base_seconds:
+            raise ValueError("Call policy backoff must satisfy 0 <= base <= max.")
+        for name in ("deadline_seconds", "deadline_reserve_seconds", "min_attempt_seconds"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"Call policy {name} cannot be negative.")
+        if not 0.5 <= self.hedge_percentile < 1:
+            raise ValueError("Call policy hedge_percentile must be in [0.5, 1).")
+        if self.hedge_min_samples < 1:
+            raise ValueError("Call policy hedge_min_samples must be at least 1.")
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Per-endpoint circuit breaker for GenAI calls.
+
+    Once ``min_calls`` calls have finished within the last ``window_seconds``,
+    the breaker opens when the share that failed (throttling, 5xx, timeouts,
+    deadline overruns) reaches ``failure_rate`` or the share slower than
+    ``slow_call_seconds`` reaches ``slow_call_rate``. While it is open,
+    deliveries skip GenAI and get a degraded result scored from EXIF location
+    and timeliness only. After ``open_seconds`` up to ``half_open_probes``
+    calls are let through; the breaker closes if they succeed and reopens if
+    one fails.
+
+    Degraded deliveries are queued for re-inference: ``requeue`` is
+    ``"none"``, ``"file"`` (batch manifest rows appended to ``requeue_path``)
+    or ``"object_storage"`` (one manifest row per delivery under
+    ``requeue_prefix`` in the workflow bucket). The function deployment
+    defaults to ``"object_storage"``.
+    """
+
+    enabled: bool = True
+    window_seconds: float = 60.0
+    min_calls: int = 10
+    failure_rate: float = 0.5
+    slow_call_seconds: float = 60.0
+    slow_call_rate: float = 0.8
+    open_seconds: float = 30.0
+    half_open_probes: int = 1
+    requeue: str = "file"
+    requeue_path: str = "/tmp/reinference_queue.jsonl"
+    requeue_prefix: str = "reinference/"
+
+    def __post_init__(self):
+        if self.window_seconds <= 0 or self.open_seconds <= 0 or self.slow_call_seconds <= 0:
+            raise ValueError("Circuit breaker window, open and slow call seconds must be positive.")
+        if self.min_calls < 1 or self.half_open_probes < 1:
+            raise ValueError("Circuit breaker min_calls and half_open_probes must be at least 1.")
+        for name in ("failure_rate", "slow_call_rate"):
+            if not 0 < getattr(self, name) <= 1:
+                raise ValueError(f"Circuit breaker {name} must be in (0, 1].")
+        if self.requeue not in {"none", "file", "object_storage"}:
+            raise ValueError("Circuit breaker requeue must be one of: none, file, object_storage")
+
+
+@dataclass
+class CacheConfig:
+    """Result cache for GenAI caption and damage calls.
+
+    ``disk_path`` enables a persistent SQLite tier; entries older than
+    ``ttl_seconds`` are ignored (0 disables expiry).
+    """
+
+    enabled: bool = True
+    memory_max_bytes: int = 8 * 1024 * 1024
+    disk_path: Optional[str] = None
+    ttl_seconds: float = 7 * 24 * 3600.0
+
+
+@dataclass
+class EventStoreConfig:
+    """Buffered persistence of workflow outputs as quality events.
+
+    ``backend`` is ``"none"`` (discard), ``"sqlite"`` (local stand-in at
+    ``sqlite_path``) or ``"adw"`` (Autonomous Data Warehouse via
+    ``python-oracledb``). Events are flushed once ``batch_size`` rows are
+    buffered or ``flush_interval_seconds`` after the first buffered row;
+    producers block for up to ``enqueue_timeout_seconds`` while ``max_queue``
+    rows are waiting.
+    """
+
+    backend: str = "none"
+    sqlite_path: str = "quality_events.db"
+    adw_dsn: Optional[str] = None
+    adw_user: Optional[str] = None
+    adw_password: Optional[str] = None
+    adw_wallet_dir: Optional[str] = None
+    batch_size: int = 200
+    flush_interval_seconds: float = 1.0
+    max_queue: int = 10000
+    enqueue_timeout_seconds: float = 5.0
+
+    def __post_init__(self):
+        if self.backend not in {"none", "sqlite", "adw"}:
+            raise ValueError("Event store backend must be one of: none, sqlite, adw")
+        if self.backend == "adw" and not self.adw_dsn:
+            raise ValueError("Event store backend 'adw' requires adw_dsn.")
+        if self.batch_size < 1:
+            raise ValueError("Event store batch_size must be at least 1.")
+        if self.flush_interval_seconds <= 0:
+            raise ValueError("Event store flush_interval_seconds must be positive.")
+        if self.max_queue < self.batch_size:
+            raise ValueError("Event store max_queue must be at least batch_size.")
+        if self.enqueue_timeout_seconds < 0:
+            raise ValueError("Event store enqueue_timeout_seconds cannot be negative.")
+
+
+@dataclass
+class AlertConfig:
+    """Coalescing dispatch of Review alerts.
+
+    ``sink`` is ``"ons"`` (OCI Notifications, publishing to the workflow's
+    ``notification_topic_id``), ``"file"`` (JSON lines at ``file_path``),
+    ``"http"`` (JSON POSTed to ``http_url``) or ``"none"``. Repeat alerts for
+    the same delivery or driver within ``dedupe_window_seconds`` are counted
+    instead of sent, and alerts are grouped into one digest per topic every
+    ``digest_interval_seconds`` or once ``max_digest_alerts`` are waiting.
+    """
+
+    sink: str = "ons"
+    file_path: str = "alerts.jsonl"
+    http_url: Optional[str] = None
+    dedupe_window_seconds: float = 600.0
+    digest_interval_seconds: float = 60.0
+    max_digest_alerts: int = 50
+    max_queue: int = 1000
+
+    def __post_init__(self):
+        if self.sink not in {"none", "ons", "file", "http"}:
+            raise ValueError("Alert sink must be one of: none, ons, file, http")
+        if self.sink == "http" and not self.http_url:
+            raise ValueError("Alert sink 'http' requires http_url.")
+        if self.dedupe_window_seconds < 0:
+            raise ValueError("Alert dedupe_window_seconds cannot be negative.")
+        if self.digest_interval_seconds <= 0:
+            raise ValueError("Alert digest_interval_seconds must be positive.")
+        if self.max_digest_alerts < 1:
+            raise ValueError("Alert max_digest_alerts must be at least 1.")
+        if self.max_queue < 1:
+            raise ValueError("Alert max_queue must be at least 1.")
+
+
 @dataclass
 class WorkflowConfig:
     """Top level settings required by the agent workflow."""
 
     object_storage: ObjectStorageConfig
     vision: VisionConfig
+    genai: GenAIConfig = field(default_factory=GenAIConfig)
     geolocation: GeolocationConfig = field(default_factory=GeolocationConfig)
     quality_weights: QualityIndexWeights = field(default_factory=QualityIndexWeights)
     damage_scoring: DamageScoringConfig = field(default_factory=DamageScoringConfig)
+    pipeline: PipelineConfig = field(default_factory=PipelineConfig)
+    review: ReviewConfig = field(default_factory=ReviewConfig)
+    cache: CacheConfig = field(default_factory=CacheConfig)
+    concurrency: ConcurrencyConfig = field(default_factory=ConcurrencyConfig)
+    adaptive_concurrency: AdaptiveConcurrencyConfig = field(default_factory=AdaptiveConcurrencyConfig)
+    call_policy: CallPolicyConfig = field(default_factory=CallPolicyConfig)
+    circuit_breaker: CircuitBreakerConfig = field(default_factory=CircuitBreakerConfig)
+    events: EventStoreConfig = field(default_factory=EventStoreConfig)
+    alerts: AlertConfig = field(default_factory=AlertConfig)
     notification_topic_id: Optional[str] = None
     database_table: str = "delivery_quality_events"
     local_asset_root: Optional[str] = None
+    # Stream GenAI completions and stop reading once the expected JSON has closed
+    genai_streaming: bool = False
+
+    def __post_init__(self):
+        delivery_prefix = self.object_storage.delivery_prefix
+        breaker = self.circuit_breaker
+        if (breaker.requeue == "object_storage" and delivery_prefix
+                and breaker.requeue_prefix.startswith(delivery_prefix)):
+            # Rows written there would fire the createobject rule and be scored as deliveries
+            raise ValueError("Re-inference queue prefix must be outside the delivery prefix.")
+
+    def scoring_version(self) -> str:
+        """Short hash of every setting the quality metrics are computed from.
+
+        Stored with each score so a result can be traced to the weights that
+        produced it, and stale results found after the weights change. The
+        sections it reads are frozen; change a weight by replacing its section.
+        """
+        scoring = self.damage_scoring
+        material = json.dumps(
+            {
+                "quality_weights": asdict(self.quality_weights),
+                "use_weighted_scoring": scoring.use_weighted_scoring,
+                "type_weights": asdict(scoring.type_weights),
+                "severity_scores": asdict(scoring.severity_scores),
+                "max_distance_meters": self.geolocation.max_distance_meters,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,356 @@
+"""Buffered, batched persistence of workflow outputs as quality events.
+
+Producers hand rows to :class:`QualityEventWriter`, which queues them and
+returns immediately. A background thread groups rows into batches, flushed
+when ``batch_size`` rows are buffered or ``flush_interval_seconds`` after the
+first one arrived, and writes each batch with a single ``executemany``
+round trip. Writes are upserts keyed on ``(object_name, etag)``, so a
+redelivered event or a rerun of the same photo version overwrites its row
+instead of duplicating it. The queue is bounded: when the backend falls
+behind, producers block and finally get :class:`EventBackpressureError`.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .config import EventStoreConfig, WorkflowConfig
+
+logger = logging.getLogger(__name__)
+
+EVENT_COLUMNS = (
+    "object_name",
+    "etag",
+    "status",
+    "quality_index",
+    "timeliness",
+    "location_accuracy",
+    "package_quality",
+    "config_version",
+    "payload",
+    "recorded_at",
+)
+KEY_COLUMNS = ("object_name", "etag")
+
+_TABLE_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_$#]*(\.[A-Za-z_][A-Za-z0-9_$#]*)?$")
+_WRITE_ATTEMPTS = 3
+_FLUSH = object()
+_STOP = object()
+
+
+class EventBackpressureError(TimeoutError):
+    """Raised when the event queue stays full for the whole enqueue timeout."""
+
+
+def _table_name(table: str) -> str:
+    # The table comes from the environment and is interpolated into SQL
+    if not _TABLE_NAME.match(table):
+        raise ValueError(f"Invalid quality event table name: {table!r}")
+    return table
+
+
+def quality_event_row(workflow_output: Mapping[str, Any], object_name: Optional[str] = None) -> Dict[str, Any]:
+    """Flatten one workflow output into an event row.
+
+    ``object_name`` defaults to the name recorded in the output metadata; a
+    missing ETag is stored as ``"-"`` so the key stays usable (Oracle reads
+    an empty string as NULL).
+    """
+    metadata = workflow_output.get("metadata") or {}
+    metrics = workflow_output.get("quality_metrics") or {}
+    assessment = workflow_output.get("assessment") or {}
+    return {
+        "object_name": object_name or metadata.get("object_name") or "",
+        "etag": metadata.get("etag") or "-",
+        "status": assessment.get("status"),
+        "quality_index": metrics.get("quality_index"),
+        "timeliness": metrics.get("timeliness"),
+        "location_accuracy": metrics.get("location_accuracy"),
+        "package_quality": metrics.get("package_quality"),
+        "config_version": metrics.get("config_version"),
+        "payload": json.dumps(workflow_output, default=str),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="microseconds"),
+    }
+
+
+class SQLiteEventBackend:
+    """Local stand-in for the warehouse table."""
+
+    def __init__(self, path: str, table: str):
+        self._table = _table_name(table)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._table} ("
+            " object_name TEXT NOT NULL,"
+            " etag TEXT NOT NULL,"
+            " status TEXT,"
+            " quality_index REAL,"
+            " timeliness REAL,"
+            " location_accuracy REAL,"
+            " package_quality REAL,"
+            " config_version TEXT,"
+            " payload TEXT NOT NULL,"
+            " recorded_at TEXT NOT NULL,"
+            " PRIMARY KEY (object_name, etag))"
+        )
+        updates = ", ".join(f"{column} = excluded.{column}" for column in EVENT_COLUMNS if column not in KEY_COLUMNS)
+        self._upsert = (
+            f"INSERT INTO {self._table} ({', '.join(EVENT_COLUMNS)})"
+            f" VALUES ({', '.join(':' + column for column in EVENT_COLUMNS)})"
+            f" ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}"
+        )
+
+    def upsert(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany(self._upsert, rows)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def read_payloads(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, str]]:
+        """Yield ``(object_name, etag, payload)`` for every stored event."""
+        cursor = self._db.execute(f"SELECT object_name, etag, payload FROM {self._table}")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def merge_statement(table: str) -> str:
+    """Return the Oracle ``MERGE`` used to upsert one event row."""
+    table = _table_name(table)
+    source = ", ".join(
+        "TO_TIMESTAMP_TZ(:recorded_at, 'YYYY-MM-DD\"T\"HH24:MI:SS.FF6TZH:TZM') AS recorded_at"
+        if column == "recorded_at" else f":{column} AS {column}"
+        for column in EVENT_COLUMNS
+    )
+    on = " AND ".join(f"dst.{column} = src.{column}" for column in KEY_COLUMNS)
+    updates = ", ".join(f"dst.{column} = src.{column}" for column in EVENT_COLUMNS if column not in KEY_COLUMNS)
+    return (
+        f"MERGE INTO {table} dst USING (SELECT {source} FROM dual) src ON ({on})"
+        f" WHEN MATCHED THEN UPDATE SET {updates}"
+        f" WHEN NOT MATCHED THEN INSERT ({', '.join(EVENT_COLUMNS)})"
+        f" VALUES ({', '.join('src.' + column for column in EVENT_COLUMNS)})"
+    )
+
+
+class OracleEventBackend:
+    """Autonomous Data Warehouse backend using ``python-oracledb``.
+
+    Expects the table to exist with the columns in :data:`EVENT_COLUMNS`
+    (``payload`` as a CLOB or JSON column, ``recorded_at`` as TIMESTAMP WITH
+    TIME ZONE) and a primary key on ``(object_name, etag)``.
+    """
+
+    def __init__(self, table: str, connect: Callable[[], Any]):
+        self._table = _table_name(table)
+        self._merge = merge_statement(table)
+        self._connect = connect
+        self._connection: Any = None
+
+    def upsert(self, rows: Sequence[Mapping[str, Any]]) -> None:
+        import oracledb
+
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            cursor = self._connection.cursor()
+            cursor.setinputsizes(payload=oracledb.DB_TYPE_CLOB)
+            cursor.executemany(self._merge, list(rows))
+            self._connection.commit()
+        except Exception:
+            # Reconnect on the next batch; a broken session cannot be reused
+            self.close()
+            raise
+
+    def read_payloads(self, batch_size: int = 1000) -> Iterator[Tuple[str, str, str]]:
+        """Yield ``(object_name, etag, payload)`` for every stored event."""
+        if self._connection is None:
+            self._connection = self._connect()
+        cursor = self._connection.cursor()
+        cursor.arraysize = batch_size
+        cursor.execute(f"SELECT object_name, etag, payload FROM {self._table}")
+        for object_name, etag, payload in cursor:
+            yield object_name, etag, payload.read() if hasattr(payload, "read") else payload
+
+    def close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+
+def build_event_backend(config: EventStoreConfig, table: str) -> Optional[Any]:
+    """Return the backend selected by ``config``, or ``None`` when disabled."""
+    if config.backend == "sqlite":
+        return SQLiteEventBackend(config.sqlite_path, table)
+    if config.backend == "adw":
+        def connect() -> Any:
+            import oracledb
+
+            params: Dict[str, Any] = {
+                "user": config.adw_user,
+                "password": config.adw_password,
+                "dsn": config.adw_dsn,
+            }
+            if config.adw_wallet_dir:
+                params.update(config_dir=config.adw_wallet_dir, wallet_location=config.adw_wallet_dir)
+            return oracledb.connect(**params)
+
+        return OracleEventBackend(table, connect)
+    return None
+
+
+class QualityEventWriter:
+    """Queue event rows and write them to ``backend`` in batches."""
+
+    def __init__(
+        self,
+        backend: Any,
+        batch_size: int = 200,
+        flush_interval_seconds: float = 1.0,
+        max_queue: int = 10000,
+        enqueue_timeout_seconds: float = 5.0,
+    ):
+        self._backend = backend
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_seconds
+        self._enqueue_timeout = enqueue_timeout_seconds
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._closed = False
+        self.stats = {"written": 0, "batches": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._run, name="quality-events", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def write(self, row: Mapping[str, Any]) -> None:
+        """Queue ``row``; blocks while the queue is full, up to the enqueue timeout."""
+        if self._closed:
+            raise RuntimeError("Quality event writer is closed.")
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put(dict(row), timeout=self._enqueue_timeout)
+        except queue.Full:
+            self._settle(1)
+            raise EventBackpressureError(
+                f"Quality event queue stayed full for {self._enqueue_timeout}s"
+            ) from None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write buffered rows now; return ``False`` if they are still pending at ``timeout``."""
+        try:
+            self._queue.put_nowait(_FLUSH)
+        except queue.Full:
+            # A full queue is already being written; just wait for it
+            pass
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flush, stop the writer thread and close the backend."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._backend.close()
+
+    def _settle(self, count: int) -> None:
+        with self._idle:
+            self._pending -= count
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _run(self) -> None:
+        batch: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        accepted = 0
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _FLUSH
+            if item is not _FLUSH and item is not _STOP:
+                if not batch:
+                    deadline = time.monotonic() + self._flush_interval
+                # Later rows for the same key replace earlier ones in the batch
+                batch[tuple(item[column] for column in KEY_COLUMNS)] = item
+                accepted += 1
+                if len(batch) < self._batch_size:
+                    continue
+            if batch:
+                self._write_batch(list(batch.values()))
+                self._settle(accepted)
+                batch, accepted = {}, 0
+            if item is _STOP:
+                return
+
+    def _write_batch(self, rows: List[Dict[str, Any]]) -> None:
+        for attempt in range(_WRITE_ATTEMPTS):
+            try:
+                self._backend.upsert(rows)
+                self.stats["written"] += len(rows)
+                self.stats["batches"] += 1
+                return
+            except Exception as error:
+                if attempt + 1 == _WRITE_ATTEMPTS:
+                    self.stats["failed"] += len(rows)
+                    logger.warning("Dropped %d quality events after %d attempts: %s", len(rows), _WRITE_ATTEMPTS, error)
+                    return
+                time.sleep(0.5 * 2 ** attempt)
+
+
+_writers: Dict[Tuple[Any, ...], QualityEventWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_event_writer(config: WorkflowConfig) -> Optional[QualityEventWriter]:
+    """Return the process-wide writer for ``config``, or ``None`` when disabled."""
+    events = config.events
+    if events.backend == "none":
+        return None
+    key = (events.backend, events.sqlite_path, events.adw_dsn, events.adw_user, config.database_table)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer.closed:
+            writer = QualityEventWriter(
+                build_event_backend(events, config.database_table),
+                batch_size=events.batch_size,
+                flush_interval_seconds=events.flush_interval_seconds,
+                max_queue=events.max_queue,
+                enqueue_timeout_seconds=events.enqueue_timeout_seconds,
+            )
+            _writers[key] = writer
+        return writer
+
+
+@atexit.register
+def _close_writers() -> None:
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close(timeout=30)
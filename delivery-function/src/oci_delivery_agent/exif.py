@@ -0,0 +1,188 @@
+"""Fast EXIF reader that parses only the JPEG APP1/TIFF segment.
+
+Delivery checks only need GPS coordinates and capture timestamps, which live
+in the APP1 segment near the start of a JPEG. :func:`read_exif_prefix` pulls
+just enough leading bytes through a ranged reader to cover that segment, and
+:func:`parse_jpeg_exif` decodes the needed tags without touching image data.
+Values are returned in the same shapes PIL's ``_getexif`` produces so both
+paths feed the same normalization.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Any, Callable, Dict, Optional, Tuple
+
+EXIF_PROBE_BYTES = 32 * 1024
+
+_SOI = b"\xff\xd8"
+_EXIF_HEADER = b"Exif\x00\x00"
+_TAG_DATETIME = 0x0132
+_TAG_DATETIME_ORIGINAL = 0x9003
+_TAG_EXIF_IFD = 0x8769
+_TAG_GPS_IFD = 0x8825
+# Markers without a length field
+_STANDALONE_MARKERS = {0x01} | set(range(0xD0, 0xD8))
+# TIFF type -> (struct code, size in bytes)
+_TIFF_TYPES = {
+    1: ("B", 1),
+    2: ("s", 1),
+    3: ("H", 2),
+    4: ("L", 4),
+    5: ("LL", 8),
+    6: ("b", 1),
+    7: ("s", 1),
+    8: ("h", 2),
+    9: ("l", 4),
+    10: ("ll", 8),
+}
+
+
+class NotJpegError(ValueError):
+    """Raised when the bytes do not start with a JPEG SOI marker."""
+
+
+class IncompleteExifHeader(Exception):
+    """Raised when more leading bytes are needed to reach the EXIF segment."""
+
+    def __init__(self, required_bytes: int):
+        super().__init__(f"EXIF segment needs the first {required_bytes} bytes")
+        self.required_bytes = required_bytes
+
+
+def find_exif_segment(data: bytes) -> Optional[bytes]:
+    """Return the TIFF block of the first Exif APP1 segment, or ``None``.
+
+    Raises :class:`IncompleteExifHeader` when ``data`` is a truncated prefix
+    that ends before the segment does.
+    """
+    if not data.startswith(_SOI):
+        if len(data) < 2:
+            raise IncompleteExifHeader(2)
+        raise NotJpegError("Data is not a JPEG image")
+
+    offset = 2
+    while True:
+        if offset + 4 > len(data):
+            raise IncompleteExifHeader(offset + 4)
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:  # fill byte
+            offset += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker in (0xDA, 0xD9):  # start of scan / end of image
+            return None
+        (length,) = struct.unpack(">H", data[offset + 2:offset + 4])
+        end = offset + 2 + length
+        if marker == 0xE1:
+            if end > len(data):
+                # Only the header is needed to know whether this APP1 is EXIF
+                if data[offset + 4:offset + 10] == _EXIF_HEADER[:len(data) - offset - 4]:
+                    raise IncompleteExifHeader(end)
+            elif data[offset + 4:offset + 10] == _EXIF_HEADER:
+                return data[offset + 10:end]
+        offset = end
+
+
+def _read_value(tiff: bytes, endian: str, type_id: int, count: int, value_field: int) -> Any:
+    code, size = _TIFF_TYPES[type_id]
+    if count == 0:
+        return ()
+    total = size * count
+    start = value_field if total <= 4 else struct.unpack(endian + "L", tiff[value_field:value_field + 4])[0]
+    raw = tiff[start:start + total]
+    if len(raw) < total:
+        raise ValueError("EXIF value points outside the segment")
+    if type_id == 2:
+        if raw.endswith(b"\x00"):
+            raw = raw[:-1]
+        return raw.decode("latin-1", "replace")
+    if type_id == 7:
+        return raw
+    if type_id in (5, 10):
+        values = struct.unpack(f"{endian}{count * 2}{code[0]}", raw)
+        rationals = tuple(zip(values[::2], values[1::2]))
+        return rationals[0] if count == 1 else rationals
+    values = struct.unpack(f"{endian}{count}{code}", raw)
+    return values[0] if count == 1 else values
+
+
+def _read_ifd(tiff: bytes, endian: str, offset: int) -> Dict[int, Any]:
+    (entry_count,) = struct.unpack(endian + "H", tiff[offset:offset + 2])
+    entries: Dict[int, Any] = {}
+    for index in range(entry_count):
+        entry = offset + 2 + index * 12
+        tag, type_id, count = struct.unpack(endian + "HHL", tiff[entry:entry + 8])
+        if type_id not in _TIFF_TYPES:
+            continue
+        entries[tag] = _read_value(tiff, endian, type_id, count, entry + 8)
+    return entries
+
+
+def parse_exif_tags(tiff: bytes) -> Tuple[Optional[Dict[int, Any]], Optional[str]]:
+    """Decode the GPS IFD and capture timestamp from a TIFF block.
+
+    The timestamp follows PIL's merged-dictionary order: the first of
+    ``DateTimeOriginal``/``DateTime`` found in IFD0, then the Exif IFD.
+    """
+    if tiff[:4] == b"II*\x00":
+        endian = "<"
+    elif tiff[:4] == b"MM\x00*":
+        endian = ">"
+    else:
+        raise ValueError("Invalid TIFF header in EXIF segment")
+    (ifd0_offset,) = struct.unpack(endian + "L", tiff[4:8])
+
+    merged = _read_ifd(tiff, endian, ifd0_offset)
+    if isinstance(merged.get(_TAG_EXIF_IFD), int):
+        merged.update(_read_ifd(tiff, endian, merged[_TAG_EXIF_IFD]))
+
+    gps = None
+    if isinstance(merged.get(_TAG_GPS_IFD), int):
+        gps = _read_ifd(tiff, endian, merged[_TAG_GPS_IFD])
+
+    timestamp = None
+    for tag, value in merged.items():
+        if tag in (_TAG_DATETIME_ORIGINAL, _TAG_DATETIME):
+            timestamp = value
+            break
+    return gps, timestamp
+
+
+def parse_jpeg_exif(data: bytes) -> Tuple[Optional[Dict[int, Any]], Optional[str]]:
+    """Return ``(gps_ifd, timestamp)`` from JPEG bytes or a long enough prefix."""
+    segment = find_exif_segment(data)
+    if segment is None:
+        return None, None
+    return parse_exif_tags(segment)
+
+
+def read_exif_prefix(
+    read_range: Callable[[int, int], bytes],
+    probe_bytes: int = EXIF_PROBE_BYTES,
+) -> bytes:
+    """Fetch the leading bytes of an object until they cover the EXIF segment.
+
+    ``read_range(start, end)`` returns bytes ``start`` to ``end`` inclusive
+    (fewer when the object is shorter). The first read is ``probe_bytes``;
+    when the segment is longer, later reads append the missing tail, at
+    least ``probe_bytes`` at a time to bound round trips. Objects that are
+    not JPEGs return the first probe as is.
+    """
+    data = read_range(0, probe_bytes - 1)
+    requested = probe_bytes
+    while len(data) >= requested:
+        try:
+            find_exif_segment(data)
+            return data
+        except NotJpegError:
+            return data
+        except IncompleteExifHeader as incomplete:
+            target = max(incomplete.required_bytes, len(data) + probe_bytes)
+            data += read_range(len(data), target - 1)
+            requested = target
+    # Object ended inside the requested range: the prefix is the whole object
+    return data
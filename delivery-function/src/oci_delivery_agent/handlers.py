@@ -2,160 +2,251 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import time
+from contextlib import nullcontext
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping, Optional
 
 # from langchain.llms import OCIModel  # Commented out due to version compatibility
 
-from .chains import DeliveryContext, run_quality_pipeline
+from .breaker import get_circuit_breaker
+from .callpolicy import (
+    GenAIUnavailableError,
+    get_call_policy,
+    invocation_seconds_left,
+    is_unavailable,
+    request_deadline,
+)
+from .clients import get_genai_client
+from .concurrency import get_adaptive_limiter
 from .config import (
+    AdaptiveConcurrencyConfig,
+    AlertConfig,
+    CacheConfig,
+    CallPolicyConfig,
+    CircuitBreakerConfig,
+    ConcurrencyConfig,
     DamageScoringConfig,
     DamageTypeWeights,
+    EventStoreConfig,
+    GenAIConfig,
     GeolocationConfig,
     ObjectStorageConfig,
+    PipelineConfig,
     QualityIndexWeights,
+    ReviewConfig,
     SeverityScores,
     VisionConfig,
     WorkflowConfig,
 )
+from .alerts import get_alert_dispatcher, review_alert
+from .events import get_event_writer, quality_event_row
+from .stops import expected_position, get_stop_index
+
+logger = logging.getLogger(__name__)
+
+# Longest the handler waits for queued output when the invocation has no
+# deadline, and the time left for returning the response when it has one
+_FLUSH_TIMEOUT_SECONDS = 10.0
+_FLUSH_MARGIN_SECONDS = 1.0
 
 
-def load_config() -> WorkflowConfig:
+def load_config(environ: Optional[Mapping[str, str]] = None) -> WorkflowConfig:
+    """Build the workflow config from ``environ`` (default: the process environment)."""
+    env = os.environ if environ is None else environ
     return WorkflowConfig(
         object_storage=ObjectStorageConfig(
-            namespace=os.environ.get("OCI_OS_NAMESPACE", ""),
-            bucket_name=os.environ.get("OCI_OS_BUCKET", ""),
-            delivery_prefix=os.environ.get("DELIVERY_PREFIX", ""),
+            namespace=env.get("OCI_OS_NAMESPACE", ""),
+            bucket_name=env.get("OCI_OS_BUCKET", ""),
+            delivery_prefix=env.get("DELIVERY_PREFIX", ""),
+            exif_probe_bytes=int(env.get("EXIF_PROBE_BYTES", str(32 * 1024))),
+            max_object_bytes=int(float(env.get("OBJECT_MAX_MB", "64")) * 1024 * 1024),
+            read_chunk_bytes=int(env.get("OBJECT_READ_CHUNK_KB", "1024")) * 1024,
+            chunk_timeout_seconds=float(env.get("OBJECT_CHUNK_TIMEOUT_SECONDS", "30")),
+            hash_while_streaming=env.get("OBJECT_HASH_WHILE_STREAMING", "true").lower() == "true",
         ),
         vision=VisionConfig(
-            compartment_id=os.environ.get("OCI_COMPARTMENT_ID", ""),
-            image_caption_model_endpoint=os.environ.get("OCI_CAPTION_ENDPOINT", ""),
-            damage_detection_model_endpoint=os.environ.get("OCI_DAMAGE_ENDPOINT"),
+            compartment_id=env.get("OCI_COMPARTMENT_ID", ""),
+            image_caption_model_endpoint=env.get("OCI_CAPTION_ENDPOINT", ""),
+            damage_detection_model_endpoint=env.get("OCI_DAMAGE_ENDPOINT"),
+            max_image_long_edge=int(env.get("VISION_MAX_IMAGE_LONG_EDGE", "1568")),
+            jpeg_quality=int(env.get("VISION_JPEG_QUALITY", "85")),
+        ),
+        genai=GenAIConfig(
+            model_ocid=env.get("OCI_TEXT_MODEL_OCID", ""),
+            compartment_id=env.get("OCI_COMPARTMENT_ID", ""),
+            hostname=env.get("OCI_GENAI_HOSTNAME", ""),
         ),
         geolocation=GeolocationConfig(
-            max_distance_meters=float(os.environ.get("MAX_DISTANCE_METERS", "50")),
-            geocoding_api_endpoint=os.environ.get("GEOCODING_ENDPOINT"),
+            max_distance_meters=float(env.get("MAX_DISTANCE_METERS", "50")),
+            geocoding_api_endpoint=env.get("GEOCODING_ENDPOINT"),
+            stops_path=env.get("STOPS_FILE") or None,
         ),
         quality_weights=QualityIndexWeights(
-            timeliness=float(os.environ.get("WEIGHT_TIMELINESS", "0.3")),
-            location_accuracy=float(os.environ.get("WEIGHT_LOCATION", "0.3")),
-            damage_score=float(os.environ.get("WEIGHT_DAMAGE", "0.4")),
+            timeliness=float(env.get("WEIGHT_TIMELINESS", "0.3")),
+            location_accuracy=float(env.get("WEIGHT_LOCATION", "0.3")),
+            damage_score=float(env.get("WEIGHT_DAMAGE", "0.4")),
         ),
         damage_scoring=DamageScoringConfig(
-            none_max=float(os.environ.get("DAMAGE_SCORE_NONE_MAX", "0.1")),
-            minor_min=float(os.environ.get("DAMAGE_SCORE_MINOR_MIN", "0.3")),
-            minor_max=float(os.environ.get("DAMAGE_SCORE_MINOR_MAX", "0.4")),
-            moderate_min=float(os.environ.get("DAMAGE_SCORE_MODERATE_MIN", "0.6")),
-            moderate_max=float(os.environ.get("DAMAGE_SCORE_MODERATE_MAX", "0.7")),
-            severe_min=float(os.environ.get("DAMAGE_SCORE_SEVERE_MIN", "0.9")),
-            use_weighted_scoring=os.environ.get("DAMAGE_USE_WEIGHTED_SCORING", "true").lower() == "true",
+            none_max=float(env.get("DAMAGE_SCORE_NONE_MAX", "0.1")),
+            minor_min=float(env.get("DAMAGE_SCORE_MINOR_MIN", "0.3")),
+            minor_max=float(env.get("DAMAGE_SCORE_MINOR_MAX", "0.4")),
+            moderate_min=float(env.get("DAMAGE_SCORE_MODERATE_MIN", "0.6")),
+            moderate_max=float(env.get("DAMAGE_SCORE_MODERATE_MAX", "0.7")),
+            severe_min=float(env.get("DAMAGE_SCORE_SEVERE_MIN", "0.9")),
+            use_weighted_scoring=env.get("DAMAGE_USE_WEIGHTED_SCORING", "true").lower() == "true",
             type_weights=DamageTypeWeights(
-                leakage=float(os.environ.get("DAMAGE_WEIGHT_LEAKAGE", "0.4")),
-                box_deformation=float(os.environ.get("DAMAGE_WEIGHT_BOX_DEFORMATION", "0.3")),
-                packaging_integrity=float(os.environ.get("DAMAGE_WEIGHT_PACKAGING_INTEGRITY", "0.2")),
-                corner_damage=float(os.environ.get("DAMAGE_WEIGHT_CORNER_DAMAGE", "0.1")),
+                leakage=float(env.get("DAMAGE_WEIGHT_LEAKAGE", "0.4")),
+                box_deformation=float(env.get("DAMAGE_WEIGHT_BOX_DEFORMATION", "0.3")),
+                packaging_integrity=float(env.get("DAMAGE_WEIGHT_PACKAGING_INTEGRITY", "0.2")),
+                corner_damage=float(env.get("DAMAGE_WEIGHT_CORNER_DAMAGE", "0.1")),
             ),
             severity_scores=SeverityScores(
-                none=float(os.environ.get("SEVERITY_SCORE_NONE", "0.05")),
-                minor=float(os.environ.get("SEVERITY_SCORE_MINOR", "0.35")),
-                moderate=float(os.environ.get("SEVERITY_SCORE_MODERATE", "0.65")),
-                severe=float(os.environ.get("SEVERITY_SCORE_SEVERE", "0.9")),
+                none=float(env.get("SEVERITY_SCORE_NONE", "0.05")),
+                minor=float(env.get("SEVERITY_SCORE_MINOR", "0.35")),
+                moderate=float(env.get("SEVERITY_SCORE_MODERATE", "0.65")),
+                severe=float(env.get("SEVERITY_SCORE_SEVERE", "0.9")),
             ),
         ),
-        notification_topic_id=os.environ.get("NOTIFICATION_TOPIC_ID"),
-        database_table=os.environ.get("QUALITY_TABLE", "delivery_quality_events"),
-        local_asset_root=os.environ.get("LOCAL_ASSET_ROOT"),
+        pipeline=PipelineConfig(
+            max_workers=int(env.get("PIPELINE_MAX_WORKERS", "4")),
+            damage_mode=env.get("PIPELINE_DAMAGE_MODE", "sequential").lower(),
+        ),
+        review=ReviewConfig(
+            mode=env.get("REVIEW_MODE", "llm").lower(),
+            ok_min_quality_index=float(env.get("REVIEW_OK_MIN_QUALITY_INDEX", "0.85")),
+            flag_max_quality_index=float(env.get("REVIEW_FLAG_MAX_QUALITY_INDEX", "0.5")),
+            min_location_accuracy=float(env.get("REVIEW_MIN_LOCATION_ACCURACY", "0.5")),
+            min_timeliness=float(env.get("REVIEW_MIN_TIMELINESS", "0.75")),
+            ok_max_damage_severity=env.get("REVIEW_OK_MAX_DAMAGE_SEVERITY", "none").lower(),
+            flag_min_damage_severity=env.get("REVIEW_FLAG_MIN_DAMAGE_SEVERITY", "moderate").lower(),
+        ),
+        cache=CacheConfig(
+            enabled=env.get("GENAI_CACHE_ENABLED", "true").lower() == "true",
+            memory_max_bytes=int(float(env.get("GENAI_CACHE_MEMORY_MB", "8")) * 1024 * 1024),
+            disk_path=env.get("GENAI_CACHE_PATH") or None,
+            ttl_seconds=float(env.get("GENAI_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        ),
+        concurrency=ConcurrencyConfig(
+            object_storage=int(env.get("CONCURRENCY_OBJECT_STORAGE", "16")),
+            genai=int(env.get("CONCURRENCY_GENAI", "8")),
+            compute=int(env.get("CONCURRENCY_COMPUTE", "4")),
+        ),
+        adaptive_concurrency=AdaptiveConcurrencyConfig(
+            enabled=env.get("GENAI_ADAPTIVE_CONCURRENCY", "true").lower() == "true",
+            initial_limit=int(env.get("GENAI_CONCURRENCY_INITIAL", "4")),
+            min_limit=int(env.get("GENAI_CONCURRENCY_MIN", "1")),
+            max_limit=int(env.get("GENAI_CONCURRENCY_MAX", "64")),
+            latency_tolerance=float(env.get("GENAI_CONCURRENCY_LATENCY_TOLERANCE", "2.0")),
+            backoff_ratio=float(env.get("GENAI_CONCURRENCY_BACKOFF_RATIO", "0.5")),
+        ),
+        call_policy=CallPolicyConfig(
+            max_attempts=int(env.get("GENAI_MAX_ATTEMPTS", "3")),
+            backoff_base_seconds=float(env.get("GENAI_BACKOFF_BASE_SECONDS", "0.5")),
+            backoff_max_seconds=float(env.get("GENAI_BACKOFF_MAX_SECONDS", "8")),
+            deadline_seconds=float(env.get("GENAI_DEADLINE_SECONDS", "0")),
+            deadline_reserve_seconds=float(env.get("GENAI_DEADLINE_RESERVE_SECONDS", "5")),
+            min_attempt_seconds=float(env.get("GENAI_MIN_ATTEMPT_SECONDS", "1")),
+            hedge=env.get("GENAI_HEDGE", "false").lower() == "true",
+            hedge_percentile=float(env.get("GENAI_HEDGE_PERCENTILE", "0.95")),
+            hedge_min_samples=int(env.get("GENAI_HEDGE_MIN_SAMPLES", "20")),
+        ),
+        circuit_breaker=CircuitBreakerConfig(
+            enabled=env.get("GENAI_BREAKER_ENABLED", "true").lower() == "true",
+            window_seconds=float(env.get("GENAI_BREAKER_WINDOW_SECONDS", "60")),
+            min_calls=int(env.get("GENAI_BREAKER_MIN_CALLS", "10")),
+            failure_rate=float(env.get("GENAI_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(env.get("GENAI_BREAKER_SLOW_CALL_SECONDS", "60")),
+            slow_call_rate=float(env.get("GENAI_BREAKER_SLOW_CALL_RATE", "0.8")),
+            open_seconds=float(env.get("GENAI_BREAKER_OPEN_SECONDS", "30")),
+            half_open_probes=int(env.get("GENAI_BREAKER_HALF_OPEN_PROBES", "1")),
+            # Only /tmp is writable in OCI Functions, and it does not outlive the container
+            requeue=env.get("REINFERENCE_QUEUE", "object_storage").lower(),
+            requeue_path=env.get("REINFERENCE_QUEUE_PATH", "/tmp/reinference_queue.jsonl"),
+            requeue_prefix=env.get("REINFERENCE_QUEUE_PREFIX", "reinference/"),
+        ),
+        events=EventStoreConfig(
+            backend=env.get("QUALITY_BACKEND", "none").lower(),
+            # Only /tmp is writable in OCI Functions
+            sqlite_path=env.get("QUALITY_SQLITE_PATH", "/tmp/quality_events.db"),
+            adw_dsn=env.get("QUALITY_ADW_DSN") or None,
+            adw_user=env.get("QUALITY_ADW_USER") or None,
+            adw_password=env.get("QUALITY_ADW_PASSWORD") or None,
+            adw_wallet_dir=env.get("QUALITY_ADW_WALLET_DIR") or None,
+            batch_size=int(env.get("QUALITY_BATCH_SIZE", "200")),
+            flush_interval_seconds=float(env.get("QUALITY_FLUSH_INTERVAL_SECONDS", "1.0")),
+            max_queue=int(env.get("QUALITY_MAX_QUEUE", "10000")),
+            enqueue_timeout_seconds=float(env.get("QUALITY_ENQUEUE_TIMEOUT_SECONDS", "5")),
+        ),
+        alerts=AlertConfig(
+            sink=env.get("ALERT_SINK", "ons").lower(),
+            file_path=env.get("ALERT_FILE_PATH", "alerts.jsonl"),
+            http_url=env.get("ALERT_HTTP_URL") or None,
+            dedupe_window_seconds=float(env.get("ALERT_DEDUPE_WINDOW_SECONDS", "600")),
+            digest_interval_seconds=float(env.get("ALERT_DIGEST_INTERVAL_SECONDS", "60")),
+            max_digest_alerts=int(env.get("ALERT_MAX_DIGEST_ALERTS", "50")),
+            max_queue=int(env.get("ALERT_MAX_QUEUE", "1000")),
+        ),
+        notification_topic_id=env.get("NOTIFICATION_TOPIC_ID"),
+        database_table=env.get("QUALITY_TABLE", "delivery_quality_events"),
+        local_asset_root=env.get("LOCAL_ASSET_ROOT"),
+        genai_streaming=env.get("GENAI_STREAMING", "false").lower() == "true",
     )
 
 
-def build_llm(config: WorkflowConfig) -> OCIModel:
-    """Build OCI Generative AI client for chat API"""
+def build_llm(config: WorkflowConfig, environ: Optional[Mapping[str, str]] = None) -> OCIModel:
+    """Build OCI Generative AI client for chat API
+
+    The endpoint comes from ``config.genai``; ``environ`` is accepted so
+    ``build_llm`` fits the snapshot's LLM factory signature.
+    """
     import oci
-    from oci.generative_ai_inference import GenerativeAiInferenceClient
     
-    # Get configuration from environment
-    hostname = os.environ.get("OCI_GENAI_HOSTNAME")
-    model_ocid = os.environ.get("OCI_TEXT_MODEL_OCID")
-    compartment_id = os.environ.get("OCI_COMPARTMENT_ID")
-    region = os.environ.get("OCI_REGION")
+    hostname = config.genai.hostname
+    model_ocid = config.genai.model_ocid
+    compartment_id = config.genai.compartment_id
     
     if not hostname:
         raise ValueError("OCI_GENAI_HOSTNAME must be set")
     
     if not model_ocid:
-        print("Warning: OCI_TEXT_MODEL_OCID not set, using placeholder")
+        logger.warning("OCI_TEXT_MODEL_OCID not set, using placeholder")
         model_ocid = "ocid1.test.oc1..<unique_ID>EXAMPLE-modelId-Value"
     
     if not compartment_id:
         raise ValueError("OCI_COMPARTMENT_ID must be set")
     
-    # Remove endpoint path if included in hostname
-    if '/20231130/actions/generateText' in hostname:
-        hostname = hostname.replace('/20231130/actions/generateText', '')
-    
-    signer = None
-    oci_config: Dict[str, Any] = {}
+    # Fail fast on bad credentials; requests look the client up again so a
+    # client rebuilt after a credential refresh is picked up
     try:
-        from oci.auth.signers import get_resource_principals_signer
-
-        signer = get_resource_principals_signer()
-        signer_region = getattr(signer, "region", None)
-        resolved_region = region or signer_region or "us-ashburn-1"
-        if resolved_region:
-            os.environ.setdefault("OCI_REGION", resolved_region)
-            oci_config = {"region": resolved_region}
-        print(f"Using resource principal authentication for Generative AI client (region={resolved_region})")
-    except Exception as rp_error:
-        print(f"Resource principal signer unavailable: {rp_error}")
-        try:
-            oci_config = oci.config.from_file()
-            print("Falling back to local OCI configuration file")
-        except Exception as config_error:
-            try:
-                oci_config = oci.config.from_file("~/.oci/config")
-                print("Falling back to ~/.oci/config")
-            except Exception as fallback_error:
-                raise ValueError(
-                    "Could not initialize OCI authentication via resource principals or config files"
-                ) from fallback_error
-        signer = None
-    
-    # Initialize Generative AI client
-    try:
-        if signer is not None:
-            client = GenerativeAiInferenceClient(
-                config=oci_config,
-                signer=signer,
-                service_endpoint=hostname,
-                retry_strategy=oci.retry.NoneRetryStrategy(),
-                timeout=(10, 240)
-            )
-        else:
-            client = GenerativeAiInferenceClient(
-                config=oci_config,
-                service_endpoint=hostname,
-                retry_strategy=oci.retry.NoneRetryStrategy(),
-                timeout=(10, 240)
-            )
+        get_genai_client(hostname)
     except Exception as client_error:
         raise RuntimeError(f"Failed to initialize OCI Generative AI client: {client_error}")
     
     # Create custom LLM wrapper for OCI GenAI chat API
+    from .genai_stream import stream_chat_text
     from langchain_core.language_models import BaseLLM
     from langchain_core.callbacks import CallbackManagerForLLMRun
     from typing import Any, List, Optional
     
     class OCIGenAIModel(BaseLLM):
-        client: Any = None
+        hostname: str = ""
         model_ocid: str = ""
         compartment_id: str = ""
+        streaming: bool = False
+        call_policy: Any = None
+        limiter: Any = None
         
-        def __init__(self, client, model_ocid, compartment_id):
+        def __init__(self, hostname, model_ocid, compartment_id, streaming=False, call_policy=None, limiter=None):
             super().__init__(
-                client=client,
+                hostname=hostname,
                 model_ocid=model_ocid,
-                compartment_id=compartment_id
+                compartment_id=compartment_id,
+                streaming=streaming,
+                call_policy=call_policy,
+                limiter=limiter,
             )
         
         @property
@@ -184,7 +275,12 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
             run_manager: Optional[CallbackManagerForLLMRun] = None,
             **kwargs: Any,
         ) -> str:
-            """Generate text using OCI GenAI chat API"""
+            """Generate text using OCI GenAI chat API
+
+            When streaming, a ``json_keys`` keyword (set through a chain's
+            ``llm_kwargs``) stops reading once a JSON object with those keys
+            has closed.
+            """
             try:
                 # Create content and message
                 content = oci.generative_ai_inference.models.TextContent()
@@ -203,6 +299,7 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
                 chat_request.frequency_penalty = kwargs.get('frequency_penalty', 0)
                 chat_request.presence_penalty = kwargs.get('presence_penalty', 0)
                 chat_request.top_p = kwargs.get('top_p', 0.75)
+                chat_request.is_stream = self.streaming
                 
                 # Create serving mode with endpoint ID
                 serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
@@ -215,68 +312,174 @@ def build_llm(config: WorkflowConfig) -> OCIModel:
                 chat_detail.chat_request = chat_request
                 chat_detail.compartment_id = self.compartment_id
                 
-                # Call the chat API
-                response = self.client.chat(chat_detail)
-                
-                # Extract text from response
-                if (response.data and 
-                    hasattr(response.data, 'chat_response') and 
-                    response.data.chat_response and
-                    hasattr(response.data.chat_response, 'choices') and 
-                    response.data.chat_response.choices and
-                    len(response.data.chat_response.choices) > 0 and
-                    hasattr(response.data.chat_response.choices[0], 'message') and
-                    response.data.chat_response.choices[0].message and
-                    hasattr(response.data.chat_response.choices[0].message, 'content') and
-                    response.data.chat_response.choices[0].message.content and
-                    len(response.data.chat_response.choices[0].message.content) > 0):
-                    return response.data.chat_response.choices[0].message.content[0].text
-                else:
-                    return "Error: No response generated"
+                def chat() -> str:
+                    # Each request, hedges included, holds a slot until its answer is read
+                    with self.limiter.slot("text") if self.limiter is not None else nullcontext():
+                        response = get_genai_client(self.hostname).chat(chat_detail)
+                        if self.streaming:
+                            text = stream_chat_text(response, kwargs.get('json_keys'))
+                            return text if text is not None else "Error: No response generated"
+
+                    # Extract text from response
+                    if (response.data and 
+                        hasattr(response.data, 'chat_response') and 
+                        response.data.chat_response and
+                        hasattr(response.data.chat_response, 'choices') and 
+                        response.data.chat_response.choices and
+                        len(response.data.chat_response.choices) > 0 and
+                        hasattr(response.data.chat_response.choices[0], 'message') and
+                        response.data.chat_response.choices[0].message and
+                        hasattr(response.data.chat_response.choices[0].message, 'content') and
+                        response.data.chat_response.choices[0].message.content and
+                        len(response.data.chat_response.choices[0].message.content) > 0):
+                        return response.data.chat_response.choices[0].message.content[0].text
+                    else:
+                        return "Error: No response generated"
+
+                # Retried within the delivery deadline and, if enabled, hedged
+                if self.call_policy is None:
+                    return chat()
+                return self.call_policy.call(chat)
                     
+            except GenAIUnavailableError:
+                raise
             except Exception as e:
+                if is_unavailable(e):
+                    raise GenAIUnavailableError(f"GenAI unavailable: {e}") from e
                 return f"Error generating text: {str(e)}"
     
-    return OCIGenAIModel(client, model_ocid, compartment_id)
+    return OCIGenAIModel(
+        hostname,
+        model_ocid,
+        compartment_id,
+        streaming=config.genai_streaming,
+        call_policy=get_call_policy(
+            config.call_policy,
+            f"{model_ocid}/text",
+            get_circuit_breaker(config.circuit_breaker, model_ocid),
+        ),
+        limiter=get_adaptive_limiter(config.adaptive_concurrency, model_ocid),
+    )
 
 
 def handler(ctx: Any, data: bytes) -> Dict[str, Any]:
+    # LangChain loads on the first delivery, not when load_config is imported
+    from .chains import DeliveryContext, run_quality_pipeline
+    from .snapshot import get_workflow_snapshot
+
     payload = json.loads(data.decode("utf-8"))
     object_name = payload["data"]["resourceName"]
     event_time = payload["eventTime"]
 
+    details = payload["additionalDetails"]
+
+    # Config, LLM, tools and chains are reused until their settings change
+    snapshot = get_workflow_snapshot()
+    config = snapshot.config
+    breaker = config.circuit_breaker
+    if breaker.requeue == "object_storage" and object_name.startswith(breaker.requeue_prefix):
+        # A re-inference row, seen when the event rule watches the whole bucket
+        return {"object_name": object_name, "skipped": "reinference_row"}
+    if details.get("expectedLatitude") is not None and details.get("expectedLongitude") is not None:
+        expected = (float(details["expectedLatitude"]), float(details["expectedLongitude"]))
+    else:
+        # Resolved from the planned route instead of a lookup per delivery
+        expected = expected_position(get_stop_index(config.geolocation.stops_path), details.get("stopId"))
     context = DeliveryContext(
         object_name=object_name,
-        expected_latitude=float(payload["additionalDetails"]["expectedLatitude"]),
-        expected_longitude=float(payload["additionalDetails"]["expectedLongitude"]),
-        promised_time_utc=datetime.fromisoformat(payload["additionalDetails"]["promisedTime"]),
+        expected_latitude=expected[0],
+        expected_longitude=expected[1],
+        promised_time_utc=datetime.fromisoformat(details["promisedTime"]),
         delivered_time_utc=datetime.fromisoformat(event_time),
+        driver_id=details.get("driverId"),
+        stop_id=details.get("stopId"),
     )
 
-    config = load_config()
-    llm = build_llm(config)
-    workflow_output = run_quality_pipeline(
-        config=config,
-        llm=llm,
-        context=context,
-        object_name=object_name,
-    )
+    # GenAI retries and waits end before the invocation's own deadline
+    seconds_left = invocation_seconds_left(ctx)
+    if seconds_left is not None:
+        seconds_left = max(seconds_left - config.call_policy.deadline_reserve_seconds, 0.001)
+    with request_deadline(seconds_left):
+        workflow_output = run_quality_pipeline(
+            config=config,
+            llm=snapshot.llm,
+            context=context,
+            object_name=object_name,
+            tools=snapshot.tools,
+            chains=snapshot.chains,
+        )
 
-    # Persist results (placeholder for Autonomous Data Warehouse interaction)
-    store_quality_event(config, workflow_output)
+    # Queue the result; it is written to the warehouse when the handler flushes
+    store_quality_event(config, workflow_output, object_name=object_name)
 
-    # Trigger notification if assessment indicates review
+    # Trigger notification if assessment indicates review (queued, never blocks)
     if workflow_output["assessment"].get("status") == "Review":
-        trigger_alert(config, workflow_output)
+        trigger_alert(config, workflow_output, object_name=object_name, driver_id=context.driver_id)
+
+    # The container may be frozen or recycled once the handler returns, so
+    # queued rows and due alert digests are sent now, not left to the threads
+    unsent = flush_pending_output(config, flush_timeout(ctx))
+    if unsent:
+        workflow_output["unsent"] = unsent
 
     return workflow_output
 
 
-def store_quality_event(config: WorkflowConfig, workflow_output: Dict[str, Any]) -> None:
-    # Placeholder for database insertion logic.
-    pass
+def flush_timeout(ctx: Any) -> float:
+    """Seconds the handler may spend flushing queued output before its deadline."""
+    seconds_left = invocation_seconds_left(ctx)
+    if seconds_left is None:
+        return _FLUSH_TIMEOUT_SECONDS
+    return max(min(seconds_left - _FLUSH_MARGIN_SECONDS, _FLUSH_TIMEOUT_SECONDS), 0.0)
+
+
+def flush_pending_output(config: WorkflowConfig, timeout: float) -> List[str]:
+    """Write queued quality events and send due alert digests, waiting at most ``timeout`` seconds in total.
+
+    Digests still inside ``digest_interval_seconds`` keep collecting alerts
+    across invocations; they go out with the first invocation that ends
+    after their interval, or when the container shuts down. Returns the
+    names of the outputs still pending at the timeout; they stay queued.
+    """
+    deadline = time.monotonic() + timeout
+    unsent = []
+    writer = get_event_writer(config)
+    if writer is not None and not writer.flush(timeout=max(deadline - time.monotonic(), 0.0)):
+        unsent.append("quality_events")
+    dispatcher = get_alert_dispatcher(config)
+    if dispatcher is not None and not dispatcher.flush_due(timeout=max(deadline - time.monotonic(), 0.0)):
+        unsent.append("alerts")
+    if unsent:
+        logger.warning("Still sending %s after %.1fs; leaving them queued", ", ".join(unsent), timeout)
+    return unsent
+
+
+def store_quality_event(
+    config: WorkflowConfig, workflow_output: Dict[str, Any], object_name: Optional[str] = None
+) -> None:
+    """Queue ``workflow_output`` for a batched upsert into ``config.database_table``.
+
+    Returns once the row is buffered; raises
+    :class:`~oci_delivery_agent.events.EventBackpressureError` if the buffer
+    stays full for the configured enqueue timeout.
+    """
+    writer = get_event_writer(config)
+    if writer is not None:
+        writer.write(quality_event_row(workflow_output, object_name=object_name))
+
 
+def trigger_alert(
+    config: WorkflowConfig,
+    workflow_output: Dict[str, Any],
+    object_name: Optional[str] = None,
+    driver_id: Optional[str] = None,
+) -> None:
+    """Hand a Review result to the alert dispatcher.
 
-def trigger_alert(config: WorkflowConfig, workflow_output: Dict[str, Any]) -> None:
-    # Placeholder for Notification service call.
-    pass
+    Repeats for the same delivery or driver are coalesced and alerts reach
+    the topic as periodic digests; a full dispatcher queue drops the alert
+    rather than delaying the response.
+    """
+    dispatcher = get_alert_dispatcher(config)
+    if dispatcher is not None:
+        dispatcher.submit(review_alert(config, workflow_output, object_name=object_name, driver_id=driver_id))
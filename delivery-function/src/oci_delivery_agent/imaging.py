@@ -0,0 +1,46 @@
+"""Image preparation applied before photos are sent inline to GenAI."""
+from __future__ import annotations
+
+import io
+from typing import Tuple, Union
+
+from PIL import Image, ImageOps
+
+# Modes PIL can write as JPEG without conversion
+_JPEG_MODES = {"RGB", "L", "CMYK"}
+
+
+def prepare_for_inference(
+    data: Union[bytes, bytearray, memoryview],
+    max_long_edge: int,
+    jpeg_quality: int,
+) -> Tuple[bytes, int, int]:
+    """Fit an image within ``max_long_edge`` pixels and re-encode it as JPEG.
+
+    JPEG sources are decoded with ``Image.draft`` so libjpeg applies DCT
+    scaling (1/2, 1/4 or 1/8) while decoding and the full-resolution bitmap
+    is never materialized. EXIF orientation is applied because the metadata
+    is dropped from the re-encoded copy. Upright JPEGs that already fit are
+    returned unchanged to avoid a lossy second encode.
+
+    Returns ``(jpeg_bytes, width, height)``.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        width, height = img.size
+        is_jpeg = img.format == "JPEG"
+        upright = img.getexif().get(0x0112, 1) == 1
+        if is_jpeg and upright and max(width, height) <= max_long_edge:
+            return bytes(data), width, height
+
+        if is_jpeg:
+            scale = max_long_edge / max(width, height)
+            img.draft("RGB", (max(1, int(width * scale)), max(1, int(height * scale))))
+
+        prepared = ImageOps.exif_transpose(img)
+        prepared.thumbnail((max_long_edge, max_long_edge), Image.LANCZOS)
+        if prepared.mode not in _JPEG_MODES:
+            prepared = prepared.convert("RGB")
+
+        output = io.BytesIO()
+        prepared.save(output, format="JPEG", quality=jpeg_quality, optimize=True)
+        return output.getvalue(), prepared.width, prepared.height
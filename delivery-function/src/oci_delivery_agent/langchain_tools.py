@@ -0,0 +1,185 @@
+"""LangChain tools wrapping OCI services for the delivery workflow."""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Optional, Tuple, Union
+
+from langchain.tools import BaseTool
+
+from .artifacts import ImageArtifact, default_registry, resolve_image
+from .concurrency import get_service_limiter
+from .config import ConcurrencyConfig, WorkflowConfig
+from .exif import parse_jpeg_exif
+from .tools import ObjectStorageClient, VisionClient, _normalize_exif, extract_exif
+
+
+class ObjectRetrievalTool(BaseTool):
+    name: str = "retrieve_delivery_photo"
+    description: str = "Fetch delivery photo bytes and metadata from OCI Object Storage."
+
+    def __init__(self, config: WorkflowConfig):
+        super().__init__()
+        self._config = config
+        self._client = ObjectStorageClient(config)
+        self._limiter = get_service_limiter(config.concurrency)
+
+    def fetch(self, object_name: str) -> ImageArtifact:
+        """Download the photo once into a handle that later stages share."""
+        result = self._client.get_object(object_name)
+        return ImageArtifact(
+            result["data"],
+            metadata=result["metadata"],
+            content_type=result["metadata"].get("content_type") or "image/jpeg",
+            digest=result.get("digest"),
+        )
+
+    async def afetch(self, object_name: str) -> ImageArtifact:
+        return await self._limiter.run("object_storage", self.fetch, object_name)
+
+    def exif_from_prefix(self, object_name: str) -> Optional[Dict[str, Any]]:
+        """EXIF from a ranged read of the leading bytes, or ``None`` when the whole object is needed."""
+        prefix = self._client.get_exif_prefix(object_name)
+        try:
+            raw_gps, timestamp = parse_jpeg_exif(prefix)
+        except Exception:
+            # Not a JPEG or a segment the fast reader rejects
+            return None
+        return _normalize_exif(raw_gps, timestamp)
+
+    def fetch_exif(self, object_name: str, image: Optional[ImageArtifact] = None) -> Dict[str, Any]:
+        """Extract EXIF from a ranged read, falling back to ``image`` or a full download."""
+        exif = self.exif_from_prefix(object_name)
+        if exif is not None:
+            return exif
+        if image is None:
+            image = self.fetch(object_name)
+        return extract_exif(image.data)
+
+    async def afetch_exif(self, object_name: str) -> Dict[str, Any]:
+        return await self._limiter.run("object_storage", self.fetch_exif, object_name)
+
+    def _run(self, object_name: str) -> str:
+        # String adapter: hand out a registry reference instead of base64 bytes
+        artifact = self.fetch(object_name)
+        reference = default_registry.register(artifact)
+        return json.dumps({"payload": reference, "metadata": artifact.metadata})
+
+    async def _arun(self, object_name: str) -> str:
+        artifact = await self.afetch(object_name)
+        reference = default_registry.register(artifact)
+        return json.dumps({"payload": reference, "metadata": artifact.metadata})
+
+
+class ExifExtractionTool(BaseTool):
+    name: str = "extract_exif"
+    description: str = "Extract EXIF metadata including GPS coordinates from a delivery image."
+
+    def __init__(self, config: Optional[WorkflowConfig] = None):
+        super().__init__()
+        concurrency = config.concurrency if config is not None else ConcurrencyConfig()
+        self._limiter = get_service_limiter(concurrency)
+
+    def extract(self, image: Union[ImageArtifact, bytes]) -> Dict[str, Any]:
+        return extract_exif(resolve_image(image).data)
+
+    async def aextract(self, image: Union[ImageArtifact, bytes]) -> Dict[str, Any]:
+        return await self._limiter.run("compute", self.extract, image)
+
+    def _run(self, encoded_payload: str) -> str:
+        exif = self.extract(resolve_image(encoded_payload))
+        return json.dumps(exif, default=str)
+
+    async def _arun(self, encoded_payload: str) -> str:
+        exif = await self.aextract(resolve_image(encoded_payload))
+        return json.dumps(exif, default=str)
+
+
+class ImageCaptionTool(BaseTool):
+    name: str = "caption_image"
+    description: str = "Generate structured delivery scene analysis as JSON (sceneType, package, location, environment, safetyAssessment)."
+
+    def __init__(self, config: WorkflowConfig):
+        super().__init__()
+        self._client = VisionClient(config)
+        self._limiter = get_service_limiter(config.concurrency)
+
+    def caption(self, image: Union[ImageArtifact, bytes]) -> str:
+        return self._client.generate_caption(image)
+
+    async def acaption(self, image: Union[ImageArtifact, bytes]) -> str:
+        return await self._limiter.run("genai", self.caption, image)
+
+    def analyze(self, image: Union[ImageArtifact, bytes]) -> Tuple[str, Dict[str, Any]]:
+        """Caption and damage report from one combined GenAI request."""
+        return self._client.analyze_delivery(image)
+
+    async def aanalyze(self, image: Union[ImageArtifact, bytes]) -> Tuple[str, Dict[str, Any]]:
+        return await self._limiter.run("genai", self.analyze, image)
+
+    def _run(self, encoded_payload: str) -> str:
+        return self.caption(resolve_image(encoded_payload))
+
+    async def _arun(self, encoded_payload: str) -> str:
+        return await self.acaption(resolve_image(encoded_payload))
+
+
+class DamageDetectionTool(BaseTool):
+    name: str = "detect_damage"
+    description: str = "Extract per-indicator damage assessment as JSON (boxDeformation, cornerDamage, leakage, packagingIntegrity)."
+
+    def __init__(self, config: WorkflowConfig):
+        super().__init__()
+        self._config = config
+        self._client = VisionClient(config)
+        self._limiter = get_service_limiter(config.concurrency)
+
+    def detect(
+        self,
+        image: Union[ImageArtifact, bytes],
+        caption_context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        return self._client.detect_damage(image, caption_context=caption_context)
+
+    async def adetect(
+        self,
+        image: Union[ImageArtifact, bytes],
+        caption_context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        return await self._limiter.run("genai", self.detect, image, caption_context)
+
+    @staticmethod
+    def _parse_caption_context(caption_context: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not caption_context:
+            return None
+        try:
+            return json.loads(caption_context)
+        except json.JSONDecodeError:
+            print(f"Warning: Could not parse caption_context: {caption_context}")
+            return None
+
+    def _run(self, encoded_payload: str, caption_context: Optional[str] = None) -> str:
+        """Run damage detection, optionally using caption context.
+        
+        Args:
+            encoded_payload: Artifact reference (or legacy base64-encoded image data)
+            caption_context: Optional JSON string with caption results for context
+        """
+        context_dict = self._parse_caption_context(caption_context)
+        result = self.detect(resolve_image(encoded_payload), caption_context=context_dict)
+        return json.dumps(result)
+
+    async def _arun(self, encoded_payload: str, caption_context: Optional[str] = None) -> str:
+        context_dict = self._parse_caption_context(caption_context)
+        result = await self.adetect(resolve_image(encoded_payload), caption_context=context_dict)
+        return json.dumps(result)
+
+
+def toolset(config: WorkflowConfig) -> Dict[str, BaseTool]:
+    """Factory returning all tools keyed by workflow stage."""
+
+    return {
+        "retrieval": ObjectRetrievalTool(config),
+        "exif": ExifExtractionTool(config),
+        "caption": ImageCaptionTool(config),
+        "damage": DamageDetectionTool(config),
+    }
@@ -0,0 +1,156 @@
+"""Indexed local asset backend used when Object Storage is not available.
+
+The asset root is walked once into an in-memory index of object names.
+Later lookups are dictionary hits; a miss re-checks directory mtimes and
+rescans only directories that changed, so files added by other processes
+are still found. Objects are served as read-only memory maps, so repeated
+reads of large photo directories share the page cache instead of copying
+each file onto the heap.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple, Union
+
+from .streaming import ObjectTooLargeError
+
+
+def _object_key(name: str) -> str:
+    return "/".join(part for part in name.replace(os.sep, "/").split("/") if part not in ("", "."))
+
+
+class LocalAssetBackend:
+    """Object-style access to files under ``root``."""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._files: Dict[str, str] = {}
+        self._dirs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        with self._lock:
+            self._scan(self.root)
+
+    def _scan(self, directory: str) -> None:
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except FileNotFoundError:
+            return
+        self._dirs[directory] = mtime
+        for entry in entries:
+            if entry.name.startswith("."):
+                # Hidden entries (VCS metadata, in-progress uploads) are not assets
+                continue
+            if entry.is_dir(follow_symlinks=True):
+                if entry.path not in self._dirs:
+                    self._scan(entry.path)
+            elif entry.is_file(follow_symlinks=True):
+                self._files[_object_key(os.path.relpath(entry.path, self.root))] = entry.path
+
+    def _forget(self, directory: str) -> None:
+        prefix = directory + os.sep
+        for key, path in list(self._files.items()):
+            if path.startswith(prefix):
+                del self._files[key]
+        for other in list(self._dirs):
+            if other == directory or other.startswith(prefix):
+                del self._dirs[other]
+
+    def refresh(self) -> None:
+        """Rescan directories whose mtime changed since they were indexed."""
+        with self._lock:
+            for directory, mtime in list(self._dirs.items()):
+                try:
+                    current = os.stat(directory).st_mtime_ns
+                except FileNotFoundError:
+                    self._forget(directory)
+                    continue
+                if current != mtime:
+                    for key, path in list(self._files.items()):
+                        if os.path.dirname(path) == directory:
+                            del self._files[key]
+                    self._scan(directory)
+
+    def find(self, *names: str) -> Optional[str]:
+        """Return the path of the first name present, refreshing once on a miss."""
+        for attempt in range(2):
+            with self._lock:
+                for name in names:
+                    path = self._files.get(_object_key(name))
+                    if path is not None:
+                        return path
+            if attempt == 0:
+                self.refresh()
+        return None
+
+    def open(self, path: str, max_bytes: Optional[int] = None) -> Union[memoryview, bytes]:
+        """Return a read-only view of a memory map of ``path`` (``b""`` when empty).
+
+        The map stays open for as long as the view is referenced.
+        """
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if max_bytes is not None and size > max_bytes:
+                raise ObjectTooLargeError(size, max_bytes)
+            if size == 0:
+                return b""
+            return memoryview(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def load(self, *names: str, max_bytes: Optional[int] = None) -> Optional[Tuple[str, Union[memoryview, bytes]]]:
+        """Return ``(path, data)`` for the first name present, or ``None``.
+
+        Index hits are not re-validated; a file deleted since it was indexed
+        triggers one refresh and a second lookup.
+        """
+        for _ in range(2):
+            path = self.find(*names)
+            if path is None:
+                return None
+            try:
+                return path, self.open(path, max_bytes=max_bytes)
+            except FileNotFoundError:
+                self.refresh()
+        return None
+
+    def read_range(self, path: str, start: int, end: int) -> bytes:
+        with open(path, "rb") as handle:
+            return os.pread(handle.fileno(), end - start + 1, start)
+
+    def put(self, name: str, data: Union[bytes, bytearray, memoryview]) -> str:
+        """Atomically write ``data`` as object ``name`` and index it."""
+        key = _object_key(name)
+        path = os.path.join(self.root, *key.split("/"))
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        with self._lock:
+            self._files[key] = path
+            if directory not in self._dirs:
+                self._scan(directory)
+        return path
+
+
+_backends: Dict[str, LocalAssetBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_local_backend(root: Optional[str]) -> LocalAssetBackend:
+    """Return the process-wide backend for ``root`` (default: working directory)."""
+    key = os.path.abspath(root or ".")
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = LocalAssetBackend(key)
+            _backends[key] = backend
+        return backend
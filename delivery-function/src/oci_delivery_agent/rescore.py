@@ -0,0 +1,169 @@
+"""Re-score stored workflow outputs under the current scoring config.
+
+Quality metrics depend only on the stored ``exif`` and ``damage_report``,
+the delivery context and the scoring weights, so a weight change does not
+need new GenAI calls. Records are scored in chunks with
+:func:`~oci_delivery_agent.scoring.score_batch` and their
+``quality_metrics`` are replaced with values stamped with the
+:meth:`~oci_delivery_agent.config.WorkflowConfig.scoring_version` that
+produced them. Records already carrying the current version are passed
+through unchanged, which also makes an interrupted run cheap to repeat,
+as are degraded records scored without GenAI. The model outputs and the
+review assessment are kept as they are.
+"""
+from __future__ import annotations
+
+import json
+from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .batch import context_from_row, read_manifest
+from .chains import DeliveryContext
+from .config import WorkflowConfig
+from .engine import get_scoring_engine
+from .events import build_event_backend, get_event_writer, quality_event_row
+from .scoring import DeliveryBatch, score_batch
+
+METRIC_FIELDS = ("location_accuracy", "timeliness", "package_quality", "quality_index")
+
+
+def _record_context(
+    record: Mapping[str, Any], contexts: Optional[Mapping[str, DeliveryContext]]
+) -> DeliveryContext:
+    object_name = record.get("object_name") or (record.get("metadata") or {}).get("object_name") or ""
+    if record.get("delivery"):
+        return context_from_row({"object_name": object_name, **record["delivery"]})
+    if contexts is not None and object_name in contexts:
+        return contexts[object_name]
+    raise ValueError(f"No delivery context stored or in the manifest for {object_name!r}")
+
+
+def rescore_records(
+    records: Iterable[Mapping[str, Any]],
+    config: WorkflowConfig,
+    contexts: Optional[Mapping[str, DeliveryContext]] = None,
+    chunk_size: int = 10000,
+    summary: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield each record with ``quality_metrics`` recomputed under ``config``.
+
+    Records from before results carried their ``delivery`` inputs are
+    matched to ``contexts`` by object name. Records that cannot be scored
+    are yielded with an ``error`` field. Counts are added to ``summary``.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    summary = summary if summary is not None else {}
+    for key in ("rescored", "unchanged", "failed"):
+        summary.setdefault(key, 0)
+    engine = get_scoring_engine(config)
+    version = engine.version
+
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        pending: List[Tuple[int, DeliveryContext]] = []
+        output: List[Dict[str, Any]] = []
+        for record in chunk:
+            record = dict(record)
+            output.append(record)
+            if "error" in record:
+                summary["failed"] += 1
+                continue
+            if record.get("degraded"):
+                # Scored without GenAI; there is nothing to re-score until re-inference
+                summary["degraded"] = summary.get("degraded", 0) + 1
+                continue
+            if (record.get("quality_metrics") or {}).get("config_version") == version:
+                summary["unchanged"] += 1
+                continue
+            try:
+                if "exif" not in record or "damage_report" not in record:
+                    raise ValueError("Record has no stored exif or damage_report")
+                pending.append((len(output) - 1, _record_context(record, contexts)))
+            except ValueError as error:
+                record["error"] = str(error)
+                summary["failed"] += 1
+
+        if pending:
+            batch = DeliveryBatch.from_deliveries(
+                [context for _, context in pending],
+                [output[index]["exif"] for index, _ in pending],
+                [output[index]["damage_report"] for index, _ in pending],
+            )
+            scores = score_batch(batch, engine.quality_weights, engine.max_distance_meters, config=config)
+            rescored_at = datetime.now(timezone.utc).isoformat()
+            for row, (index, _) in enumerate(pending):
+                metrics: Dict[str, Any] = {field: float(scores[field][row]) for field in METRIC_FIELDS}
+                metrics["config_version"] = version
+                metrics["rescored_at"] = rescored_at
+                output[index]["quality_metrics"] = metrics
+            summary["rescored"] += len(pending)
+
+        yield from output
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def rescore_file(
+    config: WorkflowConfig,
+    input_path: str,
+    output_path: str,
+    manifest_path: Optional[str] = None,
+    chunk_size: int = 10000,
+) -> Dict[str, int]:
+    """Re-score a results JSONL (as written by batch mode) into ``output_path``.
+
+    ``manifest_path`` supplies delivery contexts for results written before
+    they carried their own.
+    """
+    contexts = (
+        {context.object_name: context for context in read_manifest(manifest_path)} if manifest_path else None
+    )
+    summary: Dict[str, int] = {}
+    with open(output_path, "w", encoding="utf-8") as output:
+        for record in rescore_records(_read_jsonl(input_path), config, contexts, chunk_size, summary):
+            output.write(json.dumps(record, default=str) + "\n")
+    return summary
+
+
+def rescore_event_store(config: WorkflowConfig, chunk_size: int = 10000) -> Dict[str, int]:
+    """Re-score every event in the configured event store, upserting in place."""
+    reader = build_event_backend(config.events, config.database_table)
+    writer = get_event_writer(config)
+    if reader is None or writer is None:
+        raise ValueError("Re-scoring the event store needs QUALITY_BACKEND set to sqlite or adw.")
+
+    # rescore_records yields exactly one record per input, in order
+    origins: Deque[Tuple[str, str, Optional[str]]] = deque()
+
+    def records() -> Iterator[Dict[str, Any]]:
+        for object_name, etag, payload in reader.read_payloads():
+            record = json.loads(payload)
+            origins.append((object_name, etag, (record.get("quality_metrics") or {}).get("config_version")))
+            yield record
+
+    version = config.scoring_version()
+    summary: Dict[str, int] = {}
+    try:
+        for record in rescore_records(records(), config, chunk_size=chunk_size, summary=summary):
+            object_name, etag, previous_version = origins.popleft()
+            if "error" in record or previous_version == version:
+                continue
+            row = quality_event_row(record, object_name=object_name)
+            row["etag"] = etag
+            writer.write(row)
+        writer.flush()
+    finally:
+        reader.close()
+    return summary
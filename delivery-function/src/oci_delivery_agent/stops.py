@@ -0,0 +1,216 @@
+"""Nearest planned stop lookups for photo GPS positions.
+
+A stops file lists every planned drop-off on a route (``stop_id``,
+``latitude``, ``longitude`` and an optional ``route_id``) as CSV or JSONL.
+:class:`StopIndex` keeps the stops in a k-d tree over unit-sphere
+coordinates. Straight-line distance there orders points the same way as
+great-circle distance, with no special cases at the poles or the
+antimeridian, so a nearest-stop query only visits a few dozen nodes even
+for large routes.
+
+The index resolves deliveries whose event carries a ``stopId`` but no
+expected coordinates, and :func:`stop_match` flags photos taken nearer to
+another planned stop than the one they were scheduled for.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+from dataclasses import dataclass
+from math import asin, cos, radians, sin
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .engine import EARTH_RADIUS_M
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .chains import DeliveryContext
+
+STOP_FIELDS = ("stop_id", "latitude", "longitude")
+
+
+@dataclass(frozen=True)
+class Stop:
+    """One planned drop-off point."""
+
+    stop_id: str
+    latitude: float
+    longitude: float
+    route_id: Optional[str] = None
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    lat, lon = radians(latitude), radians(longitude)
+    return (cos(lat) * cos(lon), cos(lat) * sin(lon), sin(lat))
+
+
+def _chord_to_meters(chord_squared: float) -> float:
+    return EARTH_RADIUS_M * 2 * asin(min(1.0, chord_squared ** 0.5 / 2))
+
+
+def distance_meters(latitude: float, longitude: float, other_latitude: float, other_longitude: float) -> float:
+    """Great-circle distance between two positions."""
+    a = _unit_vector(latitude, longitude)
+    b = _unit_vector(other_latitude, other_longitude)
+    return _chord_to_meters((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+
+def stop_from_row(row: Mapping[str, Any]) -> Stop:
+    """Build a stop from a stops file row."""
+    missing = [field for field in STOP_FIELDS if row.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Stop row is missing fields {missing}: {dict(row)}")
+    return Stop(
+        stop_id=str(row["stop_id"]),
+        latitude=float(row["latitude"]),
+        longitude=float(row["longitude"]),
+        route_id=str(row["route_id"]) if row.get("route_id") not in (None, "") else None,
+    )
+
+
+def read_stops(path: str) -> Iterator[Stop]:
+    """Yield stops from a ``.csv`` or JSONL stops file."""
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(handle):
+                yield stop_from_row(row)
+            return
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield stop_from_row(json.loads(line))
+
+
+class StopIndex:
+    """Immutable k-d tree of planned stops answering nearest-stop queries."""
+
+    def __init__(self, stops: Iterable[Stop]):
+        self._stops: List[Stop] = []
+        self._by_id: Dict[str, Stop] = {}
+        for stop in stops:
+            if stop.stop_id in self._by_id:
+                raise ValueError(f"Duplicate stop_id {stop.stop_id!r}")
+            self._by_id[stop.stop_id] = stop
+            self._stops.append(stop)
+
+        # Nodes are stored in flat lists; -1 marks a missing child
+        self._points: List[Tuple[float, float, float]] = []
+        self._node_stop: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        points = [_unit_vector(stop.latitude, stop.longitude) for stop in self._stops]
+        self._root = self._build(list(range(len(points))), points, depth=0)
+
+    def _build(self, indices: List[int], points: Sequence[Tuple[float, float, float]], depth: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda index: points[index][axis])
+        middle = len(indices) // 2
+        node = len(self._points)
+        self._points.append(points[indices[middle]])
+        self._node_stop.append(indices[middle])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(indices[:middle], points, depth + 1)
+        self._right[node] = self._build(indices[middle + 1:], points, depth + 1)
+        return node
+
+    def __len__(self) -> int:
+        return len(self._stops)
+
+    def get(self, stop_id: str) -> Optional[Stop]:
+        return self._by_id.get(stop_id)
+
+    def nearest(self, latitude: float, longitude: float) -> Optional[Tuple[Stop, float]]:
+        """Return the closest stop and its great-circle distance in meters."""
+        if self._root < 0:
+            return None
+        target = _unit_vector(latitude, longitude)
+        points, axes, left, right = self._points, self._axis, self._left, self._right
+        best_node, best = -1, float("inf")
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            point = points[node]
+            dx, dy, dz = point[0] - target[0], point[1] - target[1], point[2] - target[2]
+            distance = dx * dx + dy * dy + dz * dz
+            if distance < best:
+                best_node, best = node, distance
+            split = target[axes[node]] - point[axes[node]]
+            near, far = (left[node], right[node]) if split < 0 else (right[node], left[node])
+            # Visit the far side only if the splitting plane is closer than the best so far
+            if far >= 0 and split * split < best:
+                stack.append(far)
+            if near >= 0:
+                stack.append(near)
+        return self._stops[self._node_stop[best_node]], _chord_to_meters(best)
+
+
+def expected_position(index: Optional[StopIndex], stop_id: Optional[str]) -> Tuple[float, float]:
+    """Look up the planned coordinates for a delivery that only names its stop."""
+    if not stop_id:
+        raise ValueError("Delivery has no expected coordinates and no stop_id")
+    stop = index.get(stop_id) if index is not None else None
+    if stop is None:
+        raise ValueError(f"Stop {stop_id!r} is not in the stops file (set STOPS_FILE)")
+    return stop.latitude, stop.longitude
+
+
+def stop_match(
+    index: StopIndex, exif: Mapping[str, Any], context: "DeliveryContext", max_distance_meters: float
+) -> Optional[Dict[str, Any]]:
+    """Compare the photo's position with the planned stops.
+
+    The expected stop is ``context.stop_id`` when known, otherwise the stop
+    nearest the expected coordinates. ``wrong_stop`` is set when the photo
+    is nearer another stop and outside ``max_distance_meters`` of the
+    expected position. Returns ``None`` without photo GPS or stops.
+    """
+    gps_info = exif.get("GPSInfo") or {}
+    lat, lon = gps_info.get("latitude"), gps_info.get("longitude")
+    if lat is None or lon is None:
+        return None
+    nearest = index.nearest(float(lat), float(lon))
+    if nearest is None:
+        return None
+    stop, distance = nearest
+
+    expected_stop_id = context.stop_id
+    if expected_stop_id is None:
+        expected = index.nearest(context.expected_latitude, context.expected_longitude)
+        expected_stop_id = expected[0].stop_id if expected else None
+    expected_distance = distance_meters(float(lat), float(lon), context.expected_latitude, context.expected_longitude)
+    return {
+        "stop_id": stop.stop_id,
+        "route_id": stop.route_id,
+        "distance_meters": round(distance, 1),
+        "expected_stop_id": expected_stop_id,
+        "expected_distance_meters": round(expected_distance, 1),
+        "wrong_stop": stop.stop_id != expected_stop_id and expected_distance > max_distance_meters,
+    }
+
+
+_indexes: Dict[str, Tuple[int, StopIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_stop_index(path: Optional[str]) -> Optional[StopIndex]:
+    """Return the process-wide index for the stops file at ``path``.
+
+    The file is re-read when its modification time changes, so a warm
+    function instance picks up a new route plan on the next invocation.
+    """
+    if not path:
+        return None
+    key = os.path.abspath(path)
+    mtime = os.stat(key).st_mtime_ns
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, StopIndex(read_stops(key)))
+            _indexes[key] = cached
+        return cached[1]
@@ -1,23 +1,34 @@
-"""LangChain tools wrapping OCI services for the delivery workflow."""
+"""OCI service access for the delivery workflow tools.
+
+The LangChain ``BaseTool`` wrappers live in :mod:`.langchain_tools` and are
+re-exported here on first use, so code that only needs storage access or
+EXIF parsing (config checks, the function's ``extract`` test) does not pay
+for importing LangChain.
+"""
 from __future__ import annotations
 
-import base64
 import io
 import json
 import os
+from contextlib import nullcontext
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, Optional
-
-from langchain.tools import BaseTool
-from PIL import Image, ExifTags
-
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from . import clients
+from .artifacts import ImageArtifact, resolve_image
+from .breaker import get_circuit_breaker
+from .cache import cache_key, get_result_cache
+from .callpolicy import GenAIUnavailableError, get_call_policy, is_unavailable
+from .concurrency import get_adaptive_limiter
 from .config import WorkflowConfig
+from .exif import parse_jpeg_exif, read_exif_prefix
+from .genai_stream import stream_chat_text
+from .jsonscan import extract_json_object
+from .local_storage import get_local_backend
+from .streaming import DownloadStalledError, ObjectTooLargeError, read_stream
 
-try:  # pragma: no cover - optional dependency for real OCI calls
-    import oci
-except Exception:  # pragma: no cover - fall back to local mode when OCI SDK missing
-    oci = None
+# Loaded from .langchain_tools on first access (see __getattr__)
+_LANGCHAIN_TOOLS = ("ObjectRetrievalTool", "ExifExtractionTool", "ImageCaptionTool", "DamageDetectionTool", "toolset")
 
 
 class ObjectStorageClient:
@@ -25,40 +36,32 @@ class ObjectStorageClient:
 
     def __init__(self, config: WorkflowConfig):
         self._config = config
-        self._client = self._build_oci_client()
+        # Pins an SDK client when set; otherwise one is looked up per call
+        self._client = None
+        self._local = get_local_backend(config.local_asset_root)
 
     def _build_oci_client(self):  # pragma: no cover - requires OCI SDK & credentials
-        if oci is None:
-            return None
+        # The SDK is imported by the client registry; without it, use local mode
         try:
-            signer = None
-            config: Dict[str, Any] = {}
-            try:
-                from oci.auth.signers import get_resource_principals_signer
-
-                signer = get_resource_principals_signer()
-                signer_region = getattr(signer, "region", None)
-                resolved_region = os.environ.get("OCI_REGION") or signer_region or "us-ashburn-1"
-                config = {"region": resolved_region}
-                print(f"Using resource principal authentication for Object Storage client (region={resolved_region})")
-            except Exception as rp_error:
-                print(f"Resource principal signer unavailable for Object Storage: {rp_error}")
-                try:
-                    config = oci.config.from_file()
-                    print("Falling back to local OCI configuration for Object Storage")
-                except Exception as config_error:
-                    try:
-                        config = oci.config.from_file("~/.oci/config")
-                        print("Using ~/.oci/config for Object Storage client")
-                    except Exception:
-                        return None
-
-            if signer is not None:
-                return oci.object_storage.ObjectStorageClient(config=config, signer=signer)
-            return oci.object_storage.ObjectStorageClient(config)
+            return clients.get_object_storage_client(
+                read_timeout=self._config.object_storage.chunk_timeout_seconds
+            )
         except Exception:
             return None
 
+    def _live_client(self):
+        """Return the SDK client for a live call, or None in local/test mode.
+
+        The registry is consulted on every call, so a client rebuilt after a
+        credential refresh replaces the one used before.
+        """
+        storage = self._config.object_storage
+        if storage.namespace == "test" or storage.bucket_name == "test":
+            return None
+        if self._client is not None:
+            return self._client
+        return self._build_oci_client()
+
     def _resolve_object_name(self, object_name: str) -> str:
         prefix = self._config.object_storage.delivery_prefix or ""
         if object_name.startswith(prefix):
@@ -66,46 +69,72 @@ class ObjectStorageClient:
         return f"{prefix}{object_name}" if prefix else object_name
 
     def _load_local_file(self, object_name: str) -> Optional[Dict[str, Any]]:
-        root = Path(self._config.local_asset_root or ".")
-        candidate = root / object_name
-        if not candidate.exists():
-            candidate = root / self._resolve_object_name(object_name)
-        if not candidate.exists():
+        loaded = self._local.load(
+            object_name,
+            self._resolve_object_name(object_name),
+            max_bytes=self._config.object_storage.max_object_bytes,
+        )
+        if loaded is None:
             return None
-        payload = candidate.read_bytes()
+        path, payload = loaded
+        stat = os.stat(path)
         return {
             "data": payload,
+            "digest": None,
             "metadata": {
                 "content_type": "image/jpeg",
                 "size": len(payload),
-                "object_name": str(candidate),
+                "object_name": path,
+                # Stands in for the Object Storage ETag: changes whenever the file does
+                "etag": f"{stat.st_size:x}-{stat.st_mtime_ns:x}",
                 "retrieved_at": datetime.utcnow().isoformat(),
                 "source": "local",
             },
         }
 
+    def _read_body(self, stream: Any, expected_size: Optional[int]) -> Tuple[bytearray, Optional[str]]:
+        storage = self._config.object_storage
+        return read_stream(
+            stream,
+            max_bytes=storage.max_object_bytes,
+            expected_size=expected_size,
+            chunk_bytes=storage.read_chunk_bytes,
+            chunk_timeout=storage.chunk_timeout_seconds,
+            hash_while_reading=storage.hash_while_streaming,
+        )
+
     def get_object(self, object_name: str) -> Dict[str, Any]:
         resolved_name = self._resolve_object_name(object_name)
         
         # Try OCI first if client exists and namespace/bucket are not test values
-        if (self._client is not None and 
-            self._config.object_storage.namespace != "test" and 
-            self._config.object_storage.bucket_name != "test"):  # pragma: no cover - network interaction
+        client = self._live_client()
+        if client is not None:  # pragma: no cover - network interaction
             try:
-                response = self._client.get_object(
+                response = client.get_object(
                     namespace_name=self._config.object_storage.namespace,
                     bucket_name=self._config.object_storage.bucket_name,
                     object_name=resolved_name,
                 )
-                payload = response.data.content
+                content_length = response.headers.get("Content-Length")
+                try:
+                    # Stream the raw body instead of buffering .content unbounded
+                    payload, digest = self._read_body(
+                        response.data.raw,
+                        int(content_length) if content_length is not None else None,
+                    )
+                finally:
+                    response.data.close()
                 metadata = {
                     "content_type": response.headers.get("Content-Type", "application/octet-stream"),
                     "size": len(payload),
                     "object_name": resolved_name,
+                    "etag": response.headers.get("ETag"),
                     "retrieved_at": datetime.utcnow().isoformat(),
                     "source": "oci",
                 }
-                return {"data": payload, "metadata": metadata}
+                return {"data": payload, "digest": digest, "metadata": metadata}
+            except (ObjectTooLargeError, DownloadStalledError):
+                raise
             except Exception:
                 # Fall back to local on any error
                 pass
@@ -118,77 +147,137 @@ class ObjectStorageClient:
             )
         return local
 
+    def get_object_range(self, object_name: str, start: int, end: int) -> bytes:
+        """Return bytes ``start``..``end`` (inclusive) of an object, fewer at its end."""
+        resolved_name = self._resolve_object_name(object_name)
+
+        client = self._live_client()
+        if client is not None:  # pragma: no cover - network interaction
+            try:
+                response = client.get_object(
+                    namespace_name=self._config.object_storage.namespace,
+                    bucket_name=self._config.object_storage.bucket_name,
+                    object_name=resolved_name,
+                    range=f"bytes={start}-{end}",
+                )
+                return response.data.content
+            except Exception as error:
+                # 416: the range starts past the end of the object
+                if getattr(error, "status", None) == 416:
+                    return b""
+
+        path = self._local.find(object_name, resolved_name)
+        if path is None:
+            raise FileNotFoundError(
+                f"Could not locate {resolved_name}. Set LOCAL_ASSET_ROOT or provide a valid OCI configuration."
+            )
+        return self._local.read_range(path, start, end)
+
+    def put_object(
+        self,
+        object_name: str,
+        data: Union[bytes, bytearray, memoryview],
+        content_type: str = "image/jpeg",
+        resolve_name: bool = True,
+    ) -> Dict[str, Any]:
+        """Upload an object to OCI Object Storage, or store it under the local root.
+
+        ``resolve_name=False`` writes ``object_name`` as the exact key, without
+        the delivery prefix in front.
+        """
+        resolved_name = self._resolve_object_name(object_name) if resolve_name else object_name
+        storage = self._config.object_storage
+
+        client = self._live_client()
+        if client is not None:  # pragma: no cover - network interaction
+            try:
+                client.put_object(
+                    namespace_name=storage.namespace,
+                    bucket_name=storage.bucket_name,
+                    object_name=resolved_name,
+                    put_object_body=bytes(data),
+                    content_type=content_type,
+                )
+                return {
+                    "object_name": resolved_name,
+                    "namespace": storage.namespace,
+                    "bucket": storage.bucket_name,
+                    "size": len(data),
+                    "uploaded_at": datetime.utcnow().isoformat(),
+                    "storage_path": f"oci://{storage.namespace}/{storage.bucket_name}/{resolved_name}",
+                    "source": "oci",
+                }
+            except Exception as e:
+                print(f"Failed to upload to OCI, falling back to local: {e}")
+
+        path = self._local.put(resolved_name, data)
+        return {
+            "object_name": resolved_name,
+            "local_path": path,
+            "size": len(data),
+            "uploaded_at": datetime.utcnow().isoformat(),
+            "storage_path": f"file://{path}",
+            "source": "local",
+        }
+
+    def get_exif_prefix(self, object_name: str) -> bytes:
+        """Fetch only the leading bytes that hold the object's EXIF segment."""
+        return read_exif_prefix(
+            lambda start, end: self.get_object_range(object_name, start, end),
+            self._config.object_storage.exif_probe_bytes,
+        )
+
 
 class VisionClient:
     """Wrapper around OCI Vision deployments."""
 
+    # Generation parameters are part of the result cache key
+    CAPTION_PARAMS: Dict[str, Any] = {
+        "max_tokens": 800,
+        "temperature": 0.2,
+        "frequency_penalty": 0,
+        "presence_penalty": 0,
+        "top_p": 0.85,
+        "top_k": -1,
+    }
+    DAMAGE_PARAMS: Dict[str, Any] = {
+        "max_tokens": 800,
+        "temperature": 0.1,
+        "frequency_penalty": 0,
+        "presence_penalty": 0,
+        "top_p": 0.85,
+        "top_k": -1,
+    }
+    # Top-level keys a streamed response must have before reading stops early
+    CAPTION_KEYS = ("sceneType", "packageVisible")
+    DAMAGE_KEYS = ("overall", "indicators")
+    COMBINED_KEYS = ("caption", "damage")
+    # One response carries both reports, so it gets both token budgets
+    COMBINED_PARAMS: Dict[str, Any] = {
+        **DAMAGE_PARAMS,
+        "max_tokens": CAPTION_PARAMS["max_tokens"] + DAMAGE_PARAMS["max_tokens"],
+    }
+
     def __init__(self, config: WorkflowConfig):
         self._config = config
-        self._client = None
+        self._cache = get_result_cache(config.cache)
 
     def _get_genai_client(self):
-        """Initialize OCI GenAI client for vision"""
-        if self._client is None:
-            try:
-                import oci
-                from oci.generative_ai_inference import GenerativeAiInferenceClient
-                from oci.auth.signers import get_resource_principals_signer
-                
-                # Load OCI configuration
-                signer = None
-                oci_config: Dict[str, Any] = {}
-                try:
-                    signer = get_resource_principals_signer()
-                    signer_region = getattr(signer, "region", None)
-                    resolved_region = os.environ.get("OCI_REGION") or signer_region or "us-ashburn-1"
-                    oci_config = {"region": resolved_region}
-                    print(f"Using resource principal authentication for GenAI vision client (region={resolved_region})")
-                except Exception as err:
-                    print(f"Resource principal signer unavailable for GenAI client: {err}")
-                    try:
-                        oci_config = oci.config.from_file()
-                        print("Falling back to local OCI configuration for GenAI client")
-                    except Exception as config_error:
-                        try:
-                            oci_config = oci.config.from_file("~/.oci/config")
-                            print("Using ~/.oci/config for GenAI client")
-                        except Exception as fallback_error:
-                            raise RuntimeError(
-                                "Failed to initialize OCI authentication for GenAI client"
-                            ) from fallback_error
-                    signer = None
-                
-                # Get GenAI configuration from environment
-                hostname = os.environ.get('OCI_GENAI_HOSTNAME')
-                if not hostname:
-                    raise ValueError("OCI_GENAI_HOSTNAME must be set")
-                
-                # Remove endpoint path if included in hostname
-                if '/20231130/actions/generateText' in hostname:
-                    hostname = hostname.replace('/20231130/actions/generateText', '')
-                
-                # Initialize GenAI client
-                if signer is not None:
-                    self._client = GenerativeAiInferenceClient(
-                        config=oci_config,
-                        signer=signer,
-                        service_endpoint=hostname,
-                        retry_strategy=oci.retry.NoneRetryStrategy(),
-                        timeout=(10, 240)
-                    )
-                else:
-                    self._client = GenerativeAiInferenceClient(
-                        config=oci_config,
-                        service_endpoint=hostname,
-                        retry_strategy=oci.retry.NoneRetryStrategy(),
-                        timeout=(10, 240)
-                    )
-                
-            except Exception as e:
-                print(f"Error initializing OCI GenAI client: {e}")
-                raise RuntimeError(f"Failed to initialize OCI GenAI client: {e}")
-        
-        return self._client
+        """Return the process-wide OCI GenAI client for vision
+
+        Looked up per request rather than kept, so a client rebuilt after a
+        credential refresh is picked up.
+        """
+        try:
+            hostname = self._config.genai.hostname
+            if not hostname:
+                raise ValueError("OCI_GENAI_HOSTNAME must be set")
+
+            return clients.get_genai_client(hostname)
+
+        except Exception as e:
+            print(f"Error initializing OCI GenAI client: {e}")
+            raise RuntimeError(f"Failed to initialize OCI GenAI client: {e}")
 
     def _damage_json_prompt(self, caption_context: Optional[Dict[str, Any]] = None) -> str:
         """Return strict JSON-only prompt for damage assessment.
@@ -196,6 +285,15 @@ class VisionClient:
         Args:
             caption_context: Optional caption results to provide context about visible packages
         """
+        return (
+            "You are a delivery damage inspector. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
+            f"{self._damage_json_spec(caption_context)}"
+            "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
+            "Now analyze the image and output the JSON only."
+        )
+
+    def _damage_json_spec(self, caption_context: Optional[Dict[str, Any]] = None) -> str:
+        """Damage report schema, definitions and rules shared by the damage prompts."""
         # Get scoring thresholds from config
         scoring = self._config.damage_scoring
         
@@ -211,7 +309,6 @@ class VisionClient:
                 )
         
         return (
-            "You are a delivery damage inspector. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
             "{\n"
             "  \"overall\": { \"severity\": \"none|minor|moderate|severe\", \"score\": 0.0-1.0, \"rationale\": \"string\" },\n"
             "  \"indicators\": {\n"
@@ -239,88 +336,28 @@ class VisionClient:
             "- Keep evidence short and visual (what/where). Be precise, no speculation.\n"
             f"- If any of these keywords are observed: crushed, bent, bulging, tear, hole, dent, leak, wet, stain → minimum severity is 'minor' and score ≥ {scoring.minor_min}.\n"
             "- For plastic bags and soft containers: assess tears, holes, and structural integrity instead of box deformation.\n"
-            "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
-            "Now analyze the image and output the JSON only."
         )
 
     def _parse_damage_json(self, raw_text: str) -> Optional[Dict[str, Any]]:
-        """Parse a JSON report from model text; try substring recovery if needed."""
-        clean = raw_text.strip()
-        if clean.startswith("```"):
-            lines = [
-                line for line in clean.splitlines()
-                if not line.strip().startswith("```")
-            ]
-            clean = "\n".join(lines).strip()
-        try:
-            return json.loads(clean)
-        except Exception:
-            start = clean.find("{")
-            end = clean.rfind("}")
-            if start != -1 and end != -1 and end > start:
-                snippet = clean[start : end + 1]
-                try:
-                    return json.loads(snippet)
-                except Exception:
-                    return None
-            return None
+        """Parse the report object from model text in one pass (fences and prose are skipped)."""
+        return extract_json_object(raw_text)
 
     def _parse_caption_json(self, raw_text: str) -> Optional[Dict[str, Any]]:
-        """Parse caption JSON from model text; try substring recovery if needed."""
-        clean = raw_text.strip()
-        
-        # Remove markdown code blocks
-        if clean.startswith("```"):
-            lines = [
-                line for line in clean.splitlines()
-                if not line.strip().startswith("```")
-            ]
-            clean = "\n".join(lines).strip()
-        
-        # Try direct JSON parsing first
-        try:
-            return json.loads(clean)
-        except Exception:
-            pass
-        
-        # Try to find JSON object boundaries
-        start = clean.find("{")
-        end = clean.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            snippet = clean[start : end + 1]
-            try:
-                return json.loads(snippet)
-            except Exception:
-                pass
-        
-        # Try to find JSON array boundaries (in case it's wrapped in array)
-        start = clean.find("[")
-        end = clean.rfind("]")
-        if start != -1 and end != -1 and end > start:
-            snippet = clean[start : end + 1]
-            try:
-                parsed = json.loads(snippet)
-                if isinstance(parsed, list) and len(parsed) > 0:
-                    return parsed[0]  # Return first object if it's an array
-            except Exception:
-                pass
-        
-        # Try to extract JSON from common patterns
-        import re
-        json_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-        matches = re.findall(json_pattern, clean, re.DOTALL)
-        for match in matches:
-            try:
-                return json.loads(match)
-            except Exception:
-                continue
-        
-        return None
+        """Parse the caption object from model text; an array yields its first object."""
+        return extract_json_object(raw_text)
 
     def _caption_json_prompt(self) -> str:
         """Return structured JSON prompt for delivery scene caption."""
         return (
             "You are a delivery scene analyzer. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with this exact structure:\n\n"
+            f"{self._caption_json_spec()}"
+            "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
+            "Now analyze the image and output the JSON only."
+        )
+
+    def _caption_json_spec(self) -> str:
+        """Caption schema, definitions and rules shared by the caption prompts."""
+        return (
             "{\n"
             "  \"sceneType\": \"delivery|package|entrance|other\",\n"
             "  \"packageVisible\": true|false,\n"
@@ -360,81 +397,128 @@ class VisionClient:
             "- If no package is visible, set packageVisible=false and packageDescription=\"none\", but still describe the scene.\n"
             "- Keep descriptions factual and visual. No speculation about contents or ownership.\n"
             "- For weather/time, use \"unknown\" if not clearly visible.\n"
+        )
+
+    def _combined_json_prompt(self) -> str:
+        """Return one JSON prompt covering both the scene caption and the damage report."""
+        return (
+            "You are a delivery scene analyzer and damage inspector. Analyze the provided image and produce ONLY a single JSON object (no markdown, no preface, no trailing text) with exactly two keys:\n\n"
+            "{ \"caption\": <scene analysis object>, \"damage\": <damage assessment object> }\n\n"
+            "The \"caption\" object has this exact structure:\n\n"
+            f"{self._caption_json_spec()}\n"
+            "The \"damage\" object has this exact structure:\n\n"
+            f"{self._damage_json_spec()}\n"
+            "Combined output rules:\n"
+            "- caption.packageVisible and damage.packageVisible MUST agree.\n"
             "- Output MUST be valid JSON, UTF-8, no trailing commas, no extra commentary.\n\n"
             "Now analyze the image and output the JSON only."
         )
 
-    def generate_caption(self, image_bytes: bytes) -> str:
-        """Generate structured delivery scene caption using OCI GenAI Vision."""
+    def _inference_image(self, image: ImageArtifact) -> ImageArtifact:
+        """Downscaled variant shared by caption and damage calls for this photo."""
+        vision = self._config.vision
         try:
-            import oci
-            import base64
-            
-            # Get GenAI client
-            client = self._get_genai_client()
-            
-            # Encode image to base64
-            encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-            
-            # Get configuration
-            model_ocid = os.environ.get('OCI_TEXT_MODEL_OCID')
-            compartment_id = os.environ.get('OCI_COMPARTMENT_ID')
-            
-            if not model_ocid or not compartment_id:
-                return json.dumps({"error": "missing_credentials"})
-            
-            # Structured caption prompt
-            text_content = oci.generative_ai_inference.models.TextContent()
-            text_content.text = self._caption_json_prompt()
-            
-            # EXACT COPY from working console test - try ImageUrl first, fallback to source
-            try:
-                # Try to create ImageUrl structure (from console test)
-                image_url = oci.generative_ai_inference.models.ImageUrl()
-                image_url.url = f"data:image/jpeg;base64,{encoded_image}"
-                
-                # Create image content with ImageUrl
-                image_content = oci.generative_ai_inference.models.ImageContent()
-                image_content.image_url = image_url
-                
-            except Exception as e:
-                print(f"⚠️  ImageUrl structure not available: {e}")
-                # Fallback to source method (from console test)
-                image_content = oci.generative_ai_inference.models.ImageContent()
-                image_content.source = f"data:image/jpeg;base64,{encoded_image}"
-            
-            # EXACT COPY from working console test
-            message = oci.generative_ai_inference.models.Message()
-            message.role = "USER"
-            message.content = [text_content, image_content]  # Both text and image
-            
-            # Chat request with lower temperature for structured output
-            chat_request = oci.generative_ai_inference.models.GenericChatRequest()
-            chat_request.api_format = oci.generative_ai_inference.models.BaseChatRequest.API_FORMAT_GENERIC
-            chat_request.messages = [message]
-            chat_request.max_tokens = 800
-            chat_request.temperature = 0.2
-            chat_request.frequency_penalty = 0
-            chat_request.presence_penalty = 0
-            chat_request.top_p = 0.85
-            chat_request.top_k = -1
-            chat_request.is_stream = False
-            
-            # Serving mode
-            serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
-                endpoint_id=model_ocid
-            )
-            
-            # Chat details
-            chat_detail = oci.generative_ai_inference.models.ChatDetails()
-            chat_detail.serving_mode = serving_mode
-            chat_detail.chat_request = chat_request
-            chat_detail.compartment_id = compartment_id
+            return image.prepared(vision.max_image_long_edge, vision.jpeg_quality)
+        except Exception as e:
+            # Let the model judge bytes PIL cannot decode, as before preparation existed
+            print(f"Warning: Could not prepare image, sending original bytes: {e}")
+            return image
+
+    def _result_cache_key(
+        self,
+        kind: str,
+        image: ImageArtifact,
+        prompt: str,
+        model_ocid: str,
+        params: Dict[str, Any],
+    ) -> Optional[str]:
+        if self._cache is None:
+            return None
+        # Keyed on the original bytes plus preparation settings, so cache hits
+        # never pay for decoding and downscaling the photo
+        vision = self._config.vision
+        params = {
+            **params,
+            "max_image_long_edge": vision.max_image_long_edge,
+            "jpeg_quality": vision.jpeg_quality,
+        }
+        return cache_key(image.digest, kind, prompt, model_ocid, params)
+
+    def _chat_with_image(
+        self,
+        prompt: str,
+        image_data_url: str,
+        model_ocid: str,
+        compartment_id: str,
+        params: Dict[str, Any],
+        json_keys: Optional[Tuple[str, ...]] = None,
+    ) -> Optional[str]:
+        """Send one text+image chat request and return the first text choice.
+
+        With ``genai_streaming`` enabled the completion is streamed, and
+        reading stops once a JSON object with ``json_keys`` has closed.
+        """
+        import oci
+
+        # Get GenAI client
+        client = self._get_genai_client()
+
+        text_content = oci.generative_ai_inference.models.TextContent()
+        text_content.text = prompt
+        
+        # EXACT COPY from working console test - try ImageUrl first, fallback to source
+        try:
+            # Try to create ImageUrl structure (from console test)
+            image_url = oci.generative_ai_inference.models.ImageUrl()
+            image_url.url = image_data_url
             
-            # Get response
-            response = client.chat(chat_detail)
+            # Create image content with ImageUrl
+            image_content = oci.generative_ai_inference.models.ImageContent()
+            image_content.image_url = image_url
             
-            # Parse response and extract JSON
+        except Exception as e:
+            print(f"⚠️  ImageUrl structure not available: {e}")
+            # Fallback to source method (from console test)
+            image_content = oci.generative_ai_inference.models.ImageContent()
+            image_content.source = image_data_url
+        
+        # EXACT COPY from working console test
+        message = oci.generative_ai_inference.models.Message()
+        message.role = "USER"
+        message.content = [text_content, image_content]  # Both text and image
+        
+        # Chat request with low temperature for structured output
+        chat_request = oci.generative_ai_inference.models.GenericChatRequest()
+        chat_request.api_format = oci.generative_ai_inference.models.BaseChatRequest.API_FORMAT_GENERIC
+        chat_request.messages = [message]
+        chat_request.max_tokens = params["max_tokens"]
+        chat_request.temperature = params["temperature"]
+        chat_request.frequency_penalty = params["frequency_penalty"]
+        chat_request.presence_penalty = params["presence_penalty"]
+        chat_request.top_p = params["top_p"]
+        chat_request.top_k = params["top_k"]
+        chat_request.is_stream = self._config.genai_streaming
+        
+        # Serving mode
+        serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
+            endpoint_id=model_ocid
+        )
+        
+        # Chat details
+        chat_detail = oci.generative_ai_inference.models.ChatDetails()
+        chat_detail.serving_mode = serving_mode
+        chat_detail.chat_request = chat_request
+        chat_detail.compartment_id = compartment_id
+        
+        limiter = get_adaptive_limiter(self._config.adaptive_concurrency, model_ocid)
+
+        def chat() -> Optional[str]:
+            # Each request, hedges included, holds a slot until its answer is read
+            with limiter.slot("vision") if limiter is not None else nullcontext():
+                response = client.chat(chat_detail)
+                if chat_request.is_stream:
+                    return stream_chat_text(response, json_keys)
+
             if (response.data and 
                 hasattr(response.data, 'chat_response') and 
                 response.data.chat_response and
@@ -446,129 +530,205 @@ class VisionClient:
                 hasattr(response.data.chat_response.choices[0].message, 'content') and
                 response.data.chat_response.choices[0].message.content and
                 len(response.data.chat_response.choices[0].message.content) > 0):
-                
-                caption_text = response.data.chat_response.choices[0].message.content[0].text
-                
-                # Try to parse as JSON
-                caption_json = self._parse_caption_json(caption_text)
-                if caption_json is not None:
-                    return json.dumps(caption_json)
-                else:
-                    # Fallback: return raw text wrapped in JSON
-                    return json.dumps({"unstructured": caption_text})
-            else:
+                return response.data.chat_response.choices[0].message.content[0].text
+            return None
+
+        # Retried within the delivery deadline and, if enabled, hedged; an
+        # unhealthy endpoint is reported so the pipeline can degrade instead
+        policy = get_call_policy(
+            self._config.call_policy,
+            f"{model_ocid}/vision",
+            get_circuit_breaker(self._config.circuit_breaker, model_ocid),
+        )
+        try:
+            return policy.call(chat)
+        except GenAIUnavailableError:
+            raise
+        except Exception as error:
+            if is_unavailable(error):
+                raise GenAIUnavailableError(f"GenAI unavailable: {error}") from error
+            raise
+
+    def generate_caption(self, image: Union[ImageArtifact, bytes]) -> str:
+        """Generate structured delivery scene caption using OCI GenAI Vision."""
+        try:
+            # Get configuration
+            model_ocid = self._config.genai.model_ocid
+            compartment_id = self._config.genai.compartment_id
+            
+            if not model_ocid or not compartment_id:
+                return json.dumps({"error": "missing_credentials"})
+            
+            artifact = resolve_image(image)
+            prompt = self._caption_json_prompt()
+            key = self._result_cache_key("caption", artifact, prompt, model_ocid, self.CAPTION_PARAMS)
+            if key is not None:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    return cached
+            
+            # Prepared image and its data URL are built at most once per photo
+            caption_text = self._chat_with_image(
+                prompt,
+                self._inference_image(artifact).data_url(),
+                model_ocid,
+                compartment_id,
+                self.CAPTION_PARAMS,
+                self.CAPTION_KEYS,
+            )
+            if caption_text is None:
                 return json.dumps({"error": "no_caption_generated"})
+            
+            # Try to parse as JSON
+            caption_json = self._parse_caption_json(caption_text)
+            if caption_json is not None:
+                result = json.dumps(caption_json)
+                if key is not None:
+                    self._cache.put(key, result)
+                return result
+            # Fallback: return raw text wrapped in JSON
+            return json.dumps({"unstructured": caption_text})
                 
+        except GenAIUnavailableError:
+            raise
         except Exception as e:
             print(f"Error generating caption: {e}")
             return json.dumps({"error": str(e)})
 
-    def detect_damage(self, image_bytes: bytes, caption_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def detect_damage(
+        self,
+        image: Union[ImageArtifact, bytes],
+        caption_context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
         """Detect damage using GenAI with strict JSON output for indicators.
         
         Args:
-            image_bytes: The image data to analyze
+            image: Image handle (or raw bytes) to analyze
             caption_context: Optional caption results to provide context about visible packages
         """
         try:
-            import oci
-            import base64
-            
-            # Get GenAI client
-            client = self._get_genai_client()
-            
-            # Encode image to base64
-            encoded_image = base64.b64encode(image_bytes).decode('utf-8')
-            
             # Get configuration
-            model_ocid = os.environ.get('OCI_TEXT_MODEL_OCID')
-            compartment_id = os.environ.get('OCI_COMPARTMENT_ID')
+            model_ocid = self._config.genai.model_ocid
+            compartment_id = self._config.genai.compartment_id
             
             if not model_ocid or not compartment_id:
                 return {"error": "missing_credentials"}
             
-            # Strict JSON prompt for robust downstream parsing
-            text_content = oci.generative_ai_inference.models.TextContent()
-            text_content.text = self._damage_json_prompt(caption_context)
-            
-            # EXACT COPY from working console test - try ImageUrl first, fallback to source
-            try:
-                # Try to create ImageUrl structure (from console test)
-                image_url = oci.generative_ai_inference.models.ImageUrl()
-                image_url.url = f"data:image/jpeg;base64,{encoded_image}"
-                
-                # Create image content with ImageUrl
-                image_content = oci.generative_ai_inference.models.ImageContent()
-                image_content.image_url = image_url
-                
-            except Exception as e:
-                print(f"⚠️  ImageUrl structure not available: {e}")
-                # Fallback to source method (from console test)
-                image_content = oci.generative_ai_inference.models.ImageContent()
-                image_content.source = f"data:image/jpeg;base64,{encoded_image}"
-            
-            # EXACT COPY from working console test
-            message = oci.generative_ai_inference.models.Message()
-            message.role = "USER"
-            message.content = [text_content, image_content]  # Both text and image
+            # Strict JSON prompt for robust downstream parsing; the caption
+            # context is part of the prompt and therefore of the cache key
+            artifact = resolve_image(image)
+            prompt = self._damage_json_prompt(caption_context)
+            key = self._result_cache_key("damage", artifact, prompt, model_ocid, self.DAMAGE_PARAMS)
+            if key is not None:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    return json.loads(cached)
             
-            # EXACT COPY from working console test
-            chat_request = oci.generative_ai_inference.models.GenericChatRequest()
-            chat_request.api_format = oci.generative_ai_inference.models.BaseChatRequest.API_FORMAT_GENERIC
-            chat_request.messages = [message]
-            chat_request.max_tokens = 800
-            chat_request.temperature = 0.1
-            chat_request.frequency_penalty = 0
-            chat_request.presence_penalty = 0
-            chat_request.top_p = 0.85
-            chat_request.top_k = -1
-            chat_request.is_stream = False
-            
-            # EXACT COPY from working console test
-            serving_mode = oci.generative_ai_inference.models.DedicatedServingMode(
-                endpoint_id=model_ocid
+            assessment = self._chat_with_image(
+                prompt,
+                self._inference_image(artifact).data_url(),
+                model_ocid,
+                compartment_id,
+                self.DAMAGE_PARAMS,
+                self.DAMAGE_KEYS,
             )
+            if assessment is None:
+                return {"error": "no_response"}
             
-            # EXACT COPY from working console test
-            chat_detail = oci.generative_ai_inference.models.ChatDetails()
-            chat_detail.serving_mode = serving_mode
-            chat_detail.chat_request = chat_request
-            chat_detail.compartment_id = compartment_id
-            
-            # EXACT COPY from working console test
-            response = client.chat(chat_detail)
-            
-            # Parse JSON and extract only indicators
-            if (response.data and 
-                hasattr(response.data, 'chat_response') and 
-                response.data.chat_response and
-                hasattr(response.data.chat_response, 'choices') and 
-                response.data.chat_response.choices and
-                len(response.data.chat_response.choices) > 0 and
-                hasattr(response.data.chat_response.choices[0], 'message') and
-                response.data.chat_response.choices[0].message and
-                hasattr(response.data.chat_response.choices[0].message, 'content') and
-                response.data.chat_response.choices[0].message.content and
-                len(response.data.chat_response.choices[0].message.content) > 0):
-                
-                assessment = response.data.chat_response.choices[0].message.content[0].text
-                report = self._parse_damage_json(assessment)
-                
-                if report is not None:
-                    # Return complete report
-                    return report
-                else:
-                    # Fallback: return error if JSON parsing failed
-                    return {"error": "json_parse_failed"}
-
-            return {"error": "no_response"}
+            report = self._parse_damage_json(assessment)
+            if report is not None:
+                # Return complete report
+                if key is not None:
+                    self._cache.put(key, json.dumps(report))
+                return report
+            # Fallback: return error if JSON parsing failed
+            return {"error": "json_parse_failed"}
             
+        except GenAIUnavailableError:
+            raise
         except Exception as e:
             print(f"Error detecting damage: {e}")
             return {"error": str(e)}
 
+    def analyze_delivery(self, image: Union[ImageArtifact, bytes]) -> Tuple[str, Dict[str, Any]]:
+        """Caption the scene and assess damage with a single GenAI request.
+
+        Returns the same ``(caption_json, damage_report)`` pair that
+        :meth:`generate_caption` and :meth:`detect_damage` produce separately,
+        while uploading the image once. If the response lacks a usable caption
+        or damage object, that half is requested with its own prompt instead.
+        """
+        try:
+            model_ocid = self._config.genai.model_ocid
+            compartment_id = self._config.genai.compartment_id
+
+            if not model_ocid or not compartment_id:
+                return json.dumps({"error": "missing_credentials"}), {"error": "missing_credentials"}
+
+            artifact = resolve_image(image)
+            prompt = self._combined_json_prompt()
+            key = self._result_cache_key("combined", artifact, prompt, model_ocid, self.COMBINED_PARAMS)
+            if key is not None:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    combined = json.loads(cached)
+                    return json.dumps(combined["caption"]), combined["damage"]
+
+            response = self._chat_with_image(
+                prompt,
+                self._inference_image(artifact).data_url(),
+                model_ocid,
+                compartment_id,
+                self.COMBINED_PARAMS,
+                self.COMBINED_KEYS,
+            )
+            if response is None:
+                return json.dumps({"error": "no_caption_generated"}), {"error": "no_response"}
+
+            combined = self._parse_damage_json(response)
+            if not isinstance(combined, dict):
+                combined = {}
+            caption = combined.get("caption")
+            report = combined.get("damage")
+            if isinstance(caption, dict) and isinstance(report, dict):
+                if key is not None:
+                    self._cache.put(key, json.dumps({"caption": caption, "damage": report}))
+                return json.dumps(caption), report
+
+            print("Warning: Combined response was incomplete, falling back to separate calls")
+            caption_json = json.dumps(caption) if isinstance(caption, dict) else self.generate_caption(artifact)
+            if not isinstance(report, dict):
+                caption_context = json.loads(caption_json)
+                report = self.detect_damage(
+                    artifact,
+                    caption_context=caption_context if "error" not in caption_context else None,
+                )
+            return caption_json, report
+
+        except GenAIUnavailableError:
+            raise
+        except Exception as e:
+            print(f"Error analyzing delivery: {e}")
+            return json.dumps({"error": str(e)}), {"error": str(e)}
+
 
 def extract_exif(image_bytes: bytes) -> Dict[str, Any]:
+    """Return normalized GPS and timestamp EXIF data for an image.
+
+    JPEGs (or a leading prefix covering their APP1 segment) are parsed
+    directly; other formats and segments the fast reader rejects go through
+    PIL.
+    """
+    try:
+        raw_gps, timestamp = parse_jpeg_exif(bytes(image_bytes))
+    except Exception:
+        raw_gps, timestamp = _pil_exif(image_bytes)
+    return _normalize_exif(raw_gps, timestamp)
+
+
+def _pil_exif(image_bytes: bytes) -> Tuple[Optional[Dict[Any, Any]], Optional[str]]:
+    from PIL import ExifTags, Image
+
     with Image.open(io.BytesIO(image_bytes)) as img:
         exif_data_raw = img._getexif() or {}
 
@@ -580,7 +740,10 @@ def extract_exif(image_bytes: bytes) -> Dict[str, Any]:
             raw_gps = value
         elif tag in {"DateTimeOriginal", "DateTime"} and not timestamp:
             timestamp = value
+    return raw_gps, timestamp
+
 
+def _normalize_exif(raw_gps: Optional[Dict[Any, Any]], timestamp: Optional[str]) -> Dict[str, Any]:
     def _to_float(component: Any) -> Optional[float]:
         if component is None:
             return None
@@ -625,6 +788,8 @@ def extract_exif(image_bytes: bytes) -> Dict[str, Any]:
 
     gps_payload: Dict[str, Any] = {}
     if raw_gps:
+        from PIL import ExifTags  # tag names only; does not load PIL.Image
+
         gps_named = {
             ExifTags.GPSTAGS.get(key, key): value for key, value in raw_gps.items()
         }
@@ -652,93 +817,9 @@ def extract_exif(image_bytes: bytes) -> Dict[str, Any]:
     return clean_exif
 
 
-class ObjectRetrievalTool(BaseTool):
-    name: str = "retrieve_delivery_photo"
-    description: str = "Fetch delivery photo bytes and metadata from OCI Object Storage."
-
-    def __init__(self, config: WorkflowConfig):
-        super().__init__()
-        self._config = config
-        self._client = ObjectStorageClient(config)
-
-    def _run(self, object_name: str) -> str:
-        result = self._client.get_object(object_name)
-        payload = base64.b64encode(result["data"]).decode("utf-8")
-        return json.dumps({"payload": payload, "metadata": result["metadata"]})
+def __getattr__(name: str) -> Any:
+    if name in _LANGCHAIN_TOOLS:
+        from . import langchain_tools
 
-    async def _arun(self, object_name: str) -> str:  # pragma: no cover - async not implemented
-        raise NotImplementedError
-
-
-class ExifExtractionTool(BaseTool):
-    name: str = "extract_exif"
-    description: str = "Extract EXIF metadata including GPS coordinates from a delivery image."
-
-    def _run(self, encoded_payload: str) -> str:
-        image_bytes = base64.b64decode(encoded_payload)
-        exif = extract_exif(image_bytes)
-        return json.dumps(exif, default=str)
-
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover - async not implemented
-        raise NotImplementedError
-
-
-class ImageCaptionTool(BaseTool):
-    name: str = "caption_image"
-    description: str = "Generate structured delivery scene analysis as JSON (sceneType, package, location, environment, safetyAssessment)."
-
-    def __init__(self, config: WorkflowConfig):
-        super().__init__()
-        self._client = VisionClient(config)
-
-    def _run(self, encoded_payload: str) -> str:
-        image_bytes = base64.b64decode(encoded_payload)
-        caption = self._client.generate_caption(image_bytes)
-        return caption
-
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
-
-
-class DamageDetectionTool(BaseTool):
-    name: str = "detect_damage"
-    description: str = "Extract per-indicator damage assessment as JSON (boxDeformation, cornerDamage, leakage, packagingIntegrity)."
-
-    def __init__(self, config: WorkflowConfig):
-        super().__init__()
-        self._config = config
-        self._client = VisionClient(config)
-
-    def _run(self, encoded_payload: str, caption_context: Optional[str] = None) -> str:
-        """Run damage detection, optionally using caption context.
-        
-        Args:
-            encoded_payload: Base64-encoded image data
-            caption_context: Optional JSON string with caption results for context
-        """
-        image_bytes = base64.b64decode(encoded_payload)
-        
-        # Parse caption context if provided
-        context_dict = None
-        if caption_context:
-            try:
-                context_dict = json.loads(caption_context)
-            except json.JSONDecodeError:
-                print(f"Warning: Could not parse caption_context: {caption_context}")
-        
-        result = self._client.detect_damage(image_bytes, caption_context=context_dict)
-        return json.dumps(result)
-
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
-
-
-def toolset(config: WorkflowConfig) -> Dict[str, BaseTool]:
-    """Factory returning all tools keyed by workflow stage."""
-
-    return {
-        "retrieval": ObjectRetrievalTool(config),
-        "exif": ExifExtractionTool(),
-        "caption": ImageCaptionTool(config),
-        "damage": DamageDetectionTool(config),
-    }
+        return getattr(langchain_tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
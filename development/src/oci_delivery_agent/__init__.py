@@ -1,7 +1,22 @@
-"""OCI delivery agent package exposing workflow utilities."""
+"""OCI delivery agent package exposing workflow utilities.
 
-from .chains import DeliveryContext, run_quality_pipeline
-from .config import WorkflowConfig
+The exports below load on first access, so importing a lightweight
+submodule (for example ``oci_delivery_agent.config``) does not import
+LangChain.
+"""
+
+from typing import Any
 
 __all__ = ["DeliveryContext", "WorkflowConfig", "run_quality_pipeline"]
 
+
+def __getattr__(name: str) -> Any:
+    if name in ("DeliveryContext", "run_quality_pipeline"):
+        from . import chains
+
+        return getattr(chains, name)
+    if name == "WorkflowConfig":
+        from .config import WorkflowConfig
+
+        return WorkflowConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
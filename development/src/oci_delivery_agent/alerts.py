@@ -0,0 +1,351 @@
+"""Coalescing, asynchronous dispatch of Review alerts.
+
+:meth:`AlertDispatcher.submit` never blocks the scoring path: it drops the
+alert (and counts it) when the bounded queue is full. A background thread
+suppresses repeats for the same delivery or driver within the dedupe window,
+recording how many were suppressed instead of sending them, and groups the
+rest into one digest message per topic. A burst of Review results, such as
+a storm or a broken conveyor, therefore reaches on-call as a few digests
+rather than one page per photo.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from . import clients
+from .config import AlertConfig, WorkflowConfig
+
+logger = logging.getLogger(__name__)
+
+_SEND_ATTEMPTS = 3
+_FLUSH = object()
+_FLUSH_DUE = object()
+_STOP = object()
+
+
+@dataclass
+class Alert:
+    """One delivery that needs review."""
+
+    topic: str
+    object_name: str
+    status: str
+    driver_id: Optional[str] = None
+    quality_index: Optional[float] = None
+    issues: List[str] = field(default_factory=list)
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+
+
+def review_alert(
+    config: WorkflowConfig,
+    workflow_output: Mapping[str, Any],
+    object_name: Optional[str] = None,
+    driver_id: Optional[str] = None,
+) -> Alert:
+    """Build the alert for a workflow output, addressed to the configured topic."""
+    metadata = workflow_output.get("metadata") or {}
+    assessment = workflow_output.get("assessment") or {}
+    issues = assessment.get("issues") or []
+    return Alert(
+        topic=config.notification_topic_id or "default",
+        object_name=object_name or metadata.get("object_name") or "",
+        status=str(assessment.get("status") or "Review"),
+        driver_id=driver_id,
+        quality_index=(workflow_output.get("quality_metrics") or {}).get("quality_index"),
+        issues=[str(issue) for issue in issues] if isinstance(issues, list) else [str(issues)],
+    )
+
+
+def digest_message(topic: str, alerts: List[Alert], suppressed: Mapping[str, int]) -> Dict[str, Any]:
+    """Render one digest: a short title, a plain-text body and the raw alerts."""
+    repeats = sum(suppressed.values())
+    title = "1 delivery needs review" if len(alerts) == 1 else f"{len(alerts)} deliveries need review"
+    if repeats:
+        title += f" ({repeats} repeat alerts suppressed)"
+    lines = []
+    for alert in alerts:
+        line = f"- {alert.object_name}: {alert.status}"
+        if alert.quality_index is not None:
+            line += f" (quality {alert.quality_index})"
+        if alert.driver_id:
+            line += f", driver {alert.driver_id}"
+        if alert.issues:
+            line += f": {'; '.join(alert.issues)}"
+        lines.append(line)
+    if repeats:
+        lines.append("Suppressed repeats:")
+        lines.extend(f"- {key}: {count}" for key, count in sorted(suppressed.items()))
+    return {
+        "topic": topic,
+        "title": title,
+        "body": "\n".join(lines),
+        "alerts": [asdict(alert) for alert in alerts],
+        "suppressed": dict(suppressed),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class NotificationSink:
+    """Publish digests to OCI Notifications topics."""
+
+    def send(self, digest: Mapping[str, Any]) -> None:  # pragma: no cover - requires OCI SDK & credentials
+        import oci
+
+        clients.get_notification_client().publish_message(
+            digest["topic"],
+            oci.ons.models.MessageDetails(title=digest["title"][:255], body=digest["body"]),
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class FileSink:
+    """Append digests as JSON lines; a local stand-in for Notifications."""
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def send(self, digest: Mapping[str, Any]) -> None:
+        with open(self._path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(digest, default=str) + "\n")
+
+    def close(self) -> None:
+        pass
+
+
+class HttpSink:
+    """POST digests as JSON to a webhook; a stand-in for Notifications."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self._url = url
+        self._timeout = timeout
+
+    def send(self, digest: Mapping[str, Any]) -> None:
+        import urllib.request
+
+        request = urllib.request.Request(
+            self._url,
+            data=json.dumps(digest, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            response.read()
+
+    def close(self) -> None:
+        pass
+
+
+def build_alert_sink(config: AlertConfig) -> Optional[Any]:
+    """Return the sink selected by ``config``, or ``None`` when disabled."""
+    if config.sink == "ons":
+        return NotificationSink()
+    if config.sink == "file":
+        return FileSink(config.file_path)
+    if config.sink == "http":
+        return HttpSink(config.http_url)
+    return None
+
+
+class AlertDispatcher:
+    """Deduplicate alerts and send them to ``sink`` as per-topic digests."""
+
+    def __init__(
+        self,
+        sink: Any,
+        dedupe_window_seconds: float = 600.0,
+        digest_interval_seconds: float = 60.0,
+        max_digest_alerts: int = 50,
+        max_queue: int = 1000,
+    ):
+        self._sink = sink
+        self._window = dedupe_window_seconds
+        self._interval = digest_interval_seconds
+        self._max_digest_alerts = max_digest_alerts
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._outstanding = 0
+        self._idle = threading.Condition()
+        self._closed = False
+        # Owned by the dispatcher thread
+        self._last_sent: Dict[Tuple[str, str], float] = {}
+        self._pending: Dict[str, List[Alert]] = {}
+        self._suppressed: Dict[str, Dict[str, int]] = {}
+        self._deadlines: Dict[str, float] = {}
+        self._accepted: Dict[str, int] = {}
+        self.stats = {"sent": 0, "digests": 0, "suppressed": 0, "dropped": 0, "failed": 0}
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, alert: Alert) -> bool:
+        """Queue ``alert`` without blocking; return ``False`` if it was dropped."""
+        if self._closed:
+            raise RuntimeError("Alert dispatcher is closed.")
+        with self._idle:
+            self._outstanding += 1
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            self._settle(1)
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send every waiting digest now; return ``False`` if still pending at ``timeout``."""
+        try:
+            self._queue.put_nowait(_FLUSH)
+        except queue.Full:
+            # The thread is busy with a full queue; just wait for it
+            pass
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout=timeout)
+
+    def flush_due(self, timeout: Optional[float] = None) -> bool:
+        """Send the digests whose interval has ended; return ``False`` if still sending at ``timeout``.
+
+        Digests still inside their interval keep collecting alerts, so
+        callers that flush often (once per function invocation) do not cut
+        every digest down to the alerts of one call.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        sent = threading.Event()
+        try:
+            self._queue.put((_FLUSH_DUE, sent), timeout=timeout)
+        except queue.Full:
+            return False
+        return sent.wait(None if deadline is None else max(deadline - time.monotonic(), 0.0))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Send waiting digests and stop the dispatcher thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._sink.close()
+
+    def _settle(self, count: int) -> None:
+        with self._idle:
+            self._outstanding -= count
+            if self._outstanding == 0:
+                self._idle.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            timeout = max(0.0, min(self._deadlines.values()) - time.monotonic()) if self._deadlines else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP or item is _FLUSH:
+                for topic in list(self._deadlines):
+                    self._send_digest(topic)
+                if item is _STOP:
+                    return
+                continue
+            sent = None
+            if isinstance(item, tuple) and item[0] is _FLUSH_DUE:
+                sent = item[1]
+            elif item is not None:
+                self._admit(item)
+            now = time.monotonic()
+            for topic, deadline in list(self._deadlines.items()):
+                if deadline <= now or len(self._pending.get(topic, ())) >= self._max_digest_alerts:
+                    self._send_digest(topic)
+            if sent is not None:
+                sent.set()
+
+    def _admit(self, alert: Alert) -> None:
+        now = time.monotonic()
+        keys = [("delivery", alert.object_name)]
+        if alert.driver_id:
+            keys.append(("driver", alert.driver_id))
+        self._deadlines.setdefault(alert.topic, now + self._interval)
+        self._accepted[alert.topic] = self._accepted.get(alert.topic, 0) + 1
+        repeat = next((key for key in keys if now - self._last_sent.get(key, float("-inf")) < self._window), None)
+        if repeat is not None:
+            label = f"{repeat[0]} {repeat[1]}"
+            counts = self._suppressed.setdefault(alert.topic, {})
+            counts[label] = counts.get(label, 0) + 1
+            self.stats["suppressed"] += 1
+            return
+        for key in keys:
+            self._last_sent[key] = now
+        self._pending.setdefault(alert.topic, []).append(alert)
+        if len(self._last_sent) > 10 * self._queue.maxsize:
+            self._last_sent = {key: seen for key, seen in self._last_sent.items() if now - seen < self._window}
+
+    def _send_digest(self, topic: str) -> None:
+        alerts = self._pending.pop(topic, [])
+        suppressed = self._suppressed.pop(topic, {})
+        self._deadlines.pop(topic, None)
+        accepted = self._accepted.pop(topic, 0)
+        try:
+            if alerts or suppressed:
+                self._deliver(digest_message(topic, alerts, suppressed), len(alerts))
+        finally:
+            self._settle(accepted)
+
+    def _deliver(self, digest: Dict[str, Any], alert_count: int) -> None:
+        for attempt in range(_SEND_ATTEMPTS):
+            try:
+                self._sink.send(digest)
+                self.stats["sent"] += alert_count
+                self.stats["digests"] += 1
+                return
+            except Exception as error:
+                if attempt + 1 == _SEND_ATTEMPTS:
+                    self.stats["failed"] += alert_count
+                    logger.warning(
+                        "Dropped alert digest for %s after %d attempts: %s", digest["topic"], _SEND_ATTEMPTS, error
+                    )
+                    return
+                time.sleep(0.5 * 2 ** attempt)
+
+
+_dispatchers: Dict[Tuple[Any, ...], AlertDispatcher] = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_alert_dispatcher(config: WorkflowConfig) -> Optional[AlertDispatcher]:
+    """Return the process-wide dispatcher for ``config``, or ``None`` when disabled.
+
+    The Notifications sink is disabled when no topic is configured.
+    """
+    alerts = config.alerts
+    if alerts.sink == "none" or (alerts.sink == "ons" and not config.notification_topic_id):
+        return None
+    key = (alerts.sink, alerts.file_path, alerts.http_url)
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(key)
+        if dispatcher is None or dispatcher.closed:
+            dispatcher = AlertDispatcher(
+                build_alert_sink(alerts),
+                dedupe_window_seconds=alerts.dedupe_window_seconds,
+                digest_interval_seconds=alerts.digest_interval_seconds,
+                max_digest_alerts=alerts.max_digest_alerts,
+                max_queue=alerts.max_queue,
+            )
+            _dispatchers[key] = dispatcher
+        return dispatcher
+
+
+@atexit.register
+def _close_dispatchers() -> None:
+    with _dispatchers_lock:
+        for dispatcher in _dispatchers.values():
+            dispatcher.close(timeout=30)
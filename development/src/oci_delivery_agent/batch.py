@@ -0,0 +1,167 @@
+"""Bulk scoring of delivery manifests with resumable checkpoints."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterator, Mapping, Optional, Set
+
+from langchain_core.language_models import BaseLLM
+
+from .chains import DeliveryContext, pipeline_chains, run_quality_pipeline
+from .config import WorkflowConfig
+from .events import get_event_writer, quality_event_row
+from .stops import StopIndex, expected_position, get_stop_index
+from .langchain_tools import toolset
+
+MANIFEST_FIELDS = (
+    "object_name",
+    "expected_latitude",
+    "expected_longitude",
+    "promised_time",
+    "delivered_time",
+)
+
+
+def _optional(row: Mapping[str, Any], field: str) -> Optional[str]:
+    return str(row[field]) if row.get(field) not in (None, "") else None
+
+
+def context_from_row(row: Mapping[str, Any], stops: Optional[StopIndex] = None) -> DeliveryContext:
+    """Build a delivery context from a manifest row (or a result's ``delivery``).
+
+    Rows without expected coordinates take them from ``stops`` by ``stop_id``.
+    """
+    stop_id = _optional(row, "stop_id")
+    from_stop = stops is not None and stop_id is not None and row.get("expected_latitude") in (None, "")
+    required = [field for field in MANIFEST_FIELDS if not (from_stop and field.startswith("expected_"))]
+    missing = [field for field in required if row.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Manifest row is missing fields {missing}: {dict(row)}")
+    if from_stop:
+        expected = expected_position(stops, stop_id)
+    else:
+        expected = (float(row["expected_latitude"]), float(row["expected_longitude"]))
+    return DeliveryContext(
+        object_name=str(row["object_name"]),
+        expected_latitude=expected[0],
+        expected_longitude=expected[1],
+        promised_time_utc=datetime.fromisoformat(str(row["promised_time"])),
+        delivered_time_utc=datetime.fromisoformat(str(row["delivered_time"])),
+        driver_id=_optional(row, "driver_id"),
+        stop_id=stop_id,
+    )
+
+
+def read_manifest(path: str, stops: Optional[StopIndex] = None) -> Iterator[DeliveryContext]:
+    """Yield delivery contexts from a ``.csv`` or JSONL manifest, one row at a time."""
+    with open(path, newline="", encoding="utf-8") as handle:
+        if path.lower().endswith(".csv"):
+            for row in csv.DictReader(handle):
+                yield context_from_row(row, stops)
+            return
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield context_from_row(json.loads(line), stops)
+
+
+def load_checkpoint(path: Optional[str]) -> Set[str]:
+    """Return the object names already completed by an earlier run."""
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as handle:
+        return {line.strip() for line in handle if line.strip()}
+
+
+def run_batch(
+    config: WorkflowConfig,
+    llm: BaseLLM,
+    manifest_path: str,
+    output_path: str,
+    checkpoint_path: Optional[str] = None,
+    workers: int = 4,
+) -> Dict[str, int]:
+    """Score every manifest entry, streaming results to ``output_path``.
+
+    One toolset (and therefore one set of OCI clients) and one set of prompt
+    chains are shared by all workers. Each completed delivery is appended to
+    the output before its object name is appended to the checkpoint, so an
+    interrupted run resumes after the last checkpointed entry; at worst an
+    entry that finished right before the interruption is written twice.
+    Failed entries are written with an ``error`` field and left out of the
+    checkpoint so a rerun retries them. When an event store is configured,
+    successful results are also queued as quality events and flushed before
+    this returns. With a stops file configured, manifest rows may give a
+    ``stop_id`` instead of expected coordinates, and photos taken at the
+    wrong stop are counted under ``wrong_stop``. Deliveries scored without
+    GenAI while its circuit breaker was open are counted under ``degraded``
+    and, like failures, left out of the checkpoint.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+
+    tools = toolset(config)
+    chains = pipeline_chains(config, llm)
+    events = get_event_writer(config)
+    stops = get_stop_index(config.geolocation.stops_path)
+    completed = load_checkpoint(checkpoint_path)
+    summary = {"processed": 0, "failed": 0, "skipped": 0}
+    if stops is not None:
+        summary["wrong_stop"] = 0
+
+    def score(context: DeliveryContext) -> Dict[str, Any]:
+        return run_quality_pipeline(
+            config=config,
+            llm=llm,
+            context=context,
+            object_name=context.object_name,
+            tools=tools,
+            chains=chains,
+        )
+
+    with open(output_path, "a", encoding="utf-8") as output, \
+            open(checkpoint_path or os.devnull, "a", encoding="utf-8") as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-delivery") as executor:
+        in_flight: Dict[Any, DeliveryContext] = {}
+
+        def drain(block_until_below: int) -> None:
+            while len(in_flight) >= block_until_below and in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    context = in_flight.pop(future)
+                    try:
+                        record = {"object_name": context.object_name, **future.result()}
+                        summary["processed"] += 1
+                        if (record.get("stop_match") or {}).get("wrong_stop"):
+                            summary["wrong_stop"] += 1
+                    except Exception as error:
+                        record = {"object_name": context.object_name, "error": str(error)}
+                        summary["failed"] += 1
+                    output.write(json.dumps(record, default=str) + "\n")
+                    output.flush()
+                    if "error" not in record:
+                        if events is not None:
+                            events.write(quality_event_row(record, object_name=context.object_name))
+                        if record.get("degraded"):
+                            # Scored without GenAI: a rerun should assess the photo
+                            summary["degraded"] = summary.get("degraded", 0) + 1
+                            continue
+                        checkpoint.write(context.object_name + "\n")
+                        checkpoint.flush()
+
+        for context in read_manifest(manifest_path, stops):
+            if context.object_name in completed:
+                summary["skipped"] += 1
+                continue
+            # Bound queued work so huge manifests stream instead of loading at once
+            drain(block_until_below=workers * 2)
+            in_flight[executor.submit(score, context)] = context
+
+        drain(block_until_below=1)
+
+    if events is not None:
+        events.flush()
+    return summary
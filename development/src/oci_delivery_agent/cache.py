@@ -0,0 +1,189 @@
+"""Content-addressed cache for GenAI vision results.
+
+Keys combine the SHA-256 of the image bytes with everything else that
+determines the model output: the call kind, the full prompt text, the model
+or endpoint OCID and the generation parameters. Results live in an in-memory
+LRU tier bounded by bytes and, optionally, an SQLite tier with a TTL that
+survives container restarts and is shared by reprocessing runs.
+"""
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .config import CacheConfig
+
+_CACHE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS genai_results ("
+    " cache_key TEXT PRIMARY KEY,"
+    " value TEXT NOT NULL,"
+    " created_at REAL NOT NULL)"
+)
+
+
+def cache_key(
+    image_digest: str,
+    kind: str,
+    prompt: str,
+    model_id: str,
+    params: Mapping[str, Any],
+) -> str:
+    """Return a stable key for one multimodal request."""
+    material = json.dumps(
+        {
+            "image": image_digest,
+            "kind": kind,
+            "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "model": model_id,
+            "params": dict(sorted(params.items())),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Hit/miss counters, safe to update from concurrent stages."""
+
+    def __init__(self) -> None:
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            if outcome == "memory":
+                self.memory_hits += 1
+            elif outcome == "disk":
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.memory_hits + self.disk_hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+        }
+
+
+_run_stats: contextvars.ContextVar[Optional[CacheStats]] = contextvars.ContextVar(
+    "genai_cache_run_stats", default=None
+)
+
+
+@contextmanager
+def track_cache_stats() -> Iterator[CacheStats]:
+    """Collect cache outcomes for lookups made within this context (one delivery)."""
+    stats = CacheStats()
+    token = _run_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _run_stats.reset(token)
+
+
+class ResultCache:
+    """Two-tier (memory LRU + optional SQLite) result cache."""
+
+    def __init__(self, memory_max_bytes: int, disk_path: Optional[str] = None, ttl_seconds: float = 0.0):
+        self._memory_max_bytes = memory_max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        self._db: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_CACHE_SCHEMA)
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS genai_results_created_at ON genai_results (created_at)"
+            )
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self._ttl_seconds > 0 and now - created_at > self._ttl_seconds
+
+    def _record(self, outcome: str) -> None:
+        self.stats.record(outcome)
+        run_stats = _run_stats.get()
+        if run_stats is not None:
+            run_stats.record(outcome)
+
+    def _remember(self, key: str, value: str, created_at: float) -> None:
+        size = len(value)
+        if size > self._memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[0])
+        self._memory[key] = (value, created_at)
+        self._memory_bytes += size
+        while self._memory_bytes > self._memory_max_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1], now):
+                    self._memory.move_to_end(key)
+                    self._record("memory")
+                    return entry[0]
+                self._memory.pop(key)
+                self._memory_bytes -= len(entry[0])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM genai_results WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[1], now):
+                    self._remember(key, row[0], row[1])
+                    self._record("disk")
+                    return row[0]
+
+            self._record("miss")
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO genai_results (cache_key, value, created_at) VALUES (?, ?, ?)",
+                    (key, value, now),
+                )
+                if self._ttl_seconds > 0:
+                    self._db.execute(
+                        "DELETE FROM genai_results WHERE created_at < ?", (now - self._ttl_seconds,)
+                    )
+
+
+_caches: Dict[Tuple[int, Optional[str], float], ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(config: CacheConfig) -> Optional[ResultCache]:
+    """Return the process-wide cache for ``config``, or ``None`` when disabled."""
+    if not config.enabled:
+        return None
+    key = (config.memory_max_bytes, config.disk_path, config.ttl_seconds)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = ResultCache(config.memory_max_bytes, config.disk_path, config.ttl_seconds)
+            _caches[key] = cache
+        return cache
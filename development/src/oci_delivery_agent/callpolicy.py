@@ -0,0 +1,330 @@
+"""Retries, deadlines and hedged requests for GenAI calls.
+
+The GenAI client is built without SDK retries and with a long read timeout,
+so on its own one stuck chat call can hold a delivery for most of the
+function timeout. :class:`CallPolicy` wraps each call instead:
+
+* throttling (429), server (5xx) and timeout errors are retried after a
+  jittered exponential backoff, other errors are raised at once;
+* every wait is bounded by the delivery's deadline, set with
+  :func:`request_deadline` and carried in a context variable, so a retry
+  that cannot finish in time is not started and a call still running at
+  the deadline raises :class:`DeadlineExceeded`;
+* optionally, once a call has outlasted the endpoint's observed p95
+  latency, a duplicate request is sent and the first answer is used.
+  Tail latency comes from a few stuck calls, which a second request
+  sidesteps for about 5% extra load.
+
+Blocking SDK calls cannot be interrupted: a call abandoned at the deadline
+or beaten by its hedge keeps its worker thread until the SDK's own timeout.
+"""
+from __future__ import annotations
+
+import bisect
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import astuple
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .breaker import CircuitBreaker
+from .config import CallPolicyConfig
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = frozenset({408, 429})
+# Exception class names (anywhere in the MRO) raised by requests/urllib3 and
+# wrapped by the OCI SDK for connection failures and timeouts
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "Timeout",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "ReadTimeoutError",
+    "ConnectTimeoutError",
+    "ConnectionError",
+    "ChunkedEncodingError",
+    "ProtocolError",
+})
+
+
+class DeadlineExceeded(TimeoutError):
+    """The delivery's deadline passed before a GenAI call completed."""
+
+
+class GenAIUnavailableError(RuntimeError):
+    """GenAI could not answer: its circuit is open, or it failed or stalled past retries."""
+
+
+class CircuitOpenError(GenAIUnavailableError):
+    """The endpoint's circuit breaker refused the call."""
+
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "genai_request_deadline", default=None
+)
+
+
+@contextmanager
+def request_deadline(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Bound GenAI calls made within this context to ``seconds`` from now.
+
+    An enclosing deadline that is sooner still applies; ``None`` or ``0``
+    leaves the current deadline unchanged. Yields the effective deadline on
+    the :func:`time.monotonic` clock.
+    """
+    current = _deadline.get()
+    if seconds:
+        candidate = time.monotonic() + seconds
+        current = candidate if current is None else min(current, candidate)
+    token = _deadline.set(current)
+    try:
+        yield current
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds() -> Optional[float]:
+    """Seconds left before the current deadline, or ``None`` without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def invocation_seconds_left(ctx: Any) -> Optional[float]:
+    """Seconds until an OCI Function invocation's deadline, if ``ctx`` has one.
+
+    The FDK exposes the ``Fn-Deadline`` header as ``ctx.Deadline()``, an
+    RFC 3339 timestamp.
+    """
+    getter = getattr(ctx, "Deadline", None)
+    if getter is None:
+        return None
+    try:
+        value = getter()
+        if not value:
+            return None
+        deadline = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if deadline.tzinfo is None:
+        deadline = deadline.replace(tzinfo=timezone.utc)
+    return (deadline - datetime.now(timezone.utc)).total_seconds()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether ``error`` is worth retrying: throttling, a 5xx or a timeout."""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status in RETRYABLE_STATUSES or status >= 500
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    for cls in type(error).__mro__:
+        if cls.__name__ in _TRANSIENT_ERROR_NAMES:
+            return True
+        # oci.exceptions.RequestException wraps connection-level failures
+        if cls.__name__ == "RequestException" and cls.__module__.startswith("oci"):
+            return True
+    return False
+
+
+def is_unavailable(error: BaseException) -> bool:
+    """Whether ``error`` says the service is unhealthy rather than the request bad."""
+    return isinstance(error, (GenAIUnavailableError, DeadlineExceeded)) or is_retryable(error)
+
+
+class LatencyWindow:
+    """Latencies of the most recent successful calls, kept sorted."""
+
+    def __init__(self, size: int = 200):
+        self._recent: Deque[float] = deque()
+        self._sorted: List[float] = []
+        self._size = size
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            if len(self._recent) == self._size:
+                oldest = self._recent.popleft()
+                del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+            self._recent.append(seconds)
+            bisect.insort(self._sorted, seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            if not self._sorted:
+                return None
+            index = min(len(self._sorted) - 1, int(fraction * len(self._sorted)))
+            return self._sorted[index]
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _call_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="genai-call")
+        return _executor
+
+
+class CallPolicy:
+    """Apply a :class:`~oci_delivery_agent.config.CallPolicyConfig` to calls on one endpoint."""
+
+    def __init__(
+        self,
+        config: CallPolicyConfig,
+        sleep: Callable[[float], None] = time.sleep,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self._config = config
+        self._sleep = sleep
+        self.breaker = breaker
+        self.latency = LatencyWindow()
+        self._stats = {
+            "calls": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "deadline_exceeded": 0,
+            "short_circuited": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self._stats[name] += 1
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or ``None`` if it is not."""
+        if not self._config.hedge or len(self.latency) < self._config.hedge_min_samples:
+            return None
+        return self.latency.percentile(self._config.hedge_percentile)
+
+    def call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` with retries, the current deadline and optional hedging.
+
+        Each attempt is cleared with the endpoint's circuit breaker first and
+        its outcome reported back; a refused attempt raises
+        :class:`CircuitOpenError`.
+        """
+        config = self._config
+        breaker = self.breaker
+        deadline = _deadline.get()
+        self._count("calls")
+        attempt = 1
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded("Request deadline passed before the GenAI call was sent.")
+            if breaker is not None and not breaker.allow():
+                self._count("short_circuited")
+                raise CircuitOpenError("GenAI circuit breaker is open.")
+            started = time.monotonic()
+            try:
+                result = self._attempt(deadline, func, args, kwargs)
+                if breaker is not None:
+                    breaker.record(True, time.monotonic() - started)
+                return result
+            except Exception as error:
+                if breaker is not None:
+                    # A rejected request still shows the endpoint answering
+                    breaker.record(not is_unavailable(error), time.monotonic() - started)
+                if attempt >= config.max_attempts or not is_retryable(error):
+                    raise
+                cap = min(config.backoff_max_seconds, config.backoff_base_seconds * 2 ** (attempt - 1))
+                delay = random.uniform(0, cap)
+                if deadline is not None and time.monotonic() + delay + config.min_attempt_seconds > deadline:
+                    raise
+            self._count("retries")
+            self._sleep(delay)
+            attempt += 1
+
+    def _attempt(self, deadline: Optional[float], func: Callable[..., T], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> T:
+        hedge_delay = self.hedge_delay()
+        if deadline is None and hedge_delay is None:
+            started = time.monotonic()
+            result = func(*args, **kwargs)
+            self.latency.record(time.monotonic() - started)
+            return result
+
+        started = time.monotonic()
+        pending: Dict[Future, float] = {self._submit(func, args, kwargs): started}
+        hedged = False
+        first_error: Optional[BaseException] = None
+        while pending:
+            waits = []
+            if deadline is not None:
+                waits.append(deadline - time.monotonic())
+            if hedge_delay is not None and not hedged:
+                waits.append(started + hedge_delay - time.monotonic())
+            timeout = max(0.0, min(waits)) if waits else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                launched = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:
+                    first_error = first_error or error
+                    continue
+                self.latency.record(time.monotonic() - launched)
+                if launched != started:
+                    self._count("hedge_wins")
+                for other in pending:
+                    other.cancel()
+                return result
+            if done:
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                self._count("deadline_exceeded")
+                raise DeadlineExceeded("Request deadline passed while waiting for GenAI.")
+            if hedge_delay is not None and not hedged:
+                hedged = True
+                self._count("hedges")
+                pending[self._submit(func, args, kwargs)] = time.monotonic()
+        assert first_error is not None
+        raise first_error
+
+    @staticmethod
+    def _submit(func: Callable[..., T], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Future:
+        # A context can only be entered by one thread at a time, so each
+        # request (the original and its hedge) runs in its own copy
+        ctx = contextvars.copy_context()
+        return _call_executor().submit(ctx.run, func, *args, **kwargs)
+
+
+_policies: Dict[Tuple[Any, ...], CallPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_call_policy(
+    config: CallPolicyConfig, endpoint: str, breaker: Optional[CircuitBreaker] = None
+) -> CallPolicy:
+    """Return the process-wide policy for ``endpoint`` under ``config``.
+
+    ``endpoint`` names the latency population the hedge threshold is learnt
+    from, e.g. a model endpoint OCID plus the kind of request. ``breaker``
+    (shared by every policy on the same endpoint) gates each attempt.
+    """
+    key = (endpoint, breaker) + astuple(config)
+    with _policies_lock:
+        policy = _policies.get(key)
+        if policy is None:
+            policy = CallPolicy(config, breaker=breaker)
+            _policies[key] = policy
+        return policy
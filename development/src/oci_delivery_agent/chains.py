@@ -10,8 +10,27 @@ from langchain.chains import LLMChain, SequentialChain
 from langchain.prompts import PromptTemplate
 from langchain_core.language_models import BaseLLM
 
+from .artifacts import ImageArtifact
+from .assessor import RuleAssessment, assess, caption_summary as rules_caption_summary, degraded_assessment
+from .breaker import get_circuit_breaker
+from .cache import track_cache_stats
+from .callpolicy import GenAIUnavailableError, request_deadline
 from .config import WorkflowConfig, DamageTypeWeights, SeverityScores
-from .tools import toolset
+from .concurrency import get_adaptive_limiter, get_service_limiter
+from .engine import (
+    fallback_damage_quality,
+    get_scoring_engine,
+    location_accuracy,
+    severity_table,
+    timeliness_score,
+    weighted_damage_quality,
+)
+from .jsonscan import extract_json_object
+from .reinference import requeue_delivery
+from .scheduler import AsyncStageScheduler, Stage, StageScheduler
+from .stops import get_stop_index, stop_match
+from .langchain_tools import toolset
+from .tools import extract_exif
 
 
 @dataclass
@@ -23,6 +42,8 @@ class DeliveryContext:
     expected_longitude: float
     promised_time_utc: datetime
     delivered_time_utc: datetime
+    driver_id: Optional[str] = None
+    stop_id: Optional[str] = None
 
 
 def build_caption_chain(llm: BaseLLM) -> LLMChain:
@@ -42,31 +63,11 @@ def build_caption_chain(llm: BaseLLM) -> LLMChain:
 
 
 def compute_location_accuracy(exif: Mapping[str, Any], context: DeliveryContext, max_distance_meters: float) -> float:
-    gps_info = exif.get("GPSInfo", {})
-    if not gps_info:
-        return 0.0
-    lat = gps_info.get("latitude")
-    lon = gps_info.get("longitude")
-    if lat is None or lon is None:
-        return 0.0
-
-    # Basic Haversine implementation
-    from math import asin, cos, radians, sin, sqrt
-
-    d_lat = radians(lat - context.expected_latitude)
-    d_lon = radians(lon - context.expected_longitude)
-    a = sin(d_lat / 2) ** 2 + cos(radians(context.expected_latitude)) * cos(radians(lat)) * sin(d_lon / 2) ** 2
-    c = 2 * asin(sqrt(a))
-    earth_radius_m = 6371000
-    distance = earth_radius_m * c
-    return max(0.0, 1 - min(distance, max_distance_meters) / max_distance_meters)
+    return location_accuracy(exif, context, max_distance_meters)
 
 
 def compute_timeliness_score(context: DeliveryContext) -> float:
-    if context.delivered_time_utc <= context.promised_time_utc:
-        return 1.0
-    delay = (context.delivered_time_utc - context.promised_time_utc).total_seconds() / 3600
-    return round(max(0.0, 1 - min(delay, 4) / 4), 3)
+    return timeliness_score(context)
 
 
 def compute_damage_score(damage_report: Mapping[str, Any], config: Optional[WorkflowConfig] = None) -> float:
@@ -80,56 +81,18 @@ def compute_damage_score(damage_report: Mapping[str, Any], config: Optional[Work
         return _compute_weighted_damage_score(damage_report, config.damage_scoring.type_weights, config.damage_scoring.severity_scores)
     
     # Fallback to original logic
-    if isinstance(damage_report.get("overall"), dict):
-        score = damage_report["overall"].get("score", 0.0)
-        # Score is damage probability, so quality = 1 - damage
-        return round(max(0.0, 1 - float(score)), 3)
-    # Fallback: old format with "damage" key
-    damage_prob = damage_report.get("damage", 0.0)
-    return round(max(0.0, 1 - damage_prob), 3)
+    return fallback_damage_quality(damage_report)
 
 
 def _compute_weighted_damage_score(damage_report: Mapping[str, Any], type_weights: DamageTypeWeights, severity_scores: SeverityScores) -> float:
-    """MVP: Compute weighted damage score from individual indicators."""
-    
-    indicators = damage_report.get("indicators", {})
-    if not indicators:
-        return 1.0  # No damage indicators = perfect quality
-    
-    # Get normalized weights
-    weights = type_weights.normalized()
-    
-    # Convert severity to numeric score using configurable values
-    def severity_to_score(severity: str) -> float:
-        severity_map = {
-            "none": severity_scores.none,
-            "minor": severity_scores.minor,
-            "moderate": severity_scores.moderate,
-            "severe": severity_scores.severe
-        }
-        return severity_map.get(severity, 0.0)
-    
-    # Calculate weighted average of present damage indicators
-    total_weighted_score = 0.0
-    total_weight = 0.0
-    
-    for indicator_name, indicator_data in indicators.items():
-        if indicator_data.get("present", False):
-            severity = indicator_data.get("severity", "none")
-            score = severity_to_score(severity)
-            weight = weights.get(indicator_name, 0.0)
-            
-            total_weighted_score += score * weight
-            total_weight += weight
-    
-    if total_weight == 0:
-        return 1.0  # No active damage indicators
-    
-    # Calculate weighted average damage score
-    weighted_damage_score = total_weighted_score / total_weight
-    
-    # Convert to quality score (1 - damage) and round to avoid precision errors
-    return round(max(0.0, 1.0 - weighted_damage_score), 3)
+    """MVP: Compute weighted damage score from individual indicators.
+
+    Builds the weight and severity tables on every call; the pipeline uses
+    the precompiled :class:`~oci_delivery_agent.engine.ScoringEngine`.
+    """
+    return weighted_damage_quality(
+        damage_report.get("indicators", {}), type_weights.normalized(), severity_table(severity_scores)
+    )
 
 
 def compute_quality_index(
@@ -158,6 +121,9 @@ def compute_quality_index(
     }
 
 
+REVIEW_KEYS = ("status", "issues", "insights")
+
+
 def build_workflow_chain(config: WorkflowConfig, llm: BaseLLM) -> SequentialChain:
     prompt = PromptTemplate(
         input_variables=["metadata", "caption_summary", "quality_metrics"],
@@ -170,7 +136,13 @@ def build_workflow_chain(config: WorkflowConfig, llm: BaseLLM) -> SequentialChai
             "Output ONLY raw JSON (no code fences, no markdown, no extra commentary)."
         ),
     )
-    review_chain = LLMChain(prompt=prompt, llm=llm, output_key="agent_assessment")
+    # Streaming LLMs stop reading once this object has closed
+    review_chain = LLMChain(
+        prompt=prompt,
+        llm=llm,
+        output_key="agent_assessment",
+        llm_kwargs={"json_keys": REVIEW_KEYS},
+    )
 
     return SequentialChain(
         chains=[review_chain],
@@ -180,76 +152,424 @@ def build_workflow_chain(config: WorkflowConfig, llm: BaseLLM) -> SequentialChai
     )
 
 
-def run_quality_pipeline(
+NO_PACKAGE_DAMAGE_REPORT: Dict[str, Any] = {
+    "overall": {
+        "severity": "none",
+        "score": 0.0,
+        "rationale": "Damage detection skipped: caption analysis reported no visible package.",
+    },
+    "indicators": {},
+    "packageVisible": False,
+    "uncertainties": "speculative damage detection cancelled",
+}
+
+
+def _parse_assessment(assessment: str) -> Dict[str, Any]:
+    parsed = extract_json_object(assessment)
+    if parsed is not None:
+        return parsed
+    return {
+        "status": "Review",
+        "issues": ["LLM returned non-JSON response"],
+        "insights": assessment,
+    }
+
+
+def pipeline_chains(config: WorkflowConfig, llm: BaseLLM) -> Dict[str, Any]:
+    """Build the prompt chains used by the pipeline, keyed by stage."""
+    return {
+        "caption_summary": build_caption_chain(llm),
+        "review": build_workflow_chain(config, llm),
+    }
+
+
+def build_pipeline_stages(
     config: WorkflowConfig,
     llm: BaseLLM,
     context: DeliveryContext,
-    object_name: str,
-) -> Dict[str, Any]:
-    tools = toolset(config)
+    tools: Mapping[str, Any],
+    chains: Optional[Mapping[str, Any]] = None,
+) -> List[Stage]:
+    """Declare the quality pipeline as stages with explicit data dependencies."""
+    engine = get_scoring_engine(config)
+    if chains is None:
+        chains = pipeline_chains(config, llm)
 
-    retrieval_output = json.loads(tools["retrieval"].run(object_name))
-    encoded_payload = retrieval_output["payload"]
+    def retrieve(object_name: str) -> Dict[str, Any]:
+        image = tools["retrieval"].fetch(object_name)
+        return {"image": image, "metadata": image.metadata}
 
-    exif_raw = json.loads(tools["exif"].run(encoded_payload))
-    
-    # Get structured caption JSON (do this first to provide context)
-    caption_json = tools["caption"].run(encoded_payload)
-    caption_dict = json.loads(caption_json)
-    
-    caption_summary = build_caption_chain(llm).invoke(
-        {
-            "metadata": json.dumps(retrieval_output["metadata"]),
+    def exif_prefix(object_name: str) -> Dict[str, Any]:
+        # A ranged read of the EXIF segment; does not wait for the full download.
+        # Round-trip through JSON so values match the tool's serialized output
+        exif = tools["retrieval"].exif_from_prefix(object_name)
+        return {"exif_prefix": json.loads(json.dumps(exif, default=str))}
+
+    def exif(image: ImageArtifact, exif_prefix: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Only runs when the ranged read could not answer; parse the downloaded handle
+        return {"exif": json.loads(json.dumps(extract_exif(image.data), default=str))}
+
+    def use_exif_prefix(values: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        if values.get("exif_prefix") is not None:
+            return {"exif": values["exif_prefix"]}
+        return None
+
+    def caption(image: ImageArtifact) -> Dict[str, Any]:
+        caption_json = tools["caption"].caption(image)
+        return {"caption_json": caption_json, "caption_dict": json.loads(caption_json)}
+
+    def caption_and_damage(image: ImageArtifact) -> Dict[str, Any]:
+        caption_json, damage_report = tools["caption"].analyze(image)
+        return {
             "caption_json": caption_json,
+            "caption_dict": json.loads(caption_json),
+            "damage_report": damage_report,
         }
-    )["caption_summary"]
-    
-    # Get structured damage report JSON with caption context for consistency
-    damage_report = json.loads(tools["damage"].run(
-        encoded_payload,  # First positional argument
-        caption_context=caption_json  # Pass caption results as context
-    ))
-
-    weights = config.quality_weights.normalized()
-    quality_metrics = compute_quality_index(
-        context=context,
-        exif=exif_raw,
-        damage_report=damage_report,
-        weights=weights,
-        max_distance_meters=config.geolocation.max_distance_meters,
-        config=config,
-    )
 
-    workflow_chain = build_workflow_chain(config, llm)
-    assessment = workflow_chain.invoke(
-        {
-            "metadata": json.dumps(retrieval_output["metadata"]),
-            "caption_summary": caption_summary,
-            "quality_metrics": json.dumps(quality_metrics),
-        }
-    )["agent_assessment"]
-    assessment_clean = assessment.strip()
-    if assessment_clean.startswith("```"):
-        lines = [
-            line for line in assessment_clean.splitlines()
-            if not line.strip().startswith("```")
+    def caption_summary(metadata: Dict[str, Any], caption_json: str) -> Dict[str, Any]:
+        summary = chains["caption_summary"].invoke(
+            {
+                "metadata": json.dumps(metadata),
+                "caption_json": caption_json,
+            }
+        )["caption_summary"]
+        return {"caption_summary": summary}
+
+    def damage(image: ImageArtifact, caption_dict: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        # Caption results are passed as context when available for consistency
+        return {"damage_report": tools["damage"].detect(image, caption_context=caption_dict)}
+
+    def skip_damage_without_package(values: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+        caption_dict = values.get("caption_dict")
+        if isinstance(caption_dict, dict) and caption_dict.get("packageVisible") is False:
+            return {"damage_report": dict(NO_PACKAGE_DAMAGE_REPORT)}
+        return None
+
+    def score(exif: Dict[str, Any], damage_report: Dict[str, Any]) -> Dict[str, Any]:
+        return {"quality_metrics": engine.quality_metrics(context, exif, damage_report)}
+
+    def match_stop(exif: Dict[str, Any]) -> Dict[str, Any]:
+        return {"stop_match": stop_match(stops, exif, context, config.geolocation.max_distance_meters)}
+
+    def review(
+        metadata: Dict[str, Any],
+        caption_summary: str,
+        quality_metrics: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        assessment = chains["review"].invoke(
+            {
+                "metadata": json.dumps(metadata),
+                "caption_summary": caption_summary,
+                "quality_metrics": json.dumps(quality_metrics),
+            }
+        )["agent_assessment"]
+        return {"assessment": _parse_assessment(assessment)}
+
+    review_mode = config.review.mode
+
+    def rules_review(
+        quality_metrics: Dict[str, Any],
+        damage_report: Dict[str, Any],
+        caption_dict: Any,
+    ) -> Dict[str, Any]:
+        return {"rule_assessment": assess(quality_metrics, damage_report, caption_dict, config.review)}
+
+    def escalate(rule_assessment: RuleAssessment) -> bool:
+        return review_mode == "hybrid" and rule_assessment.borderline
+
+    def triaged_caption_summary(
+        metadata: Dict[str, Any],
+        caption_json: str,
+        caption_dict: Any,
+        rule_assessment: RuleAssessment,
+    ) -> Dict[str, Any]:
+        if escalate(rule_assessment):
+            return caption_summary(metadata, caption_json)
+        return {"caption_summary": rules_caption_summary(caption_dict)}
+
+    def triaged_review(
+        metadata: Dict[str, Any],
+        caption_summary: str,
+        quality_metrics: Dict[str, Any],
+        rule_assessment: RuleAssessment,
+    ) -> Dict[str, Any]:
+        if escalate(rule_assessment):
+            return {**review(metadata, caption_summary, quality_metrics), "review_source": "llm"}
+        return {"assessment": rule_assessment.as_dict(), "review_source": "rules"}
+
+    damage_mode = config.pipeline.damage_mode
+    damage_stage: Optional[Stage] = None
+    if damage_mode == "combined":
+        # One request yields both reports, so there is no separate damage stage
+        caption_stage = Stage(
+            "caption",
+            caption_and_damage,
+            inputs=("image",),
+            outputs=("caption_json", "caption_dict", "damage_report"),
+            service="genai",
+        )
+    else:
+        caption_stage = Stage(
+            "caption",
+            caption,
+            inputs=("image",),
+            outputs=("caption_json", "caption_dict"),
+            service="genai",
+        )
+    if damage_mode == "sequential":
+        damage_stage = Stage(
+            "damage",
+            damage,
+            inputs=("image", "caption_dict"),
+            outputs=("damage_report",),
+            service="genai",
+        )
+    elif damage_mode == "speculative":
+        damage_stage = Stage(
+            "damage",
+            damage,
+            inputs=("image",),
+            outputs=("damage_report",),
+            cancel_on=skip_damage_without_package,
+            service="genai",
+        )
+    elif damage_mode == "independent":
+        damage_stage = Stage(
+            "damage", damage, inputs=("image",), outputs=("damage_report",), service="genai"
+        )
+
+    stages = [
+        Stage(
+            "retrieval",
+            retrieve,
+            inputs=("object_name",),
+            outputs=("image", "metadata"),
+            service="object_storage",
+        ),
+        Stage(
+            "exif_prefix",
+            exif_prefix,
+            inputs=("object_name",),
+            outputs=("exif_prefix",),
+            service="object_storage",
+        ),
+        Stage("exif", exif, inputs=("image", "exif_prefix"), outputs=("exif",), cancel_on=use_exif_prefix),
+        caption_stage,
+        Stage("scoring", score, inputs=("exif", "damage_report"), outputs=("quality_metrics",)),
+    ]
+    if review_mode == "llm":
+        stages += [
+            Stage(
+                "caption_summary",
+                caption_summary,
+                inputs=("metadata", "caption_json"),
+                outputs=("caption_summary",),
+                service="genai",
+            ),
+            Stage(
+                "review",
+                review,
+                inputs=("metadata", "caption_summary", "quality_metrics"),
+                outputs=("assessment",),
+                service="genai",
+            ),
         ]
-        assessment_clean = "\n".join(lines).strip()
-    try:
-        assessment_payload = json.loads(assessment_clean)
-    except json.JSONDecodeError:
-        assessment_payload = {
-            "status": "Review",
-            "issues": ["LLM returned non-JSON response"],
-            "insights": assessment,
-        }
+    else:
+        # The text LLM calls wait for the rules and run only when they escalate
+        stages += [
+            Stage(
+                "rules_review",
+                rules_review,
+                inputs=("quality_metrics", "damage_report", "caption_dict"),
+                outputs=("rule_assessment",),
+            ),
+            Stage(
+                "caption_summary",
+                triaged_caption_summary,
+                inputs=("metadata", "caption_json", "caption_dict", "rule_assessment"),
+                outputs=("caption_summary",),
+                service="genai",
+            ),
+            Stage(
+                "review",
+                triaged_review,
+                inputs=("metadata", "caption_summary", "quality_metrics", "rule_assessment"),
+                outputs=("assessment", "review_source"),
+                service="genai",
+            ),
+        ]
+    if damage_stage is not None:
+        stages.append(damage_stage)
+    stops = get_stop_index(config.geolocation.stops_path)
+    if stops is not None:
+        stages.append(Stage("stop_match", match_stop, inputs=("exif",), outputs=("stop_match",)))
+    return stages
+
+
+def build_degraded_stages(config: WorkflowConfig, context: DeliveryContext, tools: Mapping[str, Any]) -> List[Stage]:
+    """Stages scoring a delivery without GenAI, from EXIF location and timeliness.
+
+    Used while the GenAI circuit breaker is open. Only the EXIF segment is
+    read; the photo itself is not downloaded.
+    """
+    engine = get_scoring_engine(config)
+
+    def exif(object_name: str) -> Dict[str, Any]:
+        return {"exif": json.loads(json.dumps(tools["retrieval"].fetch_exif(object_name), default=str))}
+
+    def score(exif: Dict[str, Any]) -> Dict[str, Any]:
+        return {"quality_metrics": engine.degraded_metrics(context, exif)}
+
+    def review(quality_metrics: Dict[str, Any]) -> Dict[str, Any]:
+        return {"assessment": degraded_assessment(quality_metrics, config.review), "review_source": "degraded"}
+
+    def match_stop(exif: Dict[str, Any]) -> Dict[str, Any]:
+        return {"stop_match": stop_match(stops, exif, context, config.geolocation.max_distance_meters)}
 
+    stages = [
+        Stage("exif", exif, inputs=("object_name",), outputs=("exif",), service="object_storage"),
+        Stage("scoring", score, inputs=("exif",), outputs=("quality_metrics",)),
+        Stage("review", review, inputs=("quality_metrics",), outputs=("assessment", "review_source")),
+    ]
+    stops = get_stop_index(config.geolocation.stops_path)
+    if stops is not None:
+        stages.append(Stage("stop_match", match_stop, inputs=("exif",), outputs=("stop_match",)))
+    return stages
+
+
+def genai_admits(config: WorkflowConfig) -> bool:
+    """Whether the GenAI endpoint's circuit breaker currently lets calls through."""
+    breaker = get_circuit_breaker(config.circuit_breaker, config.genai.model_ocid)
+    return breaker is None or breaker.admits()
+
+
+def genai_concurrency(config: WorkflowConfig) -> Optional[Dict[str, Any]]:
+    """The GenAI endpoint's adaptive concurrency limit and in-flight count, if enabled."""
+    limiter = get_adaptive_limiter(config.adaptive_concurrency, config.genai.model_ocid)
+    return None if limiter is None else limiter.as_dict()
+
+
+def delivery_fields(context: DeliveryContext) -> Dict[str, Any]:
+    """Serialize the scoring inputs of ``context`` with the manifest field names."""
     return {
-        "metadata": retrieval_output["metadata"],
-        "exif": exif_raw,
-        "caption_json": caption_dict,  # Already parsed above
-        "caption_summary": caption_summary,
-        "damage_report": damage_report,
-        "quality_metrics": quality_metrics,
-        "assessment": assessment_payload,
+        "expected_latitude": context.expected_latitude,
+        "expected_longitude": context.expected_longitude,
+        "promised_time": context.promised_time_utc.isoformat(),
+        "delivered_time": context.delivered_time_utc.isoformat(),
+        "driver_id": context.driver_id,
+        "stop_id": context.stop_id,
+    }
+
+
+def _pipeline_result(
+    config: WorkflowConfig,
+    values: Mapping[str, Any],
+    cache_stats: Any,
+    context: DeliveryContext,
+    degraded: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    # "delivery" is kept so stored results can be re-scored without the manifest
+    result = {
+        "delivery": delivery_fields(context),
+        "metadata": values.get("metadata", {"object_name": context.object_name}),
+        "exif": values["exif"],
+        "caption_json": values.get("caption_dict"),
+        "caption_summary": values.get("caption_summary", ""),
+        "damage_report": values.get("damage_report"),
+        "quality_metrics": values["quality_metrics"],
+        "assessment": values["assessment"],
+        "cache": cache_stats.as_dict(),
     }
+    if degraded is not None:
+        result["degraded"] = degraded
+    concurrency = genai_concurrency(config)
+    if concurrency is not None:
+        result["genai_concurrency"] = concurrency
+    if "review_source" in values:
+        result["review_source"] = values["review_source"]
+    if "stop_match" in values:
+        result["stop_match"] = values["stop_match"]
+    return result
+
+
+def _degraded(
+    config: WorkflowConfig, context: DeliveryContext, object_name: str, reason: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    if reason is None:
+        return None
+    return {"reason": reason, **requeue_delivery(config, object_name, delivery_fields(context), reason)}
+
+
+def run_quality_pipeline(
+    config: WorkflowConfig,
+    llm: BaseLLM,
+    context: DeliveryContext,
+    object_name: str,
+    tools: Optional[Mapping[str, Any]] = None,
+    chains: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Score one delivery photo.
+
+    Pass ``tools`` to reuse one toolset (and its OCI clients) across many
+    deliveries, as batch runs do, and ``chains`` (from
+    :func:`pipeline_chains`) to reuse the prompt chains.
+
+    While the GenAI circuit breaker is open, or if GenAI turns out to be
+    unavailable mid-run, the delivery is scored by
+    :func:`build_degraded_stages` instead; the result then carries a
+    ``degraded`` entry and the delivery is queued for re-inference.
+    """
+    if tools is None:
+        tools = toolset(config)
+    reason = None if genai_admits(config) else "circuit_open"
+    with track_cache_stats() as cache_stats, request_deadline(config.call_policy.deadline_seconds):
+        if reason is None:
+            scheduler = StageScheduler(
+                build_pipeline_stages(config, llm, context, tools, chains),
+                max_workers=config.pipeline.max_workers,
+            )
+            try:
+                values = scheduler.run({"object_name": object_name})
+            except GenAIUnavailableError as error:
+                reason = str(error)
+        if reason is not None:
+            scheduler = StageScheduler(
+                build_degraded_stages(config, context, tools),
+                max_workers=config.pipeline.max_workers,
+            )
+            values = scheduler.run({"object_name": object_name})
+
+    return _pipeline_result(config, values, cache_stats, context, _degraded(config, context, object_name, reason))
+
+
+async def arun_quality_pipeline(
+    config: WorkflowConfig,
+    llm: BaseLLM,
+    context: DeliveryContext,
+    object_name: str,
+    tools: Optional[Mapping[str, Any]] = None,
+    chains: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Score one delivery photo from a running event loop.
+
+    Produces the same result as :func:`run_quality_pipeline`. Stages are
+    admitted through the process-wide per-service limits in
+    ``config.concurrency``, so a long-lived worker can await many deliveries
+    at once while blocking OCI calls stay bounded.
+    """
+    if tools is None:
+        tools = toolset(config)
+    limiter = get_service_limiter(config.concurrency)
+    reason = None if genai_admits(config) else "circuit_open"
+    with track_cache_stats() as cache_stats, request_deadline(config.call_policy.deadline_seconds):
+        if reason is None:
+            scheduler = AsyncStageScheduler(build_pipeline_stages(config, llm, context, tools, chains), limiter=limiter)
+            try:
+                values = await scheduler.run({"object_name": object_name})
+            except GenAIUnavailableError as error:
+                reason = str(error)
+        if reason is not None:
+            scheduler = AsyncStageScheduler(build_degraded_stages(config, context, tools), limiter=limiter)
+            values = await scheduler.run({"object_name": object_name})
+
+    return _pipeline_result(config, values, cache_stats, context, _degraded(config, context, object_name, reason))
@@ -0,0 +1,213 @@
+"""Per-service concurrency limits for driving blocking OCI calls from asyncio.
+
+The OCI SDK only offers synchronous clients, so an async worker cannot await
+a GenAI or Object Storage request directly. :class:`ServiceLimiter` admits at
+most ``limit`` calls per service at a time with an :class:`asyncio.Semaphore`
+and runs admitted calls on one shared, bounded thread pool. Deliveries waiting
+for a slot are plain suspended coroutines, so hundreds can be in flight while
+the number of OS threads stays at the sum of the service limits.
+
+Those limits are fixed ceilings. :class:`AdaptiveLimiter` sits underneath
+them at the GenAI client and learns how many requests the dedicated endpoint
+can actually serve at once, for threaded batch runs as well as async workers.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import astuple
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple, TypeVar
+
+from .callpolicy import DeadlineExceeded, remaining_seconds
+from .config import AdaptiveConcurrencyConfig, ConcurrencyConfig
+
+T = TypeVar("T")
+
+
+class ServiceLimiter:
+    """Bound blocking calls per service and offload them from the event loop."""
+
+    def __init__(self, limits: Mapping[str, int]):
+        if not limits or any(limit < 1 for limit in limits.values()):
+            raise ValueError("Every service limit must be at least 1.")
+        self._limits = dict(limits)
+        self._executor = ThreadPoolExecutor(
+            max_workers=sum(self._limits.values()), thread_name_prefix="oci-io"
+        )
+        # Semaphores bind to the loop that first waits on them, so keep one
+        # set per running loop (tests and CLIs may start several loops).
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def limits(self) -> Dict[str, int]:
+        return dict(self._limits)
+
+    def _semaphore(self, service: str) -> asyncio.Semaphore:
+        if service not in self._limits:
+            raise KeyError(f"Unknown service '{service}'; expected one of {sorted(self._limits)}")
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.get(loop)
+        if semaphores is None:
+            semaphores = {name: asyncio.Semaphore(limit) for name, limit in self._limits.items()}
+            self._semaphores[loop] = semaphores
+        return semaphores[service]
+
+    async def run(self, service: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``func`` on the worker pool once ``service`` has a free slot."""
+        async with self._semaphore(service):
+            loop = asyncio.get_running_loop()
+            # Carry context variables (e.g. per-delivery cache stats) into the thread
+            ctx = contextvars.copy_context()
+            call = functools.partial(ctx.run, func, *args, **kwargs)
+            return await loop.run_in_executor(self._executor, call)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_limiters: Dict[Tuple[Tuple[str, int], ...], ServiceLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_service_limiter(config: ConcurrencyConfig) -> ServiceLimiter:
+    """Return the process-wide limiter for ``config``'s limits."""
+    key = tuple(sorted(config.limits().items()))
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = ServiceLimiter(config.limits())
+            _limiters[key] = limiter
+        return limiter
+
+
+# Weight of each new latency sample in the per-kind baseline
+_BASELINE_ALPHA = 0.05
+
+
+class AdaptiveLimiter:
+    """AIMD limit on in-flight requests to one GenAI endpoint, shared by all threads.
+
+    Each completed request adjusts the limit: a throttled (429) request, or
+    one slower than ``latency_tolerance`` times the running baseline for its
+    kind of request, multiplies the limit by ``backoff_ratio`` (at most once
+    per round trip, so one burst of slow answers backs off once); a request
+    that completes normally while at least half the slots are in use adds
+    ``1 / limit``, so a busy limit grows by about one per round of requests. Baselines are kept
+    per kind because vision and text calls take very different times.
+    """
+
+    def __init__(self, config: AdaptiveConcurrencyConfig, clock: Callable[[], float] = time.monotonic):
+        self._config = config
+        self._clock = clock
+        self._limit = float(config.initial_limit)
+        self._in_flight = 0
+        self._baselines: Dict[str, float] = {}
+        self._hold_until = 0.0
+        self._throttled = 0
+        self._latency_backoffs = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        with self._condition:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        with self._condition:
+            return self._in_flight
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to ``timeout`` seconds for a free slot; ``False`` if none freed up."""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < int(self._limit), timeout):
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, kind: str, seconds: float, success: bool = True, throttled: bool = False) -> None:
+        """Return a slot and adjust the limit from how the request went.
+
+        Failed requests other than throttling only count against the limit
+        when they were also slow (e.g. read timeouts).
+        """
+        config = self._config
+        with self._condition:
+            busy = self._in_flight * 2 >= self._limit
+            self._in_flight -= 1
+            baseline = self._baselines.get(kind)
+            slow = baseline is not None and seconds > baseline * config.latency_tolerance
+            if throttled or slow:
+                now = self._clock()
+                if now >= self._hold_until:
+                    self._limit = max(float(config.min_limit), self._limit * config.backoff_ratio)
+                    self._hold_until = now + seconds
+                    if throttled:
+                        self._throttled += 1
+                    else:
+                        self._latency_backoffs += 1
+            elif success and busy:
+                self._limit = min(float(config.max_limit), self._limit + 1 / self._limit)
+            if success:
+                if baseline is None:
+                    self._baselines[kind] = seconds
+                else:
+                    # Clipped so a slow spell does not become the new normal at once
+                    sample = min(seconds, baseline * config.latency_tolerance)
+                    self._baselines[kind] = baseline + _BASELINE_ALPHA * (sample - baseline)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, kind: str) -> Iterator[None]:
+        """Hold a slot for one request of ``kind`` (e.g. ``vision`` or ``text``).
+
+        Waiting for a slot is bounded by the current request deadline.
+        """
+        if not self.acquire(remaining_seconds()):
+            raise DeadlineExceeded("Request deadline passed while waiting for a GenAI slot.")
+        started = time.monotonic()
+        success = False
+        throttled = False
+        try:
+            yield
+            success = True
+        except BaseException as error:
+            throttled = getattr(error, "status", None) == 429
+            raise
+        finally:
+            self.release(kind, time.monotonic() - started, success=success, throttled=throttled)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "throttled": self._throttled,
+                "latency_backoffs": self._latency_backoffs,
+                "baseline_seconds": {kind: round(value, 3) for kind, value in self._baselines.items()},
+            }
+
+
+_adaptive_limiters: Dict[Tuple[Any, ...], AdaptiveLimiter] = {}
+_adaptive_limiters_lock = threading.Lock()
+
+
+def get_adaptive_limiter(config: AdaptiveConcurrencyConfig, endpoint: str) -> Optional[AdaptiveLimiter]:
+    """Return the process-wide limiter for ``endpoint``, or ``None`` when disabled."""
+    if not config.enabled:
+        return None
+    key = (endpoint,) + astuple(config)
+    with _adaptive_limiters_lock:
+        limiter = _adaptive_limiters.get(key)
+        if limiter is None:
+            limiter = AdaptiveLimiter(config)
+            _adaptive_limiters[key] = limiter
+        return limiter
@@ -0,0 +1,233 @@
+"""Scoring settings compiled once per configuration.
+
+:class:`ScoringEngine` holds everything the per-delivery quality metrics
+are computed from: normalized quality and damage-type weights, the severity
+lookup table, the GPS distance limit and the
+:meth:`~oci_delivery_agent.config.WorkflowConfig.scoring_version` hash. It
+is immutable, and :func:`get_scoring_engine` shares one instance per
+version across the handler, the CLI and batch jobs, so scoring a delivery
+no longer re-normalizes weights or rebuilds lookup tables. Configs are
+treated as immutable: each config object is hashed once, on its first
+lookup.
+"""
+from __future__ import annotations
+
+import threading
+import weakref
+from math import asin, cos, radians, sin, sqrt
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Tuple
+
+from .config import SeverityScores, WorkflowConfig
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .chains import DeliveryContext
+
+EARTH_RADIUS_M = 6371000
+
+
+def location_accuracy(exif: Mapping[str, Any], context: "DeliveryContext", max_distance_meters: float) -> float:
+    """Closeness of the photo's GPS position to the expected drop-off point."""
+    gps_info = exif.get("GPSInfo", {})
+    if not gps_info:
+        return 0.0
+    lat = gps_info.get("latitude")
+    lon = gps_info.get("longitude")
+    if lat is None or lon is None:
+        return 0.0
+
+    # Basic Haversine implementation
+    d_lat = radians(lat - context.expected_latitude)
+    d_lon = radians(lon - context.expected_longitude)
+    a = sin(d_lat / 2) ** 2 + cos(radians(context.expected_latitude)) * cos(radians(lat)) * sin(d_lon / 2) ** 2
+    distance = EARTH_RADIUS_M * (2 * asin(sqrt(a)))
+    return max(0.0, 1 - min(distance, max_distance_meters) / max_distance_meters)
+
+
+def timeliness_score(context: "DeliveryContext") -> float:
+    """Full marks when on time, falling linearly to zero at four hours late."""
+    if context.delivered_time_utc <= context.promised_time_utc:
+        return 1.0
+    delay = (context.delivered_time_utc - context.promised_time_utc).total_seconds() / 3600
+    return round(max(0.0, 1 - min(delay, 4) / 4), 3)
+
+
+def severity_table(severity_scores: SeverityScores) -> Dict[str, float]:
+    return {
+        "none": severity_scores.none,
+        "minor": severity_scores.minor,
+        "moderate": severity_scores.moderate,
+        "severe": severity_scores.severe,
+    }
+
+
+def fallback_damage_quality(damage_report: Mapping[str, Any]) -> float:
+    """Quality from the report's overall damage probability (unweighted scoring)."""
+    if isinstance(damage_report.get("overall"), dict):
+        score = damage_report["overall"].get("score", 0.0)
+        # Score is damage probability, so quality = 1 - damage
+        return round(max(0.0, 1 - float(score)), 3)
+    # Fallback: old format with "damage" key
+    damage_prob = damage_report.get("damage", 0.0)
+    return round(max(0.0, 1 - damage_prob), 3)
+
+
+def weighted_damage_quality(
+    indicators: Mapping[str, Any], weights: Mapping[str, float], severity_scores: Mapping[str, float]
+) -> float:
+    """Quality from the weighted average severity of the present indicators."""
+    if not indicators:
+        return 1.0  # No damage indicators = perfect quality
+
+    total_weighted_score = 0.0
+    total_weight = 0.0
+    for indicator_name, indicator_data in indicators.items():
+        if indicator_data.get("present", False):
+            score = severity_scores.get(indicator_data.get("severity", "none"), 0.0)
+            weight = weights.get(indicator_name, 0.0)
+            total_weighted_score += score * weight
+            total_weight += weight
+
+    if total_weight == 0:
+        return 1.0  # No active damage indicators
+
+    # Convert to quality score (1 - damage) and round to avoid precision errors
+    return round(max(0.0, 1.0 - total_weighted_score / total_weight), 3)
+
+
+class ScoringEngine:
+    """Immutable, precomputed scoring parameters for one configuration."""
+
+    __slots__ = (
+        "version",
+        "weight_location",
+        "weight_timeliness",
+        "weight_damage",
+        "type_weights",
+        "severity_scores",
+        "use_weighted_scoring",
+        "max_distance_meters",
+    )
+
+    def __init__(self, config: WorkflowConfig):
+        quality = config.quality_weights.normalized()
+        scoring = config.damage_scoring
+        values = {
+            "version": config.scoring_version(),
+            "weight_location": quality["location_accuracy"],
+            "weight_timeliness": quality["timeliness"],
+            "weight_damage": quality["damage_score"],
+            "type_weights": MappingProxyType(scoring.type_weights.normalized()),
+            "severity_scores": MappingProxyType(severity_table(scoring.severity_scores)),
+            "use_weighted_scoring": scoring.use_weighted_scoring,
+            "max_distance_meters": config.geolocation.max_distance_meters,
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        return f"ScoringEngine(version={self.version!r})"
+
+    @property
+    def quality_weights(self) -> Dict[str, float]:
+        return {
+            "timeliness": self.weight_timeliness,
+            "location_accuracy": self.weight_location,
+            "damage_score": self.weight_damage,
+        }
+
+    def location_accuracy(self, exif: Mapping[str, Any], context: "DeliveryContext") -> float:
+        return location_accuracy(exif, context, self.max_distance_meters)
+
+    @staticmethod
+    def timeliness(context: "DeliveryContext") -> float:
+        return timeliness_score(context)
+
+    def damage_score(self, damage_report: Mapping[str, Any]) -> float:
+        if self.use_weighted_scoring and damage_report.get("indicators"):
+            return weighted_damage_quality(damage_report["indicators"], self.type_weights, self.severity_scores)
+        return fallback_damage_quality(damage_report)
+
+    def quality_metrics(
+        self, context: "DeliveryContext", exif: Mapping[str, Any], damage_report: Mapping[str, Any]
+    ) -> Dict[str, Any]:
+        """Score one delivery; equal to ``compute_quality_index`` under the compiled config."""
+        location_accuracy = self.location_accuracy(exif, context)
+        timeliness = self.timeliness(context)
+        damage = self.damage_score(damage_report)
+
+        quality_index = round(
+            self.weight_location * location_accuracy
+            + self.weight_timeliness * timeliness
+            + self.weight_damage * damage, 3
+        )
+        return {
+            "location_accuracy": round(location_accuracy, 3),
+            "timeliness": timeliness,
+            "package_quality": damage,
+            "quality_index": quality_index,
+            "config_version": self.version,
+        }
+
+    def degraded_metrics(self, context: "DeliveryContext", exif: Mapping[str, Any]) -> Dict[str, Any]:
+        """Score from location and timeliness alone, for deliveries scored without GenAI.
+
+        The two remaining weights are rescaled to sum to 1; ``package_quality``
+        is ``None`` because the photo was never assessed.
+        """
+        location_accuracy = self.location_accuracy(exif, context)
+        timeliness = self.timeliness(context)
+        weight = self.weight_location + self.weight_timeliness
+        if weight > 0:
+            quality_index = (self.weight_location * location_accuracy + self.weight_timeliness * timeliness) / weight
+        else:
+            quality_index = (location_accuracy + timeliness) / 2
+        return {
+            "location_accuracy": round(location_accuracy, 3),
+            "timeliness": timeliness,
+            "package_quality": None,
+            "quality_index": round(quality_index, 3),
+            "config_version": self.version,
+            "degraded": True,
+        }
+
+
+_engines: Dict[str, ScoringEngine] = {}
+# Engines by id() of the config object they were looked up with, together
+# with the scoring sections it held then; an entry is removed when its config
+# is garbage collected, before the id can be reused
+_config_engines: Dict[int, Tuple[Tuple[Any, ...], ScoringEngine]] = {}
+_engines_lock = threading.Lock()
+
+
+def _scoring_sections(config: WorkflowConfig) -> Tuple[Any, ...]:
+    """The frozen config sections :meth:`WorkflowConfig.scoring_version` reads."""
+    return config.quality_weights, config.damage_scoring, config.geolocation
+
+
+def get_scoring_engine(config: WorkflowConfig) -> ScoringEngine:
+    """Return the shared engine for the scoring settings in ``config``.
+
+    The sections are frozen, so a config still holding the same section
+    objects as at its last lookup has the same scoring version, and is not
+    hashed again. Replacing a section looks the engine up afresh.
+    """
+    sections = _scoring_sections(config)
+    entry = _config_engines.get(id(config))
+    if entry is not None and all(held is current for held, current in zip(entry[0], sections)):
+        return entry[1]
+    version = config.scoring_version()
+    with _engines_lock:
+        engine = _engines.get(version)
+        if engine is None:
+            engine = _engines[version] = ScoringEngine(config)
+        if id(config) not in _config_engines:
+            weakref.finalize(config, _config_engines.pop, id(config), None)
+        _config_engines[id(config)] = (sections, engine)
+    return engine
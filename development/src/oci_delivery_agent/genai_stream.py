@@ -0,0 +1,58 @@
+"""Consume streamed OCI GenAI chat responses.
+
+With ``is_stream`` set, ``GenerativeAiInferenceClient.chat`` returns a
+server-sent event stream whose events carry text deltas. :func:`stream_chat_text`
+joins them and, when the caller expects a JSON object, stops reading as soon
+as that object has closed with its required keys, so trailing commentary the
+model keeps generating is never waited for.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Iterable, Optional
+
+from .jsonscan import JSONObjectScanner
+
+
+def event_text(data: str) -> str:
+    """Text delta carried by one stream event (generic or Cohere format)."""
+    try:
+        payload = json.loads(data)
+    except ValueError:
+        return ""
+    if not isinstance(payload, dict):
+        return ""
+    message = payload.get("message")
+    if isinstance(message, dict):
+        return "".join(
+            part.get("text") or ""
+            for part in message.get("content") or []
+            if isinstance(part, dict)
+        )
+    return payload.get("text") or ""
+
+
+def stream_chat_text(response: Any, json_keys: Optional[Iterable[str]] = None) -> Optional[str]:
+    """Read a streamed chat response and return its text.
+
+    With ``json_keys``, reading stops at the first complete JSON object that
+    has those keys and only that object's text is returned. Otherwise (or if
+    no such object appears) the whole completion is returned. ``None`` means
+    the stream carried no text.
+    """
+    stream = response.data
+    scanner = JSONObjectScanner(json_keys) if json_keys is not None else None
+    parts = []
+    try:
+        for event in stream.events():
+            text = event_text(getattr(event, "data", "") or "")
+            if not text:
+                continue
+            parts.append(text)
+            if scanner is not None and scanner.feed(text):
+                return scanner.text
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+    return "".join(parts) or None
@@ -0,0 +1,184 @@
+"""Locating JSON values in model output.
+
+Models asked for "ONLY a single JSON object" often wrap it in Markdown
+fences, add a preface before it or commentary after it.
+:func:`extract_json` finds and decodes the first complete JSON object or
+array in a finished response, and :func:`extract_json_object` the first
+object, in time linear in its length. :class:`JSONObjectScanner`
+does the same for text that is still streaming in, so a streaming call can
+stop reading once the object closes.
+"""
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# An opener followed by something a JSON object or array can start with, so
+# braces and brackets in prose ("{as requested}", "[Note: ...]") are skipped
+_OPENER = re.compile(r'\{(?=\s*["}])|\[(?=\s*[-"{\[\]0-9tfn])')
+_OBJECT_OPENER = re.compile(r'\{(?=\s*["}])')
+_decoder = json.JSONDecoder()
+# Characters a decode can read past the point where it reports an error
+# ("tru" cut off from "true", "1e" from "1e5"), so a window cut there is
+# not mistaken for an error in the text
+_WINDOW_MARGIN = 16
+
+
+def _decode(text: str, start: int) -> Tuple[Any, int, Optional[Tuple[str, int]]]:
+    """Decode the value at ``start``: ``(value, end, None)`` or ``(None, 0, (message, position))``.
+
+    A :class:`json.JSONDecodeError` works out its line and column by
+    counting from the start of the document, which would make every failed
+    candidate cost the length of the text before it. Decoding a window that
+    grows only while the outcome depends on what lies past its end keeps
+    each attempt proportional to the characters it reads.
+    """
+    window = 1024
+    while True:
+        whole = start + window >= len(text)
+        doc = text if whole else text[start:start + window]
+        offset = 0 if whole else start
+        try:
+            value, end = _decoder.raw_decode(doc, start - offset)
+            return value, end + offset, None
+        except json.JSONDecodeError as error:
+            if whole or (error.pos < len(doc) - _WINDOW_MARGIN
+                         and not error.msg.startswith("Unterminated string")):
+                return None, 0, (error.msg, error.pos + offset)
+        window *= 8
+
+
+def _values(text: str) -> Iterator[Any]:
+    """Yield each complete JSON object or array in ``text``, left to right.
+
+    The standard library's C scanner decodes in place from each candidate
+    opener, matching brackets and honouring strings and escapes as it goes
+    and ignoring whatever follows the value. A decoded value is skipped as
+    a whole. When an object candidate fails, scanning resumes where decoding
+    failed; an "Unterminated string" there means the rest of the text is
+    inside that string, so nothing further can decode. An array candidate
+    that fails is more often prose ("Note [see below"), so objects inside
+    the span it covered are still tried, but not arrays. Each span is
+    therefore decoded at most once as an array and once as objects: a
+    malformed or truncated response costs a bounded number of passes, not
+    a cascade of re-parses.
+    """
+    position = 0
+    objects_only_until = 0  # End of the span a failed array candidate covered
+    while True:
+        start = -1
+        if position < objects_only_until:
+            # Only braces inside the span, so the search stops at its end
+            start = text.find("{", position, objects_only_until)
+            while start != -1 and not _OBJECT_OPENER.match(text, start):
+                start = text.find("{", start + 1, objects_only_until)
+            if start == -1:
+                position = objects_only_until
+        if start == -1:
+            opener = _OPENER.search(text, position)
+            if opener is None:
+                return
+            start = opener.start()
+        try:
+            value, end, failure = _decode(text, start)
+        except RecursionError:
+            return  # Nested deeper than the decoder can follow
+        if failure is None:
+            position = end
+            yield value
+            continue
+        message, error_position = failure
+        unterminated = message.startswith("Unterminated string")
+        if text[start] == "[":
+            objects_only_until = len(text) if unterminated else max(error_position, start + 1)
+            position = start + 1
+        elif unterminated:
+            return
+        else:
+            position = max(error_position, start + 1)
+
+
+def extract_json(text: str) -> Any:
+    """Return the first complete JSON object or array in ``text``, else ``None``."""
+    return next(_values(text), None)
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Return the first JSON object in ``text``, else ``None``.
+
+    An array yields its first element when that is an object; values that
+    are not objects ("[1]", "[0.9, 0.8]" in a preface) are passed over.
+    """
+    for value in _values(text):
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+class JSONObjectScanner:
+    """Track brace depth across chunks, honouring strings and escapes.
+
+    Text outside an object is skipped. An object that closes but does not
+    decode to a dict containing ``required_keys`` (a stray ``{}`` in a
+    preface, say) is discarded and scanning continues after it.
+    """
+
+    def __init__(self, required_keys: Iterable[str] = ()):
+        self._required = tuple(required_keys)
+        self._parts: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.result: Optional[Dict[str, Any]] = None
+        self.text: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Consume ``chunk``; return True once a matching object has closed."""
+        if self.result is not None:
+            return True
+        start = 0
+        for index, char in enumerate(chunk):
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._parts = []
+                    start = index
+                continue
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:index + 1])
+                    if self._accept("".join(self._parts)):
+                        return True
+        if self._depth > 0:
+            self._parts.append(chunk[start:])
+        return False
+
+    def _accept(self, candidate: str) -> bool:
+        try:
+            value = json.loads(candidate)
+        except ValueError:
+            return False
+        if not isinstance(value, dict) or any(key not in value for key in self._required):
+            return False
+        self.result = value
+        self.text = candidate
+        return True
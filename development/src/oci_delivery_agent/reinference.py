@@ -0,0 +1,105 @@
+"""Deliveries scored without GenAI, queued to be scored again once it recovers.
+
+While the GenAI circuit breaker is open, deliveries get a degraded result
+from EXIF location and timeliness only. Each one is recorded here as a batch
+manifest row (``object_name`` plus the delivery fields), so the queue can be
+replayed with ``start.py batch --manifest``; caption and damage results
+cached before the outage are reused.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .config import WorkflowConfig
+
+
+def reinference_row(object_name: str, delivery: Mapping[str, Any], reason: str) -> Dict[str, Any]:
+    """Manifest row for one degraded delivery."""
+    return {
+        "object_name": object_name,
+        **delivery,
+        "reason": reason,
+        "queued_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+class FileReinferenceQueue:
+    """Append rows to a JSONL manifest."""
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+
+    def put(self, row: Mapping[str, Any]) -> None:
+        line = json.dumps(row, default=str) + "\n"
+        with self._lock, open(self._path, "a", encoding="utf-8") as handle:
+            handle.write(line)
+
+
+class ObjectStorageReinferenceQueue:
+    """Write one manifest row per delivery under a prefix in the workflow bucket.
+
+    Re-queuing a delivery overwrites its row, so the prefix holds each
+    pending delivery once. Rows are written at ``requeue_prefix`` exactly,
+    never under the delivery prefix, so they do not trigger the function.
+    """
+
+    def __init__(self, config: WorkflowConfig):
+        from .tools import ObjectStorageClient
+
+        self._client = ObjectStorageClient(config)
+        self._prefix = config.circuit_breaker.requeue_prefix
+
+    def put(self, row: Mapping[str, Any]) -> None:
+        data = (json.dumps(row, default=str) + "\n").encode("utf-8")
+        self._client.put_object(
+            f"{self._prefix}{row['object_name']}.json", data, content_type="application/json", resolve_name=False
+        )
+
+
+_queues: Dict[Tuple[Any, ...], Any] = {}
+_queues_lock = threading.Lock()
+
+
+def get_reinference_queue(config: WorkflowConfig) -> Optional[Any]:
+    """Return the process-wide queue for ``config``, or ``None`` when disabled."""
+    breaker = config.circuit_breaker
+    if breaker.requeue == "none":
+        return None
+    if breaker.requeue == "file":
+        key: Tuple[Any, ...] = ("file", breaker.requeue_path)
+    else:
+        storage = config.object_storage
+        key = ("object_storage", storage.namespace, storage.bucket_name, breaker.requeue_prefix)
+    with _queues_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            if breaker.requeue == "file":
+                queue = FileReinferenceQueue(breaker.requeue_path)
+            else:
+                queue = ObjectStorageReinferenceQueue(config)
+            _queues[key] = queue
+        return queue
+
+
+def requeue_delivery(
+    config: WorkflowConfig, object_name: str, delivery: Mapping[str, Any], reason: str
+) -> Dict[str, Any]:
+    """Queue a degraded delivery for re-inference.
+
+    Returns ``{"requeued": bool}``, plus ``requeue_error`` when the queue
+    could not be written. The failure is reported, not raised: the degraded
+    result is still returned and stored.
+    """
+    queue = get_reinference_queue(config)
+    if queue is None:
+        return {"requeued": False}
+    try:
+        queue.put(reinference_row(object_name, delivery, reason))
+        return {"requeued": True}
+    except Exception as error:
+        print(f"Warning: could not queue {object_name} for re-inference: {error}")
+        return {"requeued": False, "requeue_error": str(error)}
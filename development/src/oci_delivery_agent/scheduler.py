@@ -0,0 +1,207 @@
+"""Dependency-driven stage scheduler for the delivery quality pipeline."""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .concurrency import ServiceLimiter
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of pipeline work with declared inputs and outputs.
+
+    ``func`` is called with the declared inputs as keyword arguments and must
+    return a mapping containing every declared output. ``cancel_on`` is an
+    optional predicate evaluated whenever new values become available while the
+    stage is still pending or running; returning a mapping cancels the stage
+    and uses that mapping as its outputs instead. ``service`` names the
+    concurrency limit the stage counts against when run asynchronously.
+    """
+
+    name: str
+    func: Callable[..., Mapping[str, Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    cancel_on: Optional[Callable[[Mapping[str, Any]], Optional[Mapping[str, Any]]]] = None
+    service: str = "compute"
+
+
+def _validate_stages(stages: Sequence[Stage]) -> None:
+    names = set()
+    producers: Dict[str, str] = {}
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        names.add(stage.name)
+        for output in stage.outputs:
+            if output in producers:
+                raise ValueError(
+                    f"Output '{output}' is produced by both '{producers[output]}' and '{stage.name}'"
+                )
+            producers[output] = stage.name
+
+
+def _collect(stage: Stage, produced: Mapping[str, Any]) -> Dict[str, Any]:
+    missing = [key for key in stage.outputs if key not in produced]
+    if missing:
+        raise RuntimeError(f"Stage '{stage.name}' did not produce outputs: {missing}")
+    return {key: produced[key] for key in stage.outputs}
+
+
+def _unreachable(values: Mapping[str, Any], pending: Mapping[str, Stage]) -> RuntimeError:
+    missing = {
+        name: [key for key in stage.inputs if key not in values]
+        for name, stage in pending.items()
+    }
+    return RuntimeError(f"Pipeline stages can never run; missing inputs: {missing}")
+
+
+class StageScheduler:
+    """Run stages as soon as their inputs exist, on a bounded thread pool."""
+
+    def __init__(self, stages: Sequence[Stage], max_workers: int = 4):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        self._stages = list(stages)
+        self._max_workers = max_workers
+        self.timings: Dict[str, float] = {}
+        self.cancelled: Tuple[str, ...] = ()
+        _validate_stages(self._stages)
+
+    def run(self, initial: Mapping[str, Any]) -> Dict[str, Any]:
+        """Execute every stage and return all produced values keyed by name."""
+        values: Dict[str, Any] = dict(initial)
+        pending = {stage.name: stage for stage in self._stages}
+        running: Dict[Future, Tuple[Stage, float]] = {}
+        cancelled = []
+
+        executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="pipeline-stage")
+        try:
+            while pending or running:
+                self._apply_cancellations(values, pending, running, cancelled)
+
+                for name, stage in list(pending.items()):
+                    if all(key in values for key in stage.inputs):
+                        kwargs = {key: values[key] for key in stage.inputs}
+                        ctx = contextvars.copy_context()
+                        future = executor.submit(ctx.run, stage.func, **kwargs)
+                        running[future] = (stage, time.perf_counter())
+                        del pending[name]
+
+                if not running:
+                    if pending:
+                        raise _unreachable(values, pending)
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, started = running.pop(future)
+                    self.timings[stage.name] = round(time.perf_counter() - started, 4)
+                    values.update(_collect(stage, future.result()))
+        except BaseException:
+            for future in running:
+                future.cancel()
+            raise
+        finally:
+            # Discarded speculative work must not hold the caller hostage.
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.cancelled = tuple(cancelled)
+        return values
+
+    def _apply_cancellations(
+        self,
+        values: Dict[str, Any],
+        pending: Dict[str, Stage],
+        running: Dict[Future, Tuple[Stage, float]],
+        cancelled: list,
+    ) -> None:
+        for name, stage in list(pending.items()):
+            replacement = stage.cancel_on(values) if stage.cancel_on else None
+            if replacement is not None:
+                del pending[name]
+                cancelled.append(name)
+                values.update(_collect(stage, replacement))
+
+        for future, (stage, _started) in list(running.items()):
+            replacement = stage.cancel_on(values) if stage.cancel_on else None
+            if replacement is not None:
+                # A thread that already started cannot be interrupted; its
+                # result is simply discarded when it eventually finishes.
+                future.cancel()
+                del running[future]
+                cancelled.append(stage.name)
+                values.update(_collect(stage, replacement))
+
+
+class AsyncStageScheduler:
+    """Run the same stage graph as tasks on the current event loop.
+
+    Each stage is admitted through ``limiter`` under its declared service, so
+    many pipelines can share one loop while blocking calls stay bounded.
+    Cancelling a running stage stops awaiting it immediately; the worker
+    thread finishes in the background and its result is discarded.
+    """
+
+    def __init__(self, stages: Sequence[Stage], limiter: "ServiceLimiter"):
+        self._stages = list(stages)
+        self._limiter = limiter
+        self.timings: Dict[str, float] = {}
+        self.cancelled: Tuple[str, ...] = ()
+        _validate_stages(self._stages)
+
+    async def run(self, initial: Mapping[str, Any]) -> Dict[str, Any]:
+        """Execute every stage and return all produced values keyed by name."""
+        values: Dict[str, Any] = dict(initial)
+        pending = {stage.name: stage for stage in self._stages}
+        running: Dict[asyncio.Task, Tuple[Stage, float]] = {}
+        cancelled = []
+
+        try:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    replacement = stage.cancel_on(values) if stage.cancel_on else None
+                    if replacement is not None:
+                        del pending[name]
+                        cancelled.append(name)
+                        values.update(_collect(stage, replacement))
+                for task, (stage, _started) in list(running.items()):
+                    replacement = stage.cancel_on(values) if stage.cancel_on else None
+                    if replacement is not None:
+                        task.cancel()
+                        del running[task]
+                        cancelled.append(stage.name)
+                        values.update(_collect(stage, replacement))
+
+                for name, stage in list(pending.items()):
+                    if all(key in values for key in stage.inputs):
+                        kwargs = {key: values[key] for key in stage.inputs}
+                        task = asyncio.ensure_future(
+                            self._limiter.run(stage.service, stage.func, **kwargs)
+                        )
+                        running[task] = (stage, time.perf_counter())
+                        del pending[name]
+
+                if not running:
+                    if pending:
+                        raise _unreachable(values, pending)
+                    break
+
+                done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage, started = running.pop(task)
+                    self.timings[stage.name] = round(time.perf_counter() - started, 4)
+                    values.update(_collect(stage, task.result()))
+        except BaseException:
+            for task in running:
+                task.cancel()
+            raise
+
+        self.cancelled = tuple(cancelled)
+        return values
@@ -0,0 +1,284 @@
+"""Vectorized quality scoring for many deliveries at once.
+
+:func:`score_batch` computes the same metrics as
+:func:`~oci_delivery_agent.chains.compute_quality_index` over columnar NumPy
+arrays, for re-scoring large delivery histories when weights change.
+
+Additions, products and divisions round identically in NumPy and Python,
+so timeliness and damage come out bit for bit equal to the scalar values
+before rounding. Two things can still differ: ``np.round`` rounds the
+scaled binary value where :func:`round` rounds the exact decimal, and
+NumPy's ``sin``/``cos``/``arcsin`` may differ from :mod:`math` in the last
+bit. Values within a hair of a rounding half-way point are therefore
+rounded with :func:`round`. Rows whose inputs to such a value may not be
+bit-identical (a non-trivial Haversine distance, or indicators summed in a
+different order than the report lists them) are recomputed with the scalar
+functions first, so every returned value equals the per-delivery result.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .chains import DeliveryContext, compute_damage_score, compute_location_accuracy
+from .config import WorkflowConfig
+from .engine import EARTH_RADIUS_M, get_scoring_engine
+
+INDICATOR_ORDER = ("leakage", "boxDeformation", "packagingIntegrity", "cornerDamage")
+SEVERITY_LEVELS = ("none", "minor", "moderate", "severe")
+
+# Severity codes in DeliveryBatch.severities
+SEVERITY_ABSENT = -1
+SEVERITY_UNKNOWN = len(SEVERITY_LEVELS)
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Scaled values this close to x.5 may round differently than the scalar path
+_HALF_TOLERANCE = 1e-6
+
+
+def _epoch_micros(value: datetime) -> int:
+    epoch = _EPOCH if value.tzinfo is None else _EPOCH_UTC
+    return (value - epoch) // timedelta(microseconds=1)
+
+
+def _severity_code(indicator: Any) -> int:
+    if not isinstance(indicator, Mapping) or not indicator.get("present", False):
+        return SEVERITY_ABSENT
+    severity = indicator.get("severity", "none")
+    return SEVERITY_LEVELS.index(severity) if severity in SEVERITY_LEVELS else SEVERITY_UNKNOWN
+
+
+@dataclass
+class DeliveryBatch:
+    """Columnar inputs for :func:`score_batch`; every array has one row per delivery.
+
+    ``gps_latitude``/``gps_longitude`` are NaN where the photo had no GPS.
+    Times are integer microseconds since the Unix epoch (UTC for aware
+    datetimes). ``severities`` is an ``(N, 4)`` array of codes in
+    :data:`INDICATOR_ORDER`: an index into :data:`SEVERITY_LEVELS`,
+    :data:`SEVERITY_ABSENT` when the indicator is not present, or
+    :data:`SEVERITY_UNKNOWN` for an unrecognised severity.
+    ``has_indicators`` is false for reports without an ``indicators``
+    object; those rows, and every row when weighted scoring is disabled, use
+    ``damage_probability`` (the report's overall score).
+    ``indicator_order_canonical`` is false where the source report lists
+    present indicators in a different order than :data:`INDICATOR_ORDER`
+    (``None``: all canonical); only those rows need the source report in
+    ``damage_reports`` to reproduce the scalar sum exactly.
+    """
+
+    gps_latitude: np.ndarray
+    gps_longitude: np.ndarray
+    expected_latitude: np.ndarray
+    expected_longitude: np.ndarray
+    promised_us: np.ndarray
+    delivered_us: np.ndarray
+    severities: np.ndarray
+    has_indicators: np.ndarray
+    damage_probability: np.ndarray
+    damage_reports: Optional[Sequence[Mapping[str, Any]]] = None
+    indicator_order_canonical: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.expected_latitude)
+
+    @classmethod
+    def from_deliveries(
+        cls,
+        contexts: Sequence[DeliveryContext],
+        exifs: Sequence[Mapping[str, Any]],
+        damage_reports: Sequence[Mapping[str, Any]],
+    ) -> "DeliveryBatch":
+        """Build columns from the per-delivery inputs of ``compute_quality_index``."""
+        if not len(contexts) == len(exifs) == len(damage_reports):
+            raise ValueError("contexts, exifs and damage_reports must have the same length.")
+        gps_lat: List[float] = []
+        gps_lon: List[float] = []
+        for exif in exifs:
+            gps_info = exif.get("GPSInfo") or {}
+            lat, lon = gps_info.get("latitude"), gps_info.get("longitude")
+            missing = lat is None or lon is None
+            gps_lat.append(math.nan if missing else float(lat))
+            gps_lon.append(math.nan if missing else float(lon))
+
+        severities = np.full((len(contexts), len(INDICATOR_ORDER)), SEVERITY_ABSENT, dtype=np.int8)
+        has_indicators = np.zeros(len(contexts), dtype=bool)
+        canonical = np.ones(len(contexts), dtype=bool)
+        damage_probability = np.zeros(len(contexts))
+        for row, report in enumerate(damage_reports):
+            indicators = report.get("indicators")
+            if indicators:
+                has_indicators[row] = True
+                for column, name in enumerate(INDICATOR_ORDER):
+                    severities[row, column] = _severity_code(indicators.get(name))
+                listed = [
+                    INDICATOR_ORDER.index(name) for name, data in indicators.items()
+                    if name in INDICATOR_ORDER and _severity_code(data) != SEVERITY_ABSENT
+                ]
+                canonical[row] = listed == sorted(listed)
+            overall = report.get("overall")
+            if isinstance(overall, dict):
+                damage_probability[row] = float(overall.get("score", 0.0))
+            else:
+                damage_probability[row] = float(report.get("damage", 0.0))
+
+        return cls(
+            gps_latitude=np.array(gps_lat),
+            gps_longitude=np.array(gps_lon),
+            expected_latitude=np.array([c.expected_latitude for c in contexts], dtype=float),
+            expected_longitude=np.array([c.expected_longitude for c in contexts], dtype=float),
+            promised_us=np.array([_epoch_micros(c.promised_time_utc) for c in contexts], dtype=np.int64),
+            delivered_us=np.array([_epoch_micros(c.delivered_time_utc) for c in contexts], dtype=np.int64),
+            severities=severities,
+            has_indicators=has_indicators,
+            damage_probability=damage_probability,
+            damage_reports=list(damage_reports),
+            indicator_order_canonical=canonical,
+        )
+
+    def row_inputs(self, row: int) -> Dict[str, Any]:
+        """Rebuild the scalar ``context``/``exif``/``damage_report`` for one row."""
+        exif: Dict[str, Any] = {}
+        if not (math.isnan(self.gps_latitude[row]) or math.isnan(self.gps_longitude[row])):
+            exif["GPSInfo"] = {
+                "latitude": float(self.gps_latitude[row]),
+                "longitude": float(self.gps_longitude[row]),
+            }
+        if self.damage_reports is not None:
+            report = self.damage_reports[row]
+        else:
+            report = {"overall": {"score": float(self.damage_probability[row])}}
+            if self.has_indicators[row]:
+                report["indicators"] = {
+                    name: (
+                        {"present": False}
+                        if code == SEVERITY_ABSENT
+                        else {"present": True, "severity": SEVERITY_LEVELS[code] if code < SEVERITY_UNKNOWN else "unknown"}
+                    )
+                    for name, code in zip(INDICATOR_ORDER, self.severities[row].tolist())
+                }
+        context = DeliveryContext(
+            object_name="",
+            expected_latitude=float(self.expected_latitude[row]),
+            expected_longitude=float(self.expected_longitude[row]),
+            promised_time_utc=_EPOCH + timedelta(microseconds=int(self.promised_us[row])),
+            delivered_time_utc=_EPOCH + timedelta(microseconds=int(self.delivered_us[row])),
+        )
+        return {"context": context, "exif": exif, "damage_report": report}
+
+
+def _near_half(values: np.ndarray) -> np.ndarray:
+    scaled = values * 1000.0
+    return np.abs(scaled - np.floor(scaled) - 0.5) < _HALF_TOLERANCE
+
+
+def _round3(values: np.ndarray) -> np.ndarray:
+    """``round(x, 3)`` for every element."""
+    rounded = np.rint(values * 1000.0) / 1000.0
+    # np.rint agrees with round() except right at a half-way point
+    for row in np.flatnonzero(_near_half(values)):
+        rounded[row] = round(float(values[row]), 3)
+    return rounded
+
+
+def location_accuracy(batch: DeliveryBatch, max_distance_meters: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized :func:`~oci_delivery_agent.chains.compute_location_accuracy` (unrounded).
+
+    Also returns a mask of rows whose value is exactly the scalar one: no
+    GPS, no distance at all, or a distance clamped to the maximum.
+    """
+    lat, lon = batch.gps_latitude, batch.gps_longitude
+    expected_lat, expected_lon = batch.expected_latitude, batch.expected_longitude
+    d_lat = np.radians(lat - expected_lat)
+    d_lon = np.radians(lon - expected_lon)
+    a = np.sin(d_lat / 2) ** 2 + np.cos(np.radians(expected_lat)) * np.cos(np.radians(lat)) * np.sin(d_lon / 2) ** 2
+    distance = EARTH_RADIUS_M * (2 * np.arcsin(np.sqrt(a)))
+    accuracy = np.maximum(0.0, 1 - np.minimum(distance, max_distance_meters) / max_distance_meters)
+    missing = np.isnan(lat) | np.isnan(lon)
+    exact = missing | (a == 0) | (distance > max_distance_meters * (1 + 1e-9))
+    return np.where(missing, 0.0, accuracy), exact
+
+
+def _timeliness_unrounded(batch: DeliveryBatch) -> np.ndarray:
+    late = batch.delivered_us > batch.promised_us
+    delay = (batch.delivered_us - batch.promised_us).astype(np.float64) / 10**6 / 3600
+    return np.where(late, np.maximum(0.0, 1 - np.minimum(delay, 4) / 4), 1.0)
+
+
+def _damage_unrounded(batch: DeliveryBatch, config: Optional[WorkflowConfig]) -> np.ndarray:
+    fallback = np.maximum(0.0, 1 - batch.damage_probability)
+    if not (config and config.damage_scoring.use_weighted_scoring):
+        return fallback
+
+    engine = get_scoring_engine(config)
+    weights = engine.type_weights
+    # SEVERITY_UNKNOWN scores 0.0, like an unrecognised severity in the scalar path
+    severity_table = np.array([engine.severity_scores[level] for level in SEVERITY_LEVELS] + [0.0])
+    total_score = np.zeros(len(batch))
+    total_weight = np.zeros(len(batch))
+    # Accumulate in the scalar loop's order; absent indicators add exact zeros
+    for column, name in enumerate(INDICATOR_ORDER):
+        codes = batch.severities[:, column]
+        present = codes != SEVERITY_ABSENT
+        weight = weights.get(name, 0.0)
+        total_score += np.where(present, severity_table[np.where(present, codes, 0)] * weight, 0.0)
+        total_weight += np.where(present, weight, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weighted = np.maximum(0.0, 1.0 - total_score / total_weight)
+    # A weighted score of exactly 1.0 needs no rounding
+    weighted = np.where(total_weight == 0, 1.0, weighted)
+    return np.where(batch.has_indicators, weighted, fallback)
+
+
+def score_batch(
+    batch: DeliveryBatch,
+    weights: Mapping[str, float],
+    max_distance_meters: float,
+    config: Optional[WorkflowConfig] = None,
+) -> Dict[str, np.ndarray]:
+    """Score every row of ``batch``; arguments mirror ``compute_quality_index``.
+
+    Returns arrays keyed like the ``compute_quality_index`` result, plus a
+    boolean ``guarded`` array marking rows that needed a scalar recompute.
+    """
+    location, location_exact = location_accuracy(batch, max_distance_meters)
+    timeliness = _round3(_timeliness_unrounded(batch))
+    damage_raw = _damage_unrounded(batch, config)
+    damage = _round3(damage_raw)
+    guarded = np.zeros(len(batch), dtype=bool)
+
+    canonical = batch.indicator_order_canonical
+    if canonical is not None and batch.damage_reports is not None:
+        for row in np.flatnonzero(_near_half(damage_raw) & ~canonical):
+            damage[row] = compute_damage_score(batch.damage_reports[row], config)
+            guarded[row] = True
+
+    def quality_unrounded() -> np.ndarray:
+        return (
+            weights["location_accuracy"] * location
+            + weights["timeliness"] * timeliness
+            + weights["damage_score"] * damage
+        )
+
+    quality_raw = quality_unrounded()
+    inexact = np.flatnonzero(~location_exact & (_near_half(location) | _near_half(quality_raw)))
+    if len(inexact):
+        for row in inexact:
+            inputs = batch.row_inputs(int(row))
+            location[row] = compute_location_accuracy(inputs["exif"], inputs["context"], max_distance_meters)
+        guarded[inexact] = True
+        quality_raw = quality_unrounded()
+
+    return {
+        "location_accuracy": _round3(location),
+        "timeliness": timeliness,
+        "package_quality": damage,
+        "quality_index": _round3(quality_raw),
+        "guarded": guarded,
+    }
@@ -0,0 +1,143 @@
+"""Per-process snapshot of the config, LLM, tools and prompt chains.
+
+Warm function invocations reuse one :class:`WorkflowSnapshot` instead of
+re-reading the environment and rebuilding the LLM wrapper, the toolset and
+the prompt chains for every delivery. The snapshot records which
+environment variables :func:`~oci_delivery_agent.handlers.load_config` and
+the LLM factory read while it was built; it is rebuilt only when one of
+those values, or the optional config file, changes.
+
+``DELIVERY_CONFIG_FILE`` may point at a mounted JSON object of setting
+names to values (``{"WEIGHT_DAMAGE": "0.5", ...}``). Its values take
+precedence over the process environment for the config and the LLM, and
+editing the file is picked up on the next invocation through its
+modification time and size.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Set, Tuple
+
+from langchain_core.language_models import BaseLLM
+
+from .chains import pipeline_chains
+from .config import WorkflowConfig
+from .handlers import build_llm, load_config
+from .langchain_tools import toolset
+
+CONFIG_FILE_ENV = "DELIVERY_CONFIG_FILE"
+
+LLMFactory = Callable[[WorkflowConfig, Mapping[str, str]], BaseLLM]
+Fingerprint = Tuple[Tuple[Tuple[str, Optional[str]], ...], Optional[Tuple[str, int, int]]]
+
+
+class _RecordingEnviron(Mapping[str, str]):
+    """Read-only view of the settings that remembers which keys were read."""
+
+    def __init__(self, values: Mapping[str, str]):
+        self._values = values
+        self.keys_read: Set[str] = set()
+
+    def __getitem__(self, key: str) -> str:
+        self.keys_read.add(key)
+        return self._values[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self.keys_read.add(key)
+        return self._values.get(key, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def read_config_file(path: str) -> Dict[str, str]:
+    """Load a JSON object of setting overrides; values are converted to strings."""
+    with open(path, encoding="utf-8") as handle:
+        values = json.load(handle)
+    if not isinstance(values, dict):
+        raise ValueError(f"{path} must contain a JSON object of setting names to values")
+    return {str(key): value if isinstance(value, str) else json.dumps(value) for key, value in values.items()}
+
+
+def _file_state(path: Optional[str]) -> Optional[Tuple[str, int, int]]:
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, -1, -1)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def environment_fingerprint(keys: Iterable[str]) -> Fingerprint:
+    """Current values of ``keys`` plus the state of the config file."""
+    return (
+        tuple((key, os.environ.get(key)) for key in sorted(keys)),
+        _file_state(os.environ.get(CONFIG_FILE_ENV)),
+    )
+
+
+@dataclass(frozen=True)
+class WorkflowSnapshot:
+    """Everything ``run_quality_pipeline`` needs, built for one fingerprint."""
+
+    fingerprint: Fingerprint
+    config: WorkflowConfig
+    llm: BaseLLM
+    tools: Mapping[str, Any]
+    chains: Mapping[str, Any]
+
+
+def build_snapshot(llm_factory: Optional[LLMFactory] = None) -> WorkflowSnapshot:
+    """Build a snapshot from the current environment and config file."""
+    path = os.environ.get(CONFIG_FILE_ENV)
+    # Taken before reading, so an edit made during the build triggers another
+    file_state = _file_state(path)
+    overrides = read_config_file(path) if path else {}
+    environ = _RecordingEnviron({**os.environ, **overrides})
+    config = load_config(environ)
+    llm = (llm_factory or build_llm)(config, environ)
+    values, _ = environment_fingerprint(environ.keys_read | {CONFIG_FILE_ENV})
+    return WorkflowSnapshot(
+        fingerprint=(values, file_state),
+        config=config,
+        llm=llm,
+        tools=toolset(config),
+        chains=pipeline_chains(config, llm),
+    )
+
+
+_snapshot: Optional[WorkflowSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def _is_current(snapshot: Optional[WorkflowSnapshot]) -> bool:
+    if snapshot is None:
+        return False
+    values, file_state = snapshot.fingerprint
+    if _file_state(os.environ.get(CONFIG_FILE_ENV)) != file_state:
+        return False
+    get = os.environ.get
+    return all(get(key) == value for key, value in values)
+
+
+def get_workflow_snapshot(llm_factory: Optional[LLMFactory] = None) -> WorkflowSnapshot:
+    """Return the process-wide snapshot, rebuilding it if its inputs changed.
+
+    ``llm_factory`` (default :func:`~oci_delivery_agent.handlers.build_llm`)
+    is only called when a rebuild is needed.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if _is_current(snapshot):
+        return snapshot
+    with _snapshot_lock:
+        if not _is_current(_snapshot):
+            _snapshot = build_snapshot(llm_factory)
+        return _snapshot
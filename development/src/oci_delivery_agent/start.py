@@ -5,18 +5,31 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
 from datetime import datetime
 from typing import Any, Dict
 
 # from langchain.llms import OCIModel  # Commented out due to version compatibility
 from langchain.llms.fake import FakeListLLM
 
-from .chains import DeliveryContext, run_quality_pipeline
+from .batch import run_batch
+from .rescore import rescore_event_store, rescore_file
+from .chains import DeliveryContext, genai_concurrency, run_quality_pipeline
 from .config import (
+    AdaptiveConcurrencyConfig,
+    AlertConfig,
+    CacheConfig,
+    CallPolicyConfig,
+    CircuitBreakerConfig,
+    ConcurrencyConfig,
     DamageScoringConfig,
+    EventStoreConfig,
+    GenAIConfig,
     GeolocationConfig,
     ObjectStorageConfig,
+    PipelineConfig,
     QualityIndexWeights,
+    ReviewConfig,
     VisionConfig,
     WorkflowConfig,
 )
@@ -30,6 +43,11 @@ def _build_config(args: argparse.Namespace) -> WorkflowConfig:
         bucket_name=args.os_bucket or os.environ.get("OCI_OS_BUCKET", ""),
         delivery_prefix=args.delivery_prefix
         or os.environ.get("DELIVERY_PREFIX", "deliveries/"),
+        exif_probe_bytes=int(os.environ.get("EXIF_PROBE_BYTES", str(32 * 1024))),
+        max_object_bytes=int(float(os.environ.get("OBJECT_MAX_MB", "64")) * 1024 * 1024),
+        read_chunk_bytes=int(os.environ.get("OBJECT_READ_CHUNK_KB", "1024")) * 1024,
+        chunk_timeout_seconds=float(os.environ.get("OBJECT_CHUNK_TIMEOUT_SECONDS", "30")),
+        hash_while_streaming=os.environ.get("OBJECT_HASH_WHILE_STREAMING", "true").lower() == "true",
     )
     vision = VisionConfig(
         compartment_id=args.compartment_id or os.environ.get("OCI_COMPARTMENT_ID", ""),
@@ -37,12 +55,20 @@ def _build_config(args: argparse.Namespace) -> WorkflowConfig:
         or os.environ.get("OCI_CAPTION_ENDPOINT", ""),
         damage_detection_model_endpoint=args.damage_endpoint
         or os.environ.get("OCI_DAMAGE_ENDPOINT"),
+        max_image_long_edge=int(os.environ.get("VISION_MAX_IMAGE_LONG_EDGE", "1568")),
+        jpeg_quality=int(os.environ.get("VISION_JPEG_QUALITY", "85")),
+    )
+    genai = GenAIConfig(
+        model_ocid=os.environ.get("OCI_TEXT_MODEL_OCID", ""),
+        compartment_id=args.compartment_id or os.environ.get("OCI_COMPARTMENT_ID", ""),
+        hostname=os.environ.get("OCI_GENAI_HOSTNAME", ""),
     )
     geolocation = GeolocationConfig(
         max_distance_meters=args.max_distance
         or float(os.environ.get("MAX_DISTANCE_METERS", "50")),
         geocoding_api_endpoint=args.geocoding_endpoint
         or os.environ.get("GEOCODING_ENDPOINT"),
+        stops_path=args.stops or os.environ.get("STOPS_FILE") or None,
     )
     quality_weights = QualityIndexWeights(
         timeliness=args.weight_timeliness
@@ -60,16 +86,110 @@ def _build_config(args: argparse.Namespace) -> WorkflowConfig:
         moderate_max=float(os.environ.get("DAMAGE_SCORE_MODERATE_MAX", "0.7")),
         severe_min=float(os.environ.get("DAMAGE_SCORE_SEVERE_MIN", "0.9")),
     )
+    pipeline = PipelineConfig(
+        max_workers=args.max_workers
+        or int(os.environ.get("PIPELINE_MAX_WORKERS", "4")),
+        damage_mode=args.damage_mode
+        or os.environ.get("PIPELINE_DAMAGE_MODE", "sequential").lower(),
+    )
+    review = ReviewConfig(
+        mode=args.review_mode or os.environ.get("REVIEW_MODE", "llm").lower(),
+        ok_min_quality_index=float(os.environ.get("REVIEW_OK_MIN_QUALITY_INDEX", "0.85")),
+        flag_max_quality_index=float(os.environ.get("REVIEW_FLAG_MAX_QUALITY_INDEX", "0.5")),
+        min_location_accuracy=float(os.environ.get("REVIEW_MIN_LOCATION_ACCURACY", "0.5")),
+        min_timeliness=float(os.environ.get("REVIEW_MIN_TIMELINESS", "0.75")),
+        ok_max_damage_severity=os.environ.get("REVIEW_OK_MAX_DAMAGE_SEVERITY", "none").lower(),
+        flag_min_damage_severity=os.environ.get("REVIEW_FLAG_MIN_DAMAGE_SEVERITY", "moderate").lower(),
+    )
+    cache = CacheConfig(
+        enabled=not args.no_cache
+        and os.environ.get("GENAI_CACHE_ENABLED", "true").lower() == "true",
+        memory_max_bytes=int(float(os.environ.get("GENAI_CACHE_MEMORY_MB", "8")) * 1024 * 1024),
+        disk_path=args.cache_path or os.environ.get("GENAI_CACHE_PATH") or None,
+        ttl_seconds=float(os.environ.get("GENAI_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    )
+    concurrency = ConcurrencyConfig(
+        object_storage=int(os.environ.get("CONCURRENCY_OBJECT_STORAGE", "16")),
+        genai=int(os.environ.get("CONCURRENCY_GENAI", "8")),
+        compute=int(os.environ.get("CONCURRENCY_COMPUTE", "4")),
+    )
+    adaptive_concurrency = AdaptiveConcurrencyConfig(
+        enabled=os.environ.get("GENAI_ADAPTIVE_CONCURRENCY", "true").lower() == "true",
+        initial_limit=int(os.environ.get("GENAI_CONCURRENCY_INITIAL", "4")),
+        min_limit=int(os.environ.get("GENAI_CONCURRENCY_MIN", "1")),
+        max_limit=args.genai_max_concurrency or int(os.environ.get("GENAI_CONCURRENCY_MAX", "64")),
+        latency_tolerance=float(os.environ.get("GENAI_CONCURRENCY_LATENCY_TOLERANCE", "2.0")),
+        backoff_ratio=float(os.environ.get("GENAI_CONCURRENCY_BACKOFF_RATIO", "0.5")),
+    )
+    call_policy = CallPolicyConfig(
+        max_attempts=int(os.environ.get("GENAI_MAX_ATTEMPTS", "3")),
+        backoff_base_seconds=float(os.environ.get("GENAI_BACKOFF_BASE_SECONDS", "0.5")),
+        backoff_max_seconds=float(os.environ.get("GENAI_BACKOFF_MAX_SECONDS", "8")),
+        deadline_seconds=args.deadline
+        if args.deadline is not None
+        else float(os.environ.get("GENAI_DEADLINE_SECONDS", "0")),
+        deadline_reserve_seconds=float(os.environ.get("GENAI_DEADLINE_RESERVE_SECONDS", "5")),
+        min_attempt_seconds=float(os.environ.get("GENAI_MIN_ATTEMPT_SECONDS", "1")),
+        hedge=args.hedge or os.environ.get("GENAI_HEDGE", "false").lower() == "true",
+        hedge_percentile=float(os.environ.get("GENAI_HEDGE_PERCENTILE", "0.95")),
+        hedge_min_samples=int(os.environ.get("GENAI_HEDGE_MIN_SAMPLES", "20")),
+    )
+    circuit_breaker = CircuitBreakerConfig(
+        enabled=os.environ.get("GENAI_BREAKER_ENABLED", "true").lower() == "true",
+        window_seconds=float(os.environ.get("GENAI_BREAKER_WINDOW_SECONDS", "60")),
+        min_calls=int(os.environ.get("GENAI_BREAKER_MIN_CALLS", "10")),
+        failure_rate=float(os.environ.get("GENAI_BREAKER_FAILURE_RATE", "0.5")),
+        slow_call_seconds=float(os.environ.get("GENAI_BREAKER_SLOW_CALL_SECONDS", "60")),
+        slow_call_rate=float(os.environ.get("GENAI_BREAKER_SLOW_CALL_RATE", "0.8")),
+        open_seconds=float(os.environ.get("GENAI_BREAKER_OPEN_SECONDS", "30")),
+        half_open_probes=int(os.environ.get("GENAI_BREAKER_HALF_OPEN_PROBES", "1")),
+        requeue=os.environ.get("REINFERENCE_QUEUE", "file").lower(),
+        requeue_path=args.requeue_path or os.environ.get("REINFERENCE_QUEUE_PATH", "reinference_queue.jsonl"),
+        requeue_prefix=os.environ.get("REINFERENCE_QUEUE_PREFIX", "reinference/"),
+    )
+    events = EventStoreConfig(
+        backend=os.environ.get("QUALITY_BACKEND", "none").lower(),
+        sqlite_path=os.environ.get("QUALITY_SQLITE_PATH", "quality_events.db"),
+        adw_dsn=os.environ.get("QUALITY_ADW_DSN") or None,
+        adw_user=os.environ.get("QUALITY_ADW_USER") or None,
+        adw_password=os.environ.get("QUALITY_ADW_PASSWORD") or None,
+        adw_wallet_dir=os.environ.get("QUALITY_ADW_WALLET_DIR") or None,
+        batch_size=int(os.environ.get("QUALITY_BATCH_SIZE", "200")),
+        flush_interval_seconds=float(os.environ.get("QUALITY_FLUSH_INTERVAL_SECONDS", "1.0")),
+        max_queue=int(os.environ.get("QUALITY_MAX_QUEUE", "10000")),
+        enqueue_timeout_seconds=float(os.environ.get("QUALITY_ENQUEUE_TIMEOUT_SECONDS", "5")),
+    )
+    alerts = AlertConfig(
+        sink=os.environ.get("ALERT_SINK", "ons").lower(),
+        file_path=os.environ.get("ALERT_FILE_PATH", "alerts.jsonl"),
+        http_url=os.environ.get("ALERT_HTTP_URL") or None,
+        dedupe_window_seconds=float(os.environ.get("ALERT_DEDUPE_WINDOW_SECONDS", "600")),
+        digest_interval_seconds=float(os.environ.get("ALERT_DIGEST_INTERVAL_SECONDS", "60")),
+        max_digest_alerts=int(os.environ.get("ALERT_MAX_DIGEST_ALERTS", "50")),
+        max_queue=int(os.environ.get("ALERT_MAX_QUEUE", "1000")),
+    )
 
     return WorkflowConfig(
         object_storage=object_storage,
         vision=vision,
+        genai=genai,
         geolocation=geolocation,
         quality_weights=quality_weights,
         damage_scoring=damage_scoring,
+        pipeline=pipeline,
+        review=review,
+        cache=cache,
+        concurrency=concurrency,
+        adaptive_concurrency=adaptive_concurrency,
+        call_policy=call_policy,
+        circuit_breaker=circuit_breaker,
+        events=events,
+        alerts=alerts,
         notification_topic_id=os.environ.get("NOTIFICATION_TOPIC_ID"),
         database_table=os.environ.get("QUALITY_TABLE", "delivery_quality_events"),
         local_asset_root=args.local_asset_root or os.environ.get("LOCAL_ASSET_ROOT"),
+        genai_streaming=args.stream
+        or os.environ.get("GENAI_STREAMING", "false").lower() == "true",
     )
 
 
@@ -99,14 +219,7 @@ def _build_llm(config: WorkflowConfig, args: argparse.Namespace):
     return build_llm(config)
 
 
-def parse_args(argv: Any | None = None) -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description=__doc__)
-    parser.add_argument("object_name", help="Object name or path of the delivery photo")
-    parser.add_argument("expected_latitude", type=float, help="Expected delivery latitude")
-    parser.add_argument("expected_longitude", type=float, help="Expected delivery longitude")
-    parser.add_argument("promised_time", help="ISO timestamp of the promised delivery time")
-    parser.add_argument("delivered_time", help="ISO timestamp of when the delivery occurred")
-
+def _add_config_arguments(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--dry-run", action="store_true", help="Use a fake LLM for offline testing")
     parser.add_argument("--model-ocid", dest="model_ocid", help="OCI Generative AI model OCID")
     parser.add_argument("--os-namespace", dest="os_namespace", help="OCI Object Storage namespace")
@@ -117,15 +230,147 @@ def parse_args(argv: Any | None = None) -> argparse.Namespace:
     parser.add_argument("--damage-endpoint", dest="damage_endpoint", help="Damage model endpoint URL")
     parser.add_argument("--geocoding-endpoint", dest="geocoding_endpoint", help="Geocoding API endpoint")
     parser.add_argument("--max-distance", dest="max_distance", type=float, help="Max geolocation tolerance in meters")
+    parser.add_argument("--stops", help="CSV or JSONL of planned stops (stop_id, latitude, longitude, route_id)")
     parser.add_argument("--weight-timeliness", dest="weight_timeliness", type=float, help="Timeliness weight")
     parser.add_argument("--weight-location", dest="weight_location", type=float, help="Location accuracy weight")
     parser.add_argument("--weight-damage", dest="weight_damage", type=float, help="Damage weight")
+    parser.add_argument("--max-workers", dest="max_workers", type=int, help="Concurrent pipeline stage workers")
+    parser.add_argument(
+        "--damage-mode",
+        dest="damage_mode",
+        choices=["sequential", "independent", "speculative", "combined"],
+        help="How damage detection is scheduled relative to captioning",
+    )
+    parser.add_argument(
+        "--review-mode",
+        dest="review_mode",
+        choices=["llm", "hybrid", "rules"],
+        help="Review every delivery with the LLM, only borderline ones (hybrid), or never (rules)",
+    )
+    parser.add_argument("--cache-path", dest="cache_path", help="SQLite file for the persistent GenAI result cache")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="Disable the GenAI result cache")
+    parser.add_argument("--stream", action="store_true", help="Stream GenAI responses and stop at the closing JSON")
+    parser.add_argument("--deadline", type=float, help="Seconds each delivery's GenAI calls and retries may take (0 for none)")
+    parser.add_argument("--hedge", action="store_true", help="Send a duplicate GenAI request once a call outlasts the p95 latency")
+    parser.add_argument(
+        "--genai-max-concurrency",
+        dest="genai_max_concurrency",
+        type=int,
+        help="Upper bound for the adaptive limit on GenAI requests in flight",
+    )
+    parser.add_argument(
+        "--requeue-path",
+        dest="requeue_path",
+        help="Manifest that deliveries scored without GenAI are appended to for re-inference",
+    )
     parser.add_argument("--local-asset-root", dest="local_asset_root", help="Local directory for offline assets")
 
+
+def parse_args(argv: Any | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("object_name", help="Object name or path of the delivery photo")
+    parser.add_argument("expected_latitude", type=float, help="Expected delivery latitude")
+    parser.add_argument("expected_longitude", type=float, help="Expected delivery longitude")
+    parser.add_argument("promised_time", help="ISO timestamp of the promised delivery time")
+    parser.add_argument("delivered_time", help="ISO timestamp of when the delivery occurred")
+    _add_config_arguments(parser)
+
+    return parser.parse_args(argv)
+
+
+def parse_batch_args(argv: Any | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="start.py batch",
+        description="Score a JSONL or CSV manifest of deliveries with one shared config, LLM and toolset.",
+    )
+    parser.add_argument(
+        "manifest",
+        help=(
+            "Manifest with object_name, expected_latitude, expected_longitude, promised_time, delivered_time "
+            "(stop_id may replace the expected coordinates when --stops is given)"
+        ),
+    )
+    parser.add_argument("--output", required=True, help="JSONL file that results are appended to")
+    parser.add_argument("--checkpoint", help="File recording completed object names, used to resume")
+    parser.add_argument("--workers", type=int, default=4, help="Deliveries scored concurrently")
+    _add_config_arguments(parser)
+
     return parser.parse_args(argv)
 
 
+def batch_main(argv: Any | None = None) -> Dict[str, int]:
+    args = parse_batch_args(argv)
+    config = _build_config(args)
+    llm = _build_llm(config, args)
+
+    summary = run_batch(
+        config=config,
+        llm=llm,
+        manifest_path=args.manifest,
+        output_path=args.output,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+    )
+    print(json.dumps(summary, indent=2))
+    concurrency = genai_concurrency(config)
+    if concurrency is not None:
+        print(f"GenAI concurrency: {json.dumps(concurrency)}")
+    return summary
+
+
+def parse_rescore_args(argv: Any | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="start.py rescore",
+        description=(
+            "Recompute quality metrics from stored exif and damage reports under the current "
+            "weights, without GenAI calls."
+        ),
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("input", nargs="?", help="Results JSONL written by batch mode")
+    source.add_argument(
+        "--event-store",
+        dest="event_store",
+        action="store_true",
+        help="Re-score the configured quality event store (QUALITY_BACKEND) in place",
+    )
+    parser.add_argument("--output", help="JSONL file for re-scored results (with an input file)")
+    parser.add_argument("--manifest", help="Manifest supplying delivery details for older results")
+    parser.add_argument("--chunk-size", dest="chunk_size", type=int, default=10000, help="Rows scored per vectorized batch")
+    _add_config_arguments(parser)
+
+    args = parser.parse_args(argv)
+    if args.input and not args.output:
+        parser.error("--output is required when re-scoring a results file")
+    return args
+
+
+def rescore_main(argv: Any | None = None) -> Dict[str, int]:
+    args = parse_rescore_args(argv)
+    config = _build_config(args)
+    print(f"Scoring config version: {config.scoring_version()}")
+
+    if args.event_store:
+        summary = rescore_event_store(config, chunk_size=args.chunk_size)
+    else:
+        summary = rescore_file(
+            config,
+            args.input,
+            args.output,
+            manifest_path=args.manifest,
+            chunk_size=args.chunk_size,
+        )
+    print(json.dumps(summary, indent=2))
+    return summary
+
+
 def main(argv: Any | None = None) -> Dict[str, Any]:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == "batch":
+        return batch_main(argv[1:])
+    if argv and argv[0] == "rescore":
+        return rescore_main(argv[1:])
+
     args = parse_args(argv)
     config = _build_config(args)
     context = _build_context(args)
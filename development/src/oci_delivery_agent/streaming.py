@@ -0,0 +1,83 @@
+"""Bounded, chunked reads of object bodies.
+
+Object bodies are read in fixed-size chunks into a single buffer that is
+preallocated when the length is known up front. Reads stop with
+:class:`ObjectTooLargeError` as soon as the body exceeds the configured cap,
+so an oversized upload cannot exhaust a small function's memory, and the
+SHA-256 used for result caching is computed on the same pass.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import BinaryIO, Optional, Tuple
+
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+
+class ObjectTooLargeError(ValueError):
+    """Raised when an object exceeds the configured maximum size."""
+
+    def __init__(self, size: int, max_bytes: int):
+        super().__init__(f"Object is larger than the {max_bytes} byte limit (at least {size} bytes)")
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+class DownloadStalledError(TimeoutError):
+    """Raised when a single chunk takes longer than the per-chunk timeout."""
+
+
+def read_stream(
+    stream: BinaryIO,
+    max_bytes: int,
+    expected_size: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    chunk_timeout: Optional[float] = None,
+    hash_while_reading: bool = True,
+) -> Tuple[bytearray, Optional[str]]:
+    """Read ``stream`` to the end and return ``(data, sha256_hex_or_None)``.
+
+    ``expected_size`` (usually the Content-Length) is checked against
+    ``max_bytes`` before anything is read and sizes the buffer exactly.
+    ``chunk_timeout`` bounds the wall time of each chunk read; a socket read
+    timeout on the underlying client is still needed to interrupt a read
+    that never returns.
+    """
+    if expected_size is not None and expected_size > max_bytes:
+        raise ObjectTooLargeError(expected_size, max_bytes)
+
+    hasher = hashlib.sha256() if hash_while_reading else None
+    buffer = bytearray(expected_size or 0)
+    view = memoryview(buffer)
+    size = 0
+    try:
+        while True:
+            started = time.monotonic()
+            chunk = stream.read(chunk_bytes)
+            if chunk_timeout is not None and time.monotonic() - started > chunk_timeout:
+                raise DownloadStalledError(
+                    f"Chunk read took longer than {chunk_timeout}s after {size} bytes"
+                )
+            if not chunk:
+                break
+            end = size + len(chunk)
+            if end > max_bytes:
+                raise ObjectTooLargeError(end, max_bytes)
+            if end <= len(buffer):
+                view[size:end] = chunk
+            else:
+                # Length unknown or understated: grow, still bounded by max_bytes
+                view.release()
+                del buffer[size:]
+                buffer += chunk
+                view = memoryview(buffer)
+            if hasher is not None:
+                hasher.update(chunk)
+            size = end
+    finally:
+        view.release()
+
+    if size < len(buffer):
+        raise IOError(f"Object body ended after {size} of {len(buffer)} expected bytes")
+    return buffer, hasher.hexdigest() if hasher is not None else None
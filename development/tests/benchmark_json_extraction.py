@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass JSON extraction used for model responses.
+
+Compares the scanner with the multi-strategy parser it replaced, on the
+response corpus and on malformed responses of growing size. Timings depend
+on the machine, so this is a script rather than a test:
+
+    python tests/benchmark_json_extraction.py
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from oci_delivery_agent.jsonscan import extract_json_object  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'model_responses', 'json_corpus.jsonl')
+INDICATOR = '"evidence": {"present": true, "severity": "minor", "notes": "dent [left] {edge}"}, '
+
+
+def _legacy_parse(raw_text):
+    """The fence strip / loads / brace / bracket / regex cascade this replaced."""
+    clean = raw_text.strip()
+    if clean.startswith("```"):
+        clean = "\n".join(line for line in clean.splitlines() if not line.strip().startswith("```")).strip()
+    try:
+        return json.loads(clean)
+    except Exception:
+        pass
+    for opener, closer in (("{", "}"), ("[", "]")):
+        start, end = clean.find(opener), clean.rfind(closer)
+        if start != -1 and end > start:
+            try:
+                return json.loads(clean[start:end + 1])
+            except Exception:
+                pass
+    for match in re.findall(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', clean, re.DOTALL):
+        try:
+            return json.loads(match)
+        except Exception:
+            continue
+    return None
+
+
+def per_call_us(func, texts, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - started) / (repeat * len(texts)) * 1e6
+
+
+def main():
+    print("🚀 JSON Extraction Benchmark")
+    print("=" * 60)
+
+    with open(CORPUS_PATH, encoding="utf-8") as handle:
+        corpus = [json.loads(line)["text"] for line in handle if line.strip()]
+    print(f"corpus     : scanner {per_call_us(extract_json_object, corpus, 200):7.1f}us  "
+          f"legacy {per_call_us(_legacy_parse, corpus, 200):7.1f}us per response")
+
+    # A report cut off by max_tokens and a response with bracketed prose
+    # before the object: the legacy parser runs every strategy over the text
+    shapes = {
+        "truncated": lambda size: "Here is the report:\n```json\n{\"indicators\": {" + INDICATOR * size,
+        "bracketed": lambda size: 'Note ["x] see [1] and [0.9, 0.8] ' * size + '{"status": "OK"}',
+    }
+    for name, build in shapes.items():
+        timings = {}
+        for size in (40, 400, 4000):
+            text = build(size)
+            timings[size] = per_call_us(extract_json_object, [text], 20)
+            legacy = per_call_us(_legacy_parse, [text], 3)
+            print(f"{name:10s} {len(text):7d} chars: scanner {timings[size]:9.1f}us  legacy {legacy:9.1f}us")
+        print(f"{name:10s} 100x input -> {timings[4000] / timings[40]:.1f}x scanner time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Shared pytest fixtures for the oci_delivery_agent tests."""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+# Make the package importable without installing it
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+@pytest.fixture
+def workflow_config():
+    """Build a local ``WorkflowConfig``; keyword arguments replace its sections."""
+    from oci_delivery_agent.config import ObjectStorageConfig, VisionConfig, WorkflowConfig
+
+    def build(**overrides):
+        overrides.setdefault("object_storage", ObjectStorageConfig(namespace="test", bucket_name="test"))
+        overrides.setdefault("vision", VisionConfig(compartment_id="", image_caption_model_endpoint=""))
+        return WorkflowConfig(**overrides)
+
+    return build
+
+
+@pytest.fixture
+def delivery_context():
+    """Build an on-time ``DeliveryContext`` for ``sample.jpg``; keyword arguments override it."""
+    from oci_delivery_agent.chains import DeliveryContext
+
+    def build(**overrides):
+        fields = {
+            "object_name": "sample.jpg",
+            "expected_latitude": 40.0,
+            "expected_longitude": -74.0,
+            "promised_time_utc": datetime(2024, 1, 15, 10, 0),
+            "delivered_time_utc": datetime(2024, 1, 15, 9, 0),
+        }
+        fields.update(overrides)
+        return DeliveryContext(**fields)
+
+    return build
+
+
+class _ServiceError(Exception):
+    """Stand-in for ``oci.exceptions.ServiceError``."""
+
+    def __init__(self, status):
+        super().__init__(f"status {status}")
+        self.status = status
+
+
+@pytest.fixture
+def service_error():
+    """Exception class carrying an HTTP ``status``, as the OCI SDK raises."""
+    return _ServiceError
+
+
+class _FakeClock:
+    """Monotonic clock the test advances by hand through ``now``."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def fake_clock():
+    return _FakeClock()
@@ -0,0 +1,107 @@
+"""Tests for the adaptive (AIMD) concurrency limit on GenAI requests."""
+
+import threading
+import time
+
+import pytest
+
+from oci_delivery_agent.callpolicy import DeadlineExceeded, request_deadline
+from oci_delivery_agent.concurrency import AdaptiveLimiter
+from oci_delivery_agent.config import AdaptiveConcurrencyConfig
+
+
+def fill(limiter):
+    """Take every free slot; return how many were taken."""
+    taken = 0
+    while limiter.acquire(timeout=0):
+        taken += 1
+    return taken
+
+
+def test_limit_adjustments(fake_clock):
+    """Flat latency grows the limit; throttling and latency spikes cut it."""
+    config = AdaptiveConcurrencyConfig(initial_limit=4, min_limit=2, max_limit=10)
+    limiter = AdaptiveLimiter(config, clock=fake_clock)
+
+    # Rounds that fill the limit at a flat 1s latency keep raising it
+    for _ in range(8):
+        for _ in range(fill(limiter)):
+            limiter.release("vision", 1.0)
+    assert limiter.limit >= 7
+
+    # A 429 halves the limit, once per round trip
+    for _ in range(fill(limiter) - 2):
+        limiter.release("vision", 1.0)
+    before = limiter.limit
+    limiter.release("vision", 0.2, success=False, throttled=True)
+    limiter.release("vision", 0.2, success=False, throttled=True)
+    assert limiter.limit == before // 2
+
+    # A latency spike backs off too, but not below min_limit
+    fake_clock.now += 10
+    for _ in range(fill(limiter)):
+        limiter.release("vision", 5.0)
+        fake_clock.now += 10
+    assert limiter.limit == config.min_limit
+    assert limiter.as_dict()["latency_backoffs"] >= 1
+
+    # Text calls keep their own baseline, so a slow text call is not a spike
+    backoffs = limiter.as_dict()["latency_backoffs"]
+    fake_clock.now += 10
+    limiter.acquire(timeout=0)
+    limiter.release("text", 4.0)
+    assert limiter.as_dict()["latency_backoffs"] == backoffs
+    assert set(limiter.as_dict()["baseline_seconds"]) == {"vision", "text"}
+
+    # Growth stops at max_limit
+    for _ in range(200):
+        for _ in range(fill(limiter)):
+            limiter.release("vision", 1.0)
+    assert limiter.limit == config.max_limit
+
+
+def test_slots_bound_concurrent_calls():
+    limiter = AdaptiveLimiter(AdaptiveConcurrencyConfig(initial_limit=3, max_limit=3, latency_tolerance=100))
+    lock = threading.Lock()
+    peak = 0
+    active = 0
+
+    def call():
+        nonlocal peak, active
+        with limiter.slot("text"):
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=lambda: [call() for _ in range(5)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak <= 3
+    assert limiter.in_flight == 0
+
+
+def test_throttled_slot_shrinks_limit(service_error):
+    limiter = AdaptiveLimiter(AdaptiveConcurrencyConfig(initial_limit=3, max_limit=3))
+    with pytest.raises(service_error):
+        with limiter.slot("text"):
+            raise service_error(429)
+    assert limiter.limit == 1
+    assert limiter.as_dict()["throttled"] == 1
+
+
+def test_waiting_for_a_slot_ends_at_deadline():
+    limiter = AdaptiveLimiter(AdaptiveConcurrencyConfig(initial_limit=1, min_limit=1, max_limit=1))
+    limiter.acquire()
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            with request_deadline(0.05), limiter.slot("text"):
+                pass
+    finally:
+        limiter.release("text", 0.01)
+    assert time.monotonic() - started < 1
@@ -0,0 +1,168 @@
+"""Tests for the coalescing alert dispatcher."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from oci_delivery_agent.alerts import Alert, AlertDispatcher, FileSink, get_alert_dispatcher
+
+
+def _alert(object_name, driver_id=None, topic="ocid1.onstopic.test"):
+    return Alert(topic=topic, object_name=object_name, status="Review", driver_id=driver_id,
+                 quality_index=0.4, issues=["Package visibly damaged"])
+
+
+class SlowSink:
+    """Sink that blocks until released, to simulate a stalled Notifications call."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.digests = []
+
+    def send(self, digest):
+        self.release.wait()
+        self.digests.append(digest)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def http_sink():
+    """Local HTTP server standing in for the alert endpoint; yields (url, received digests)."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/alerts", received
+    server.shutdown()
+
+
+def test_storm_is_coalesced_into_digests(tmp_path):
+    path = str(tmp_path / "alerts.jsonl")
+    dispatcher = AlertDispatcher(
+        FileSink(path), dedupe_window_seconds=60, digest_interval_seconds=30, max_digest_alerts=10
+    )
+    # 25 deliveries by 5 drivers, each delivery reported twice, across two topics
+    for _ in range(2):
+        for i in range(25):
+            topic = "ocid1.onstopic.a" if i % 5 else "ocid1.onstopic.b"
+            dispatcher.submit(_alert(f"photo{i}.jpg", driver_id=f"driver{i % 5}", topic=topic))
+    dispatcher.flush(timeout=5)
+    dispatcher.close()
+
+    with open(path) as handle:
+        digests = [json.loads(line) for line in handle]
+    assert sum(len(digest["alerts"]) for digest in digests) == 5
+    assert sum(sum(digest["suppressed"].values()) for digest in digests) == 45
+    assert sorted(digest["topic"] for digest in digests) == ["ocid1.onstopic.a", "ocid1.onstopic.b"]
+    assert dispatcher.stats["sent"] == 5
+    assert dispatcher.stats["suppressed"] == 45
+
+
+def test_submit_never_blocks_on_a_stalled_sink():
+    sink = SlowSink()
+    dispatcher = AlertDispatcher(
+        sink, dedupe_window_seconds=0, digest_interval_seconds=0.01, max_digest_alerts=1, max_queue=5
+    )
+    started = time.monotonic()
+    accepted = [dispatcher.submit(_alert(f"photo{i}.jpg")) for i in range(50)]
+    assert time.monotonic() - started < 0.5
+    # The queue is bounded, so overflow is dropped
+    assert not all(accepted)
+
+    sink.release.set()
+    dispatcher.flush(timeout=5)
+    dispatcher.close()
+    assert dispatcher.stats["sent"] == sum(accepted)
+
+
+def test_trigger_alert_reaches_http_sink(workflow_config, http_sink):
+    from oci_delivery_agent.config import AlertConfig
+    from oci_delivery_agent.handlers import trigger_alert
+
+    url, received = http_sink
+    config = workflow_config(
+        alerts=AlertConfig(sink="http", http_url=url),
+        notification_topic_id="ocid1.onstopic.ops",
+    )
+    output = {
+        "metadata": {"object_name": "deliveries/a.jpg"},
+        "quality_metrics": {"quality_index": 0.31},
+        "assessment": {"status": "Review", "issues": ["Leakage"]},
+    }
+    trigger_alert(config, output, driver_id="driver7")
+    dispatcher = get_alert_dispatcher(config)
+    dispatcher.flush(timeout=5)
+    dispatcher.close()
+
+    assert len(received) == 1
+    assert received[0]["topic"] == "ocid1.onstopic.ops"
+    assert "driver driver7" in received[0]["body"]
+    assert "Leakage" in received[0]["body"]
+
+
+def test_handler_flush_sends_only_due_digests(workflow_config, http_sink):
+    from oci_delivery_agent.config import AlertConfig
+    from oci_delivery_agent.handlers import flush_pending_output, trigger_alert
+
+    url, received = http_sink
+    config = workflow_config(alerts=AlertConfig(sink="http", http_url=url, digest_interval_seconds=0.2))
+    # Each invocation flushes, but alerts inside the interval still share a digest
+    for name in ("b.jpg", "c.jpg"):
+        trigger_alert(config, {"metadata": {"object_name": name}, "assessment": {"status": "Review"}})
+        assert flush_pending_output(config, timeout=5) == []
+    assert received == []
+
+    # Once the interval has ended the digest is sent by the time the flush returns
+    time.sleep(0.25)
+    trigger_alert(config, {"metadata": {"object_name": "d.jpg"}, "assessment": {"status": "Review"}})
+    assert flush_pending_output(config, timeout=5) == []
+    assert [len(digest["alerts"]) for digest in received] == [2]
+
+    # The rest goes out at shutdown
+    get_alert_dispatcher(config).close(timeout=5)
+    assert [len(digest["alerts"]) for digest in received] == [2, 1]
+
+
+def test_handler_flush_is_bounded(workflow_config, monkeypatch):
+    from oci_delivery_agent import handlers
+
+    sink = SlowSink()
+    dispatcher = AlertDispatcher(sink, digest_interval_seconds=0.01)
+    monkeypatch.setattr(handlers, "get_alert_dispatcher", lambda config: dispatcher)
+    dispatcher.submit(_alert("photo.jpg"))
+    time.sleep(0.05)
+
+    started = time.monotonic()
+    assert handlers.flush_pending_output(workflow_config(), timeout=0.1) == ["alerts"]
+    assert time.monotonic() - started < 1.0
+    sink.release.set()
+    dispatcher.close(timeout=5)
+
+
+@pytest.mark.parametrize("seconds_left, expected", [(None, 10.0), (3.5, 2.5), (0.5, 0.0), (300, 10.0)])
+def test_flush_timeout_fits_the_invocation_deadline(seconds_left, expected):
+    from datetime import datetime, timedelta, timezone
+    from types import SimpleNamespace
+
+    from oci_delivery_agent.handlers import flush_timeout
+
+    if seconds_left is None:
+        ctx = SimpleNamespace()
+    else:
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=seconds_left)
+        ctx = SimpleNamespace(Deadline=lambda: deadline.isoformat())
+    assert flush_timeout(ctx) == pytest.approx(expected, abs=0.1)
@@ -0,0 +1,109 @@
+"""Tests for the asyncio pipeline, per-service limits and async tool implementations."""
+
+import asyncio
+import base64
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from oci_delivery_agent.concurrency import ServiceLimiter
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets', 'deliveries')
+
+
+def test_service_limits_are_respected():
+    limiter = ServiceLimiter({"genai": 3, "object_storage": 5})
+    lock = threading.Lock()
+    active = {"genai": 0, "object_storage": 0}
+    peak = {"genai": 0, "object_storage": 0}
+
+    def blocking_call(service):
+        with lock:
+            active[service] += 1
+            peak[service] = max(peak[service], active[service])
+        time.sleep(0.05)
+        with lock:
+            active[service] -= 1
+        return service
+
+    async def drive():
+        calls = [limiter.run("genai", blocking_call, "genai") for _ in range(12)]
+        calls += [limiter.run("object_storage", blocking_call, "object_storage") for _ in range(12)]
+        return await asyncio.gather(*calls)
+
+    try:
+        results = asyncio.run(drive())
+    finally:
+        limiter.shutdown()
+
+    assert len(results) == 24
+    assert peak["genai"] <= 3
+    assert peak["object_storage"] <= 5
+
+
+def test_async_pipeline_matches_sync_and_overlaps(workflow_config, delivery_context):
+    from langchain_community.llms.fake import FakeListLLM
+    from oci_delivery_agent.artifacts import ImageArtifact
+    from oci_delivery_agent.chains import arun_quality_pipeline, run_quality_pipeline
+    from oci_delivery_agent.config import ConcurrencyConfig
+
+    def slow_caption(image):
+        time.sleep(0.1)
+        return json.dumps({"packageVisible": True})
+
+    def slow_detect(image, caption_context=None):
+        time.sleep(0.1)
+        return {"overall": {"severity": "none", "score": 0.0}}
+
+    tools = {
+        "retrieval": SimpleNamespace(
+            fetch=lambda name: ImageArtifact(b"jpeg", metadata={"object_name": name}),
+            exif_from_prefix=lambda name: {},
+        ),
+        "caption": SimpleNamespace(caption=slow_caption),
+        "damage": SimpleNamespace(detect=slow_detect),
+    }
+    context = delivery_context()
+    config = workflow_config(concurrency=ConcurrencyConfig(genai=20))
+    llm = FakeListLLM(responses=['{"status": "OK", "issues": [], "insights": "clean"}'] * 100)
+
+    expected = run_quality_pipeline(config, llm, context, "sample.jpg", tools=tools)
+
+    async def drive():
+        return await asyncio.gather(
+            *(arun_quality_pipeline(config, llm, context, "sample.jpg", tools=tools) for _ in range(20))
+        )
+
+    started = time.perf_counter()
+    results = asyncio.run(drive())
+    elapsed = time.perf_counter() - started
+
+    for key in ("exif", "damage_report", "quality_metrics", "assessment"):
+        assert all(result[key] == expected[key] for result in results), key
+    # 20 deliveries with 0.2s of GenAI work each
+    assert elapsed < 2.0
+
+
+def test_tool_arun_matches_sync(workflow_config):
+    from oci_delivery_agent.config import ObjectStorageConfig
+    from oci_delivery_agent.tools import ExifExtractionTool, ObjectRetrievalTool
+
+    config = workflow_config(
+        object_storage=ObjectStorageConfig(namespace="", bucket_name=""),
+        local_asset_root=ASSET_DIR,
+    )
+    retrieval = ObjectRetrievalTool(config)
+    exif_tool = ExifExtractionTool(config)
+    with open(os.path.join(ASSET_DIR, "damage1.jpg"), "rb") as handle:
+        payload = base64.b64encode(handle.read()).decode("ascii")
+
+    async def drive():
+        fetched = json.loads(await retrieval.ainvoke("damage1.jpg"))
+        exif = await exif_tool.ainvoke(payload)
+        return fetched, exif
+
+    fetched, exif = asyncio.run(drive())
+    assert fetched["payload"].startswith("artifact:")
+    assert exif == exif_tool.invoke(payload)
@@ -0,0 +1,64 @@
+"""Tests for bulk manifest scoring through the start.py batch subcommand."""
+
+import csv
+import json
+import os
+
+from oci_delivery_agent.batch import read_manifest
+from oci_delivery_agent.start import main
+
+ASSET_ROOT = os.path.join(os.path.dirname(__file__), '..', 'assets')
+
+
+def _row(object_name):
+    return {
+        "object_name": object_name,
+        "expected_latitude": 40.7128,
+        "expected_longitude": -74.0060,
+        "promised_time": "2024-01-15T10:00:00",
+        "delivered_time": "2024-01-15T10:30:00",
+    }
+
+
+def _write_manifest(path, names, mode="w"):
+    with open(path, mode) as f:
+        for name in names:
+            f.write(json.dumps(_row(name)) + "\n")
+
+
+def test_batch_streams_results_and_resumes_from_checkpoint(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    output = tmp_path / "results.jsonl"
+    argv = [
+        "batch", str(manifest),
+        "--output", str(output),
+        "--checkpoint", str(tmp_path / "checkpoint.txt"),
+        "--workers", "2",
+        "--dry-run",
+        "--os-namespace", "test",
+        "--os-bucket", "test",
+        "--local-asset-root", ASSET_ROOT,
+    ]
+    _write_manifest(manifest, ("damage1.jpg", "damage2.jpg", "missing.jpg"))
+    assert main(argv) == {"processed": 2, "failed": 1, "skipped": 0}
+
+    # An interrupted backfill that is extended and restarted
+    _write_manifest(manifest, ("damage3.jpg",), mode="a")
+    assert main(argv) == {"processed": 1, "failed": 1, "skipped": 2}
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    scored = [r for r in records if "error" not in r]
+    assert sorted(r["object_name"] for r in scored) == ["damage1.jpg", "damage2.jpg", "damage3.jpg"]
+    assert all("quality_metrics" in r for r in scored)
+
+
+def test_csv_manifest(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    with open(manifest, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(_row("x")))
+        writer.writeheader()
+        writer.writerow(_row("damage4.jpg"))
+
+    contexts = list(read_manifest(str(manifest)))
+    assert len(contexts) == 1
+    assert contexts[0].expected_latitude == 40.7128
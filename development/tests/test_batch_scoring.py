@@ -0,0 +1,104 @@
+"""Tests for vectorized batch scoring against the per-delivery scoring functions."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from oci_delivery_agent.chains import DeliveryContext, compute_quality_index
+from oci_delivery_agent.config import DamageScoringConfig
+from oci_delivery_agent.scoring import SEVERITY_ABSENT, DeliveryBatch, score_batch
+
+SEVERITIES = ("none", "minor", "moderate", "severe", "catastrophic")
+INDICATORS = ("leakage", "boxDeformation", "packagingIntegrity", "cornerDamage", "labelDamage")
+
+
+def _random_delivery(rng):
+    base = datetime(2024, 1, 15, 10, 0, tzinfo=timezone.utc if rng.random() < 0.5 else None)
+    # Whole-minute delays hit rounding ties often, which exercises the guard
+    delay = timedelta(minutes=rng.randint(-60, 300)) if rng.random() < 0.7 else timedelta(seconds=rng.uniform(-3600, 18000))
+    lat, lon = rng.uniform(-60, 60), rng.uniform(-180, 180)
+    context = DeliveryContext(
+        object_name="photo.jpg",
+        expected_latitude=lat,
+        expected_longitude=lon,
+        promised_time_utc=base,
+        delivered_time_utc=base + delay,
+    )
+
+    roll = rng.random()
+    if roll < 0.15:
+        exif = {}
+    elif roll < 0.2:
+        exif = {"GPSInfo": {"latitude": None, "longitude": lon}}
+    else:
+        offset = rng.choice([0.0, rng.uniform(-0.0003, 0.0003), rng.uniform(-0.01, 0.01)])
+        exif = {"GPSInfo": {"latitude": lat + offset, "longitude": lon - offset}}
+
+    roll = rng.random()
+    if roll < 0.1:
+        report = {"overall": {"score": rng.choice([0.05, 0.35, 0.65, rng.random()])}}
+    elif roll < 0.15:
+        report = {"damage": rng.random()}
+    else:
+        names = list(INDICATORS)
+        rng.shuffle(names)  # the scalar loop follows the report's key order
+        report = {
+            "indicators": {
+                name: {"present": rng.random() < 0.4, "severity": rng.choice(SEVERITIES)}
+                for name in names[:rng.randint(1, len(names))]
+            },
+            "overall": {"score": rng.random()},
+        }
+    return context, exif, report
+
+
+@pytest.fixture(scope="module")
+def deliveries():
+    rng = random.Random(13)
+    return [_random_delivery(rng) for _ in range(20000)]
+
+
+@pytest.mark.parametrize("weighted", [True, False])
+def test_batch_matches_scalar_exactly(workflow_config, deliveries, weighted):
+    config = workflow_config(damage_scoring=DamageScoringConfig(use_weighted_scoring=weighted))
+    weights = config.quality_weights.normalized()
+    expected = [
+        compute_quality_index(
+            context=context, exif=exif, damage_report=report, weights=weights,
+            max_distance_meters=50.0, config=config,
+        )
+        for context, exif, report in deliveries
+    ]
+    contexts, exifs, reports = (list(column) for column in zip(*deliveries))
+    result = score_batch(DeliveryBatch.from_deliveries(contexts, exifs, reports), weights, 50.0, config=config)
+
+    mismatches = [
+        (row, key, expected[row][key], float(result[key][row]))
+        for row in range(len(deliveries))
+        for key in ("location_accuracy", "timeliness", "package_quality", "quality_index")
+        if expected[row][key] != float(result[key][row])
+    ]
+    assert mismatches == []
+
+
+def test_columns_without_reports_score_like_scalar(workflow_config):
+    config = workflow_config()
+    weights = config.quality_weights.normalized()
+    promised = np.array(["2024-01-15T10:00", "2024-01-15T10:00"], dtype="datetime64[us]").astype(np.int64)
+    batch = DeliveryBatch(
+        gps_latitude=np.array([40.7128, np.nan]),
+        gps_longitude=np.array([-74.0061, np.nan]),
+        expected_latitude=np.array([40.7128, 40.7128]),
+        expected_longitude=np.array([-74.0060, -74.0060]),
+        promised_us=promised,
+        delivered_us=promised + np.array([90, 0]) * 60 * 10**6,
+        severities=np.array([[1, SEVERITY_ABSENT, 2, SEVERITY_ABSENT], [SEVERITY_ABSENT] * 4], dtype=np.int8),
+        has_indicators=np.array([True, False]),
+        damage_probability=np.array([0.5, 0.2]),
+    )
+    result = score_batch(batch, weights, 50.0, config=config)
+    for row in range(2):
+        scalar = compute_quality_index(weights=weights, max_distance_meters=50.0, config=config, **batch.row_inputs(row))
+        assert {key: float(result[key][row]) for key in scalar} == scalar
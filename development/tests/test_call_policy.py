@@ -0,0 +1,128 @@
+"""Tests for retries, deadlines and hedged requests for GenAI calls."""
+
+import threading
+import time
+
+import pytest
+
+from oci_delivery_agent.callpolicy import (
+    CallPolicy,
+    DeadlineExceeded,
+    is_retryable,
+    remaining_seconds,
+    request_deadline,
+)
+from oci_delivery_agent.config import CallPolicyConfig
+
+
+class ReadTimeout(OSError):
+    """Stand-in for ``requests.exceptions.ReadTimeout``."""
+
+
+class Flaky:
+    """Fail with the queued errors, then succeed."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.mark.parametrize("status, expected", [(429, True), (503, True), (400, False), (404, False)])
+def test_service_errors_retried_by_status(service_error, status, expected):
+    assert is_retryable(service_error(status)) == expected
+
+
+@pytest.mark.parametrize("error, expected", [
+    (ReadTimeout(), True),
+    (DeadlineExceeded(), False),
+    (ValueError("bad"), False),
+])
+def test_other_errors_retried_by_type(error, expected):
+    assert is_retryable(error) == expected
+
+
+def test_retries_are_bounded_and_jittered(service_error):
+    sleeps = []
+    policy = CallPolicy(CallPolicyConfig(max_attempts=3), sleep=sleeps.append)
+    func = Flaky(service_error(429), ReadTimeout())
+    assert policy.call(func) == "ok"
+    assert func.calls == 3
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= cap for delay, cap in zip(sleeps, (0.5, 1.0)))
+
+    with pytest.raises(service_error):
+        policy.call(Flaky(service_error(400)))
+
+    func = Flaky(*(service_error(500) for _ in range(5)))
+    with pytest.raises(service_error):
+        policy.call(func)
+    assert func.calls == 3
+
+
+def test_stuck_call_abandoned_at_deadline():
+    release = threading.Event()
+    policy = CallPolicy(CallPolicyConfig())
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            with request_deadline(0.2):
+                with request_deadline(30):
+                    # The enclosing, earlier deadline still applies
+                    assert remaining_seconds() <= 0.2
+                    policy.call(release.wait, 5)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1.0
+
+
+def test_backoff_never_sleeps_past_deadline(service_error):
+    sleeps = []
+    policy = CallPolicy(CallPolicyConfig(backoff_base_seconds=30, backoff_max_seconds=30), sleep=sleeps.append)
+    with request_deadline(2):
+        with pytest.raises(service_error):
+            policy.call(Flaky(service_error(503), service_error(503)))
+    # Only a backoff that leaves a 1s attempt before the 2s deadline is taken
+    assert all(delay <= 1 for delay in sleeps)
+    assert remaining_seconds() is None
+
+
+def test_hedged_request_cuts_tail():
+    policy = CallPolicy(CallPolicyConfig(hedge=True, hedge_min_samples=20))
+    calls = []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def chat():
+        with lock:
+            calls.append(time.monotonic())
+            index = len(calls)
+        # After warm-up, every 10th request gets stuck until released
+        if index > 20 and index % 10 == 0:
+            release.wait(5)
+            return "slow"
+        time.sleep(0.01)
+        return "fast"
+
+    for _ in range(19):
+        policy.call(chat)
+    # No hedging before enough latencies are observed
+    assert policy.stats["hedges"] == 0
+
+    latencies = []
+    try:
+        for _ in range(40):
+            started = time.monotonic()
+            assert policy.call(chat) == "fast"
+            latencies.append(time.monotonic() - started)
+    finally:
+        release.set()
+
+    assert policy.stats["hedges"] >= 4
+    assert policy.stats["hedge_wins"] >= 4
+    assert max(latencies) < 1.0
@@ -0,0 +1,189 @@
+"""Tests for the GenAI circuit breaker and degraded scoring while it is open."""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from oci_delivery_agent.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from oci_delivery_agent.callpolicy import CallPolicy, CircuitOpenError
+from oci_delivery_agent.config import CallPolicyConfig, CircuitBreakerConfig, GenAIConfig
+
+ENDPOINT = "ocid1.endpoint.breaker-test"
+
+
+def test_breaker_states(fake_clock):
+    config = CircuitBreakerConfig(min_calls=4, failure_rate=0.5, slow_call_seconds=10, open_seconds=30)
+    breaker = CircuitBreaker(config, clock=fake_clock)
+    for success in (True, False, True):
+        breaker.record(success, 1.0)
+    # Too few calls to judge the error rate
+    assert breaker.state == CLOSED
+    breaker.record(False, 1.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    # After the cool-down exactly one probe is let through
+    fake_clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(False, 1.0)
+    assert breaker.state == OPEN
+
+    fake_clock.now += 30
+    breaker.allow()
+    breaker.record(True, 1.0)
+    assert breaker.state == CLOSED
+
+    # Slow calls count against the endpoint too
+    for _ in range(4):
+        breaker.record(True, 12.0)
+    assert breaker.state == OPEN
+
+
+def test_open_breaker_short_circuits_calls(service_error):
+    breaker = CircuitBreaker(CircuitBreakerConfig(min_calls=4))
+    policy = CallPolicy(CallPolicyConfig(max_attempts=2), sleep=lambda seconds: None, breaker=breaker)
+    sent = []
+
+    def failing_chat():
+        sent.append(1)
+        raise service_error(503)
+
+    outcomes = []
+    for _ in range(5):
+        try:
+            policy.call(failing_chat)
+        except CircuitOpenError:
+            outcomes.append("short-circuited")
+        except service_error:
+            outcomes.append("failed")
+    assert len(sent) == 4
+    assert outcomes[-1] == "short-circuited"
+
+
+def test_rejected_request_is_not_an_endpoint_failure(service_error):
+    policy = CallPolicy(CallPolicyConfig(), breaker=CircuitBreaker(CircuitBreakerConfig(min_calls=1)))
+    with pytest.raises(service_error):
+        policy.call(lambda: (_ for _ in ()).throw(service_error(400)))
+    assert policy.breaker.state == CLOSED
+
+
+def test_degraded_pipeline_result(workflow_config, delivery_context, tmp_path):
+    """With GenAI unavailable, deliveries get a flagged result and are queued."""
+    from langchain.llms.fake import FakeListLLM
+
+    from oci_delivery_agent.artifacts import ImageArtifact
+    from oci_delivery_agent.batch import read_manifest
+    from oci_delivery_agent.breaker import get_circuit_breaker
+    from oci_delivery_agent.callpolicy import GenAIUnavailableError
+    from oci_delivery_agent.chains import run_quality_pipeline
+
+    queue_path = str(tmp_path / "reinference.jsonl")
+    config = workflow_config(
+        genai=GenAIConfig(model_ocid=ENDPOINT),
+        circuit_breaker=CircuitBreakerConfig(min_calls=2, requeue_path=queue_path),
+    )
+    calls = []
+
+    def unavailable(image):
+        calls.append("caption")
+        raise GenAIUnavailableError("GenAI unavailable: status 503")
+
+    tools = {
+        "retrieval": SimpleNamespace(
+            fetch=lambda name: calls.append("fetch") or ImageArtifact(b"jpeg", metadata={"object_name": name}),
+            fetch_exif=lambda name: {"GPSInfo": {"latitude": 40.0, "longitude": -74.0}},
+            exif_from_prefix=lambda name: {"GPSInfo": {"latitude": 40.0, "longitude": -74.0}},
+        ),
+        "caption": SimpleNamespace(caption=unavailable),
+        "damage": SimpleNamespace(detect=lambda image, caption_context=None: {}),
+    }
+    context = delivery_context()
+    llm = FakeListLLM(responses=["unused"])
+
+    # GenAI fails mid-run: the delivery is rescored without it
+    result = run_quality_pipeline(config, llm, context, "sample.jpg", tools=tools)
+    assert "503" in result["degraded"]["reason"]
+    assert result["degraded"]["requeued"]
+    # A degraded result must not claim the package was assessed
+    assert result["quality_metrics"]["package_quality"] is None
+    assert result["assessment"]["status"] != "OK"
+    # On time at the right place scores 1.0 on the remaining weights
+    assert result["quality_metrics"]["quality_index"] == 1.0
+
+    # Breaker open: GenAI and the photo download are skipped entirely
+    breaker = get_circuit_breaker(config.circuit_breaker, ENDPOINT)
+    breaker.record(False, 1.0)
+    breaker.record(False, 1.0)
+    calls.clear()
+    result = run_quality_pipeline(config, llm, context, "sample.jpg", tools=tools)
+    assert result["degraded"]["reason"] == "circuit_open"
+    assert calls == []
+
+    # Degraded deliveries are replayable as a batch manifest
+    assert [entry.object_name for entry in read_manifest(queue_path)] == ["sample.jpg", "sample.jpg"]
+
+
+def test_unwritable_queue_is_reported_in_result(workflow_config, delivery_context, tmp_path):
+    from oci_delivery_agent.chains import delivery_fields
+    from oci_delivery_agent.reinference import requeue_delivery
+
+    config = workflow_config(
+        circuit_breaker=CircuitBreakerConfig(requeue_path=str(tmp_path / "missing" / "queue.jsonl"))
+    )
+    outcome = requeue_delivery(config, "sample.jpg", delivery_fields(delivery_context()), "circuit_open")
+    assert outcome["requeued"] is False
+    assert "queue.jsonl" in outcome["requeue_error"]
+
+
+def test_function_config_queues_to_object_storage():
+    from oci_delivery_agent.handlers import load_config
+
+    breaker = load_config({"OCI_OS_NAMESPACE": "ns", "OCI_OS_BUCKET": "bucket"}).circuit_breaker
+    assert breaker.requeue == "object_storage"
+    assert os.path.isabs(breaker.requeue_path)
+
+
+def test_object_storage_rows_are_written_outside_the_delivery_prefix(workflow_config):
+    from oci_delivery_agent.config import ObjectStorageConfig
+    from oci_delivery_agent.reinference import ObjectStorageReinferenceQueue
+
+    config = workflow_config(
+        object_storage=ObjectStorageConfig(namespace="ns", bucket_name="bucket", delivery_prefix="deliveries/"),
+        circuit_breaker=CircuitBreakerConfig(requeue="object_storage"),
+    )
+    queue = ObjectStorageReinferenceQueue(config)
+    keys = []
+    queue._client._client = SimpleNamespace(put_object=lambda **kwargs: keys.append(kwargs["object_name"]))
+
+    queue.put({"object_name": "deliveries/2024/a.jpg"})
+    assert keys == ["reinference/deliveries/2024/a.jpg.json"]
+
+
+def test_queue_prefix_inside_the_delivery_prefix_is_rejected(workflow_config):
+    from oci_delivery_agent.config import ObjectStorageConfig
+
+    with pytest.raises(ValueError):
+        workflow_config(
+            object_storage=ObjectStorageConfig(namespace="ns", bucket_name="bucket", delivery_prefix="deliveries/"),
+            circuit_breaker=CircuitBreakerConfig(requeue="object_storage", requeue_prefix="deliveries/reinference/"),
+        )
+
+
+def test_handler_skips_reinference_rows(monkeypatch):
+    import json
+
+    from oci_delivery_agent import handlers, snapshot
+    from oci_delivery_agent.handlers import load_config
+
+    config = load_config({"OCI_OS_NAMESPACE": "ns", "OCI_OS_BUCKET": "bucket"})
+    monkeypatch.setattr(snapshot, "get_workflow_snapshot", lambda: SimpleNamespace(config=config))
+    event = {
+        "eventTime": "2024-01-15T10:05:00",
+        "data": {"resourceName": "reinference/deliveries/a.jpg.json"},
+        "additionalDetails": {},
+    }
+    result = handlers.handler(None, json.dumps(event).encode("utf-8"))
+    assert result == {"object_name": "reinference/deliveries/a.jpg.json", "skipped": "reinference_row"}
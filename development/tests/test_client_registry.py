@@ -0,0 +1,142 @@
+"""Tests for the process-wide OCI auth and client registry."""
+
+import base64
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from oci_delivery_agent import clients
+
+
+def _jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode()).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class FakeSigner:
+    """Stand-in for a resource principal signer with a short-lived token."""
+
+    def __init__(self, exp):
+        self.token = _jwt(exp)
+        self.refreshes = 0
+
+    def get_security_token(self):
+        return self.token
+
+    def refresh_security_token(self):
+        self.refreshes += 1
+        self.token = _jwt(time.time() + 3600)
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    clients.reset_clients()
+    yield
+    clients.reset_clients()
+
+
+def test_clients_are_shared_per_service_and_endpoint():
+    clients._auth = clients._AuthState({"region": "us-chicago-1"}, FakeSigner(time.time() + 3600))
+    builds = []
+
+    def factory(**auth):
+        builds.append(auth)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(clients.get_client("genai", "https://a", factory)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    other = clients.get_client("genai", "https://b", factory)
+
+    assert len(set(map(id, results))) == 1
+    assert other is not results[0]
+    assert len(builds) == 2
+    assert "signer" in builds[0]
+    assert builds[0]["config"] == {"region": "us-chicago-1"}
+
+
+def test_signer_refreshed_in_place_before_expiry():
+    signer = FakeSigner(time.time() + 60)  # inside the refresh margin
+    clients._auth = clients._AuthState({"region": "us-chicago-1"}, signer)
+    client = clients.get_client("object_storage", None, lambda **auth: object())
+    assert signer.refreshes == 1
+
+    # Existing clients are kept and a fresh token is not refreshed again
+    assert clients.get_client("object_storage", None, lambda **auth: object()) is client
+    assert signer.refreshes == 1
+
+
+def test_wrappers_pick_up_clients_rebuilt_after_refresh(workflow_config, monkeypatch):
+    from oci_delivery_agent.config import ObjectStorageConfig
+    from oci_delivery_agent.tools import ObjectStorageClient
+
+    clients._auth = clients._AuthState({"region": "us-chicago-1"}, FakeSigner(time.time() + 3600))
+    built = []
+
+    def factory(**auth):
+        body = f"client-{len(built)}".encode()
+        built.append(SimpleNamespace(get_object=lambda **kwargs: SimpleNamespace(data=SimpleNamespace(content=body))))
+        return built[-1]
+
+    monkeypatch.setattr(
+        clients, "get_object_storage_client", lambda read_timeout=None: clients.get_client("object_storage", None, factory)
+    )
+    storage = ObjectStorageClient(workflow_config(object_storage=ObjectStorageConfig(namespace="ns", bucket_name="bucket")))
+    assert storage.get_object_range("a.jpg", 0, 7) == b"client-0"
+    assert storage.get_object_range("a.jpg", 0, 7) == b"client-0"
+
+    # A rebuilt signer drops every cached client; the wrapper uses the new one
+    clients._clients.clear()
+    assert storage.get_object_range("a.jpg", 0, 7) == b"client-1"
+    assert len(built) == 2
+
+
+class FakeClient:
+    """SDK client stand-in whose pooled session records being closed."""
+
+    def __init__(self, **auth):
+        self.auth = auth
+        self.base_client = SimpleNamespace(session=SimpleNamespace(closed=False))
+        self.base_client.session.close = lambda: setattr(self.base_client.session, "closed", True)
+
+    @property
+    def closed(self):
+        return self.base_client.session.closed
+
+
+def test_rebuilt_signer_evicts_and_closes_clients(monkeypatch):
+    old_signer = SimpleNamespace()  # Nothing to refresh in place
+    clients._auth = clients._AuthState({"region": "us-chicago-1"}, old_signer)
+    old = clients.get_client("object_storage", None, FakeClient)
+
+    new_signer = SimpleNamespace()
+    monkeypatch.setattr(clients, "_build_auth", lambda: clients._AuthState({"region": "us-chicago-1"}, new_signer))
+    clients._auth.expires_at = time.time()  # Inside the refresh margin
+    new = clients.get_client("object_storage", None, FakeClient)
+
+    assert old.closed
+    assert new is not old
+    assert new.auth["signer"] is new_signer
+
+
+def test_registry_is_bounded(monkeypatch):
+    monkeypatch.setattr(clients, "MAX_CLIENTS", 2)
+    clients._auth = clients._AuthState({"region": "us-chicago-1"}, FakeSigner(time.time() + 3600))
+    first = clients.get_client("genai", "https://a", FakeClient)
+    second = clients.get_client("genai", "https://b", FakeClient)
+    assert clients.get_client("genai", "https://a", FakeClient) is first
+
+    # The least recently used client makes room and is closed
+    clients.get_client("genai", "https://c", FakeClient)
+    assert second.closed
+    assert not first.closed
+    assert clients.get_client("genai", "https://b", FakeClient) is not second
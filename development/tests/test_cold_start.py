@@ -0,0 +1,114 @@
+"""Cold-start import budget for the function entry point and the handler.
+
+Each scenario runs in a fresh interpreter under ``python -X importtime`` and
+reports wall time plus the import time attributed to each top-level
+package. Run directly to print the table; the tests fail if a light path
+starts importing LangChain, the OCI SDK or NumPy again.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, '..', 'src')
+ASSET_ROOT = os.path.join(TESTS_DIR, '..', 'assets')
+FUNCTION_DIR = os.path.join(TESTS_DIR, '..', '..', 'delivery-function')
+
+LANGCHAIN_PACKAGES = {"langchain", "langchain_core", "langchain_community", "langsmith"}
+HEAVY_PACKAGES = LANGCHAIN_PACKAGES | {"oci", "numpy", "PIL"}
+
+
+def import_profile(code, path, env=None):
+    """Run ``code`` in a fresh interpreter; return wall ms and per-module import times."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {path!r}); {code}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, **(env or {})},
+        timeout=120,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Scenario failed: {completed.stderr[-2000:]}")
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return wall_ms, modules, completed.stdout
+
+
+def attribute(modules):
+    """Sum self time per top-level package, largest first."""
+    totals = defaultdict(int)
+    for name, self_us, _ in modules:
+        totals[name.split(".")[0]] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def _report(label, wall_ms, modules, top=8):
+    packages = attribute(modules)
+    total_ms = sum(self_us for _, self_us, _ in modules) / 1000
+    print(f"{label}: wall {wall_ms:.0f}ms, imports {total_ms:.0f}ms across {len(modules)} modules")
+    for package, self_us in packages[:top]:
+        print(f"    {self_us / 1000:8.1f}ms  {package}")
+    return {package for package, _ in packages}
+
+
+# label -> (sys.path entry, code, extra environment, packages it must not import)
+SCENARIOS = {
+    "func basic": (
+        FUNCTION_DIR,
+        "import func; print(func.handler(None, b'{\"test_type\": \"basic\"}'))",
+        None,
+        HEAVY_PACKAGES,
+    ),
+    "handlers.load_config": (
+        SRC_DIR,
+        "from oci_delivery_agent.handlers import load_config; load_config()",
+        None,
+        HEAVY_PACKAGES,
+    ),
+    # Object Storage needs the OCI SDK (attempted even for local assets)
+    "func extract (local asset)": (
+        FUNCTION_DIR,
+        "import func; print(func.handler(None, b'{\"test_type\": \"extract\", \"object_name\": \"deliveries/damage1.jpg\"}'))",
+        {"LOCAL_ASSET_ROOT": ASSET_ROOT},
+        LANGCHAIN_PACKAGES | {"numpy"},
+    ),
+}
+
+
+@pytest.mark.parametrize("label", list(SCENARIOS))
+def test_light_paths_skip_heavy_imports(label):
+    path, code, env, forbidden = SCENARIOS[label]
+    _, modules, stdout = import_profile(code, path, env)
+    loaded = {package for package, _ in attribute(modules)}
+    assert sorted(loaded & forbidden) == []
+    output = stdout.strip().splitlines()[-1] if stdout.strip() else ""
+    if output:
+        assert json.loads(output).get("status") == "success", output[:300]
+
+
+def test_pipeline_exports_load_langchain_on_first_use():
+    _, modules, _ = import_profile(
+        "import oci_delivery_agent as agent; from oci_delivery_agent.tools import toolset; "
+        "assert agent.run_quality_pipeline and agent.DeliveryContext and agent.WorkflowConfig and toolset",
+        SRC_DIR,
+    )
+    assert "langchain" in {package for package, _ in attribute(modules)}
+
+
+if __name__ == "__main__":
+    for label, (path, code, env, _) in SCENARIOS.items():
+        wall_ms, modules, _ = import_profile(code, path, env)
+        _report(label, wall_ms, modules)
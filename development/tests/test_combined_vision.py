@@ -0,0 +1,104 @@
+"""Tests for the combined caption + damage GenAI request."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from oci_delivery_agent.artifacts import ImageArtifact
+from oci_delivery_agent.config import CacheConfig, GenAIConfig, PipelineConfig
+
+CAPTION = {"sceneType": "delivery", "packageVisible": True, "packageDescription": "brown box"}
+DAMAGE = {
+    "overall": {"severity": "minor", "score": 0.3, "rationale": "dented corner"},
+    "indicators": {"cornerDamage": {"present": True, "severity": "minor", "evidence": "dent"}},
+    "packageVisible": True,
+}
+
+
+@pytest.fixture
+def combined_config(workflow_config):
+    return workflow_config(
+        genai=GenAIConfig(model_ocid="ocid1.endpoint.test", compartment_id="ocid1.compartment.test"),
+        cache=CacheConfig(memory_max_bytes=1024 * 1024, ttl_seconds=0),
+        pipeline=PipelineConfig(damage_mode="combined"),
+    )
+
+
+@pytest.fixture
+def vision_client(combined_config):
+    from oci_delivery_agent.tools import VisionClient
+
+    return VisionClient(combined_config)
+
+
+def test_single_request_splits_outputs(vision_client):
+    uploads = []
+
+    def fake_chat(prompt, image_data_url, model_ocid, compartment_id, params, json_keys=None):
+        uploads.append(prompt)
+        if "exactly two keys" in prompt:
+            return "```json\n" + json.dumps({"caption": CAPTION, "damage": DAMAGE}) + "\n```"
+        if "damage inspector" in prompt:
+            return json.dumps(DAMAGE)
+        return json.dumps(CAPTION)
+
+    vision_client._chat_with_image = fake_chat
+
+    combined = vision_client.analyze_delivery(ImageArtifact(b"combined-photo"))
+    separate = (vision_client.generate_caption(ImageArtifact(b"separate-photo")),
+                vision_client.detect_damage(ImageArtifact(b"separate-photo")))
+    assert combined == separate
+
+    # A repeated combined request is served from cache
+    vision_client.analyze_delivery(ImageArtifact(b"combined-photo"))
+    assert len(uploads) == 3
+
+
+def test_incomplete_response_falls_back(vision_client):
+    prompts = []
+
+    def fake_chat(prompt, image_data_url, model_ocid, compartment_id, params, json_keys=None):
+        prompts.append(prompt)
+        if "exactly two keys" in prompt:
+            return json.dumps({"caption": CAPTION})
+        return json.dumps(DAMAGE)
+
+    vision_client._chat_with_image = fake_chat
+
+    caption_json, report = vision_client.analyze_delivery(ImageArtifact(b"partial-photo"))
+    assert json.loads(caption_json) == CAPTION
+    assert report == DAMAGE
+    # The missing damage half is requested on its own, with the caption as context
+    assert len(prompts) == 2
+    assert "brown box" in prompts[1]
+
+
+def test_combined_pipeline_stages(combined_config, delivery_context):
+    from langchain.llms.fake import FakeListLLM
+
+    from oci_delivery_agent.chains import build_pipeline_stages
+    from oci_delivery_agent.scheduler import StageScheduler
+
+    calls = []
+
+    def analyze(image):
+        calls.append("analyze")
+        return json.dumps(CAPTION), dict(DAMAGE)
+
+    tools = {
+        "retrieval": SimpleNamespace(
+            fetch=lambda name: ImageArtifact(b"jpeg", metadata={"object_name": name}),
+            exif_from_prefix=lambda name: {},
+        ),
+        "caption": SimpleNamespace(analyze=analyze, caption=lambda image: calls.append("caption")),
+        "damage": SimpleNamespace(detect=lambda image, caption_context=None: calls.append("damage")),
+    }
+    llm = FakeListLLM(responses=['{"status": "OK", "issues": [], "insights": "clean"}'])
+
+    stages = build_pipeline_stages(combined_config, llm, delivery_context(), tools)
+    values = StageScheduler(stages).run({"object_name": "sample.jpg"})
+    assert calls == ["analyze"]
+    assert all(stage.name != "damage" for stage in stages)
+    assert values["damage_report"] == DAMAGE
+    assert values["caption_dict"] == CAPTION
@@ -0,0 +1,143 @@
+"""Tests for the APP1/TIFF EXIF reader and ranged-read extraction."""
+
+import io
+import os
+
+import pytest
+from PIL import Image
+from PIL.TiffImagePlugin import IFDRational
+
+from oci_delivery_agent.exif import read_exif_prefix
+from oci_delivery_agent.tools import ObjectRetrievalTool, _normalize_exif, _pil_exif, extract_exif
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets', 'deliveries')
+
+
+def _jpeg_with_exif(size=(1600, 1200), comment_bytes=0):
+    exif = Image.Exif()
+    exif[0x0132] = "2024:01:15 09:00:00"
+    exif[0x010F] = "Phone"
+    exif_ifd = exif.get_ifd(0x8769)
+    exif_ifd[0x9003] = "2024:01:15 08:59:58"
+    if comment_bytes:
+        exif_ifd[0x9286] = b"ASCII\x00\x00\x00" + b"x" * comment_bytes
+    gps = exif.get_ifd(0x8825)
+    gps[1] = "N"
+    gps[2] = (IFDRational(40, 1), IFDRational(42, 1), IFDRational(4653, 100))
+    gps[3] = "W"
+    gps[4] = (IFDRational(74, 1), IFDRational(0, 1), IFDRational(2159, 100))
+    gps[6] = IFDRational(105, 10)
+
+    output = io.BytesIO()
+    Image.effect_noise(size, 64).convert("RGB").save(
+        output, format="JPEG", quality=90, exif=exif.tobytes()
+    )
+    return output.getvalue()
+
+
+def test_fast_path_matches_pil():
+    data = _jpeg_with_exif()
+    fast = extract_exif(data)
+    assert "GPSInfo" in fast
+    assert fast == _normalize_exif(*_pil_exif(data))
+
+
+@pytest.mark.parametrize("name", sorted(os.listdir(ASSET_DIR)))
+def test_fast_path_matches_pil_for_sample_photos(name):
+    with open(os.path.join(ASSET_DIR, name), "rb") as handle:
+        asset = handle.read()
+    assert extract_exif(asset) == _normalize_exif(*_pil_exif(asset))
+
+
+def test_non_jpeg_falls_back_to_pil():
+    png = io.BytesIO()
+    Image.new("RGB", (8, 8)).save(png, format="PNG")
+    assert extract_exif(png.getvalue()) == {}
+
+
+@pytest.mark.parametrize("comment_bytes, expected_reads", [(0, 1), (48 * 1024, 2)])
+def test_ranged_reads_fetch_only_the_exif_segment(comment_bytes, expected_reads):
+    data = _jpeg_with_exif(comment_bytes=comment_bytes)
+    reads = []
+
+    def read_range(start, end):
+        reads.append((start, end))
+        return data[start:end + 1]
+
+    prefix = read_exif_prefix(read_range, probe_bytes=16 * 1024)
+    assert len(reads) == expected_reads
+    assert len(prefix) < len(data)
+    assert extract_exif(prefix) == extract_exif(data)
+
+
+def test_retrieval_tool_reads_exif_by_range(workflow_config, tmp_path):
+    from oci_delivery_agent.config import ObjectStorageConfig
+
+    data = _jpeg_with_exif()
+    (tmp_path / "photo.jpg").write_bytes(data)
+    config = workflow_config(
+        object_storage=ObjectStorageConfig(namespace="", bucket_name="", exif_probe_bytes=4096),
+        local_asset_root=str(tmp_path),
+    )
+    assert ObjectRetrievalTool(config).fetch_exif("photo.jpg") == extract_exif(data)
+
+
+@pytest.fixture
+def large_png(tmp_path):
+    """A noisy 300x300 PNG, larger than the default 32 KB EXIF probe."""
+    path = tmp_path / "photo.png"
+    Image.effect_noise((300, 300), 64).convert("RGB").save(path, format="PNG")
+    assert path.stat().st_size > 32 * 1024
+    return path
+
+
+def test_non_jpeg_prefix_is_returned_unparsed(large_png):
+    data = large_png.read_bytes()
+    prefix = read_exif_prefix(lambda start, end: data[start:end + 1])
+    assert prefix == data[:32 * 1024]
+
+
+def test_retrieval_tool_falls_back_for_large_non_jpeg(workflow_config, large_png):
+    from oci_delivery_agent.artifacts import ImageArtifact
+    from oci_delivery_agent.config import ObjectStorageConfig
+
+    config = workflow_config(
+        object_storage=ObjectStorageConfig(namespace="", bucket_name=""),
+        local_asset_root=str(large_png.parent),
+    )
+    tool = ObjectRetrievalTool(config)
+    assert tool.exif_from_prefix("photo.png") is None
+    assert tool.fetch_exif("photo.png") == {}
+
+    # An image handle already in hand is parsed instead of downloading again
+    downloads = []
+    tool._client.get_object = lambda name: downloads.append(name)
+    assert tool.fetch_exif("photo.png", image=ImageArtifact(large_png.read_bytes())) == {}
+    assert downloads == []
+
+
+def test_pipeline_reads_exif_from_the_downloaded_handle(workflow_config, delivery_context):
+    import json
+    from types import SimpleNamespace
+
+    from langchain.llms.fake import FakeListLLM
+
+    from oci_delivery_agent.artifacts import ImageArtifact
+    from oci_delivery_agent.chains import build_pipeline_stages
+    from oci_delivery_agent.scheduler import StageScheduler
+
+    data = _jpeg_with_exif()
+    tools = {
+        # The ranged read cannot answer, so EXIF comes from the fetched photo
+        "retrieval": SimpleNamespace(
+            fetch=lambda name: ImageArtifact(data, metadata={"object_name": name}),
+            exif_from_prefix=lambda name: None,
+        ),
+        "caption": SimpleNamespace(caption=lambda image: json.dumps({"packageVisible": True})),
+        "damage": SimpleNamespace(detect=lambda image, caption_context=None: {}),
+    }
+    llm = FakeListLLM(responses=["Summary.", '{"status": "OK", "issues": [], "insights": "clean"}'])
+    stages = build_pipeline_stages(workflow_config(), llm, delivery_context(), tools)
+    values = StageScheduler(stages).run({"object_name": "sample.jpg"})
+    assert values["exif"] == json.loads(json.dumps(extract_exif(data), default=str))
+    assert "GPSInfo" in values["exif"]
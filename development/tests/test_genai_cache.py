@@ -0,0 +1,65 @@
+"""Tests for the content-addressed cache in front of GenAI caption and damage calls."""
+
+import time
+
+from oci_delivery_agent.cache import ResultCache, cache_key, track_cache_stats
+
+PARAMS = {"temperature": 0.1, "max_tokens": 800}
+
+
+def test_key_covers_prompt_and_parameters():
+    key = cache_key("abc", "damage", "prompt", "ocid1.endpoint", PARAMS)
+    assert key != cache_key("abc", "damage", "prompt v2", "ocid1.endpoint", PARAMS)
+    assert key != cache_key("abc", "damage", "prompt", "ocid1.endpoint", {**PARAMS, "temperature": 0.2})
+
+
+def test_memory_eviction_persistence_and_ttl(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = ResultCache(memory_max_bytes=10, disk_path=path, ttl_seconds=60)
+    cache.put("a", "123456")
+    cache.put("b", "789012")  # evicts "a" from memory, both stay on disk
+
+    assert cache.get("b") == "789012"
+    assert cache.get("a") == "123456"
+    assert cache.stats.as_dict() == {"hits": 2, "memory_hits": 1, "disk_hits": 1, "misses": 0}
+
+    # A fresh process sees the persistent tier
+    reopened = ResultCache(memory_max_bytes=1024, disk_path=path, ttl_seconds=60)
+    assert reopened.get("b") == "789012"
+
+    expiring = ResultCache(memory_max_bytes=1024, disk_path=path, ttl_seconds=0.05)
+    time.sleep(0.1)
+    assert expiring.get("b") is None
+
+
+def test_vision_client_serves_identical_images_from_cache(workflow_config):
+    from oci_delivery_agent.artifacts import ImageArtifact
+    from oci_delivery_agent.config import CacheConfig, GenAIConfig
+    from oci_delivery_agent.tools import VisionClient
+
+    client = VisionClient(workflow_config(
+        genai=GenAIConfig(model_ocid="ocid1.endpoint.test", compartment_id="ocid1.compartment.test"),
+        cache=CacheConfig(memory_max_bytes=1024 * 1024, ttl_seconds=0),
+    ))
+    calls = []
+
+    def fake_chat(prompt, image_data_url, model_ocid, compartment_id, params, json_keys=None):
+        calls.append(params["temperature"])
+        if "damage inspector" in prompt:
+            return '{"overall": {"severity": "none", "score": 0.0}, "indicators": {}}'
+        return '{"sceneType": "delivery", "packageVisible": true}'
+
+    client._chat_with_image = fake_chat
+
+    with track_cache_stats() as stats:
+        first = client.generate_caption(ImageArtifact(b"same-photo"))
+        second = client.generate_caption(ImageArtifact(b"same-photo"))  # re-upload
+        damage = client.detect_damage(ImageArtifact(b"same-photo"))
+        damage_again = client.detect_damage(ImageArtifact(b"same-photo"))
+        client.generate_caption(ImageArtifact(b"other-photo"))
+
+    assert first == second
+    assert damage == damage_again
+    assert len(calls) == 3
+    assert stats.as_dict()["hits"] == 2
+    assert stats.as_dict()["misses"] == 3
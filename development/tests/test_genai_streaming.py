@@ -0,0 +1,72 @@
+"""Tests for incremental JSON scanning and early termination of streamed GenAI responses."""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from oci_delivery_agent.genai_stream import stream_chat_text
+from oci_delivery_agent.jsonscan import JSONObjectScanner
+
+DAMAGE = {
+    "overall": {"severity": "minor", "score": 0.3, "rationale": "corner {dented} \"slightly\""},
+    "indicators": {"cornerDamage": {"present": True, "severity": "minor", "evidence": "a \\ backslash }"}},
+}
+COMPLETION = (
+    "Sure! The schema is {\"example\": true}. Here is the report:\n```json\n"
+    + json.dumps(DAMAGE, indent=2)
+    + "\n```\nThe package shows light wear. Let me know if you need anything else. " * 5
+)
+
+
+class FakeStream:
+    """SSE stream that yields a completion a few characters at a time."""
+
+    def __init__(self, text, size=3):
+        self.chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        self.consumed = 0
+        self.closed = False
+
+    def events(self):
+        for chunk in self.chunks:
+            self.consumed += 1
+            message = {"role": "ASSISTANT", "content": [{"type": "TEXT", "text": chunk}]}
+            yield SimpleNamespace(data=json.dumps({"index": 0, "message": message}))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 17, len(COMPLETION)])
+def test_scanner_across_chunks(size):
+    # Stray objects are skipped; strings and escapes may be split anywhere
+    scanner = JSONObjectScanner(("overall", "indicators"))
+    for i in range(0, len(COMPLETION), size):
+        if scanner.feed(COMPLETION[i:i + size]):
+            break
+    assert scanner.result == DAMAGE
+
+
+def test_unfinished_object_is_not_reported():
+    scanner = JSONObjectScanner(("status",))
+    scanner.feed('{"status": "OK", "issues": [')
+    assert not scanner.done
+
+
+def test_stream_stops_at_closing_object():
+    stream = FakeStream(COMPLETION)
+    text = stream_chat_text(SimpleNamespace(data=stream), ("overall", "indicators"))
+    assert json.loads(text) == DAMAGE
+    assert stream.closed
+    # Trailing commentary is not read
+    assert stream.consumed < len(stream.chunks) // 2
+
+
+def test_free_text_is_read_to_the_end():
+    stream = FakeStream("Two sentence summary. Nothing else.")
+    assert stream_chat_text(SimpleNamespace(data=stream)) == "Two sentence summary. Nothing else."
+    assert stream.consumed == len(stream.chunks)
+
+
+def test_missing_object_returns_full_text():
+    assert stream_chat_text(SimpleNamespace(data=FakeStream("no json here")), ("status",)) == "no json here"
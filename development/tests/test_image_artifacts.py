@@ -0,0 +1,55 @@
+"""Tests for in-process image handles shared between workflow stages."""
+
+import base64
+import hashlib
+import json
+import os
+
+import pytest
+
+from oci_delivery_agent.artifacts import ArtifactRegistry, ImageArtifact, resolve_image
+
+SAMPLE_IMAGE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'deliveries', 'damage1.jpg')
+
+
+@pytest.fixture
+def image_bytes():
+    with open(SAMPLE_IMAGE, 'rb') as f:
+        return f.read()
+
+
+def test_derived_forms_are_computed_once(image_bytes):
+    artifact = ImageArtifact(image_bytes, metadata={"object_name": "damage1.jpg"})
+    url = artifact.data_url()
+
+    assert url is artifact.data_url()
+    assert url == "data:image/jpeg;base64," + base64.b64encode(image_bytes).decode()
+    assert artifact.digest == hashlib.sha256(image_bytes).hexdigest()
+    assert resolve_image(artifact) is artifact
+    assert artifact.data is image_bytes
+
+
+def test_legacy_base64_payload_resolves(image_bytes):
+    legacy = resolve_image(base64.b64encode(image_bytes).decode())
+    assert bytes(legacy.data) == image_bytes
+
+
+def test_registry_evicts_past_byte_budget():
+    registry = ArtifactRegistry(max_bytes=10)
+    first = registry.register(ImageArtifact(b"123456"))
+    second = registry.register(ImageArtifact(b"789012"))
+
+    with pytest.raises(KeyError):
+        registry.get(first)
+    assert bytes(resolve_image(second, registry).data) == b"789012"
+
+
+def test_string_tools_pass_references(workflow_config):
+    from oci_delivery_agent.tools import ExifExtractionTool, ObjectRetrievalTool
+
+    config = workflow_config(local_asset_root=os.path.dirname(SAMPLE_IMAGE))
+    retrieval = json.loads(ObjectRetrievalTool(config)._run("damage1.jpg"))
+    assert retrieval["payload"].startswith("artifact:")
+
+    exif = json.loads(ExifExtractionTool()._run(retrieval["payload"]))
+    assert isinstance(exif, dict)
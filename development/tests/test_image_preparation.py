@@ -0,0 +1,76 @@
+"""Tests for the pre-inference downscale and re-encode stage."""
+
+import io
+import threading
+
+from PIL import Image
+
+from oci_delivery_agent import artifacts
+from oci_delivery_agent.artifacts import ImageArtifact
+from oci_delivery_agent.imaging import prepare_for_inference
+
+
+def _jpeg(size, orientation=None):
+    image = Image.new("RGB", size, (180, 120, 60))
+    output = io.BytesIO()
+    if orientation is None:
+        image.save(output, format="JPEG", quality=90)
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(output, format="JPEG", quality=90, exif=exif.tobytes())
+    return output.getvalue()
+
+
+def test_large_photo_fit_to_long_edge():
+    data, width, height = prepare_for_inference(_jpeg((4000, 3000)), 1568, 85)
+    with Image.open(io.BytesIO(data)) as prepared:
+        assert prepared.size == (1568, 1176)
+        assert (width, height) == prepared.size
+
+
+def test_small_upright_jpeg_sent_unchanged():
+    small = _jpeg((800, 600))
+    data, width, height = prepare_for_inference(small, 1568, 85)
+    assert data == small
+    assert (width, height) == (800, 600)
+
+
+def test_exif_orientation_applied():
+    _, width, height = prepare_for_inference(_jpeg((800, 600), orientation=6), 1568, 85)
+    assert (width, height) == (600, 800)
+
+
+def test_non_jpeg_source_converted():
+    png = io.BytesIO()
+    Image.new("RGBA", (3000, 1000), (0, 0, 0, 0)).save(png, format="PNG")
+    data, width, height = prepare_for_inference(png.getvalue(), 1000, 85)
+    with Image.open(io.BytesIO(data)) as prepared:
+        assert prepared.format == "JPEG"
+        assert (width, height) == (1000, 333)
+
+
+def test_prepared_once_per_artifact(monkeypatch):
+    calls = []
+    real_prepare = artifacts.prepare_for_inference
+
+    def counting_prepare(*args):
+        calls.append(args[1:])
+        return real_prepare(*args)
+
+    monkeypatch.setattr(artifacts, "prepare_for_inference", counting_prepare)
+    artifact = ImageArtifact(_jpeg((3000, 2000)))
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(artifact.prepared(1024, 80)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(set(map(id, results))) == 1
+    # A long edge of 0 disables preparation
+    assert artifact.prepared(0, 80) is artifact
@@ -0,0 +1,109 @@
+"""Tests for the linear-time JSON extraction used for model responses.
+
+The corpus in ``assets/model_responses/json_corpus.jsonl`` holds response
+shapes seen from the caption, damage and review calls; ``expected_object``
+is given where :func:`extract_json_object` finds a different value. The
+fuzz test wraps, truncates and corrupts them with a fixed seed. Timings are
+in ``benchmark_json_extraction.py``.
+"""
+
+import json
+import os
+import random
+
+import pytest
+
+from oci_delivery_agent import jsonscan
+from oci_delivery_agent.jsonscan import extract_json, extract_json_object
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), '..', 'assets', 'model_responses', 'json_corpus.jsonl')
+NOISE = ['{', '}', '[', ']', '"', '\\', ':', ',', ' ', '\n', '```', 'json', 'Note', "it's", '{x}', '[1]']
+# Prose that opens brackets before the object, as review responses sometimes do
+BRACKETED_PREFIXES = ['Per guideline [1], ', 'Scores [0.9, 0.8]: ', 'Note ["x] ', 'See ["photo ', '[Note: ', '[]']
+
+with open(CORPUS_PATH, encoding="utf-8") as _handle:
+    CORPUS = [json.loads(line) for line in _handle if line.strip()]
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[entry["name"] for entry in CORPUS])
+def test_corpus_responses(entry):
+    assert extract_json(entry["text"]) == entry["expected"]
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[entry["name"] for entry in CORPUS])
+def test_corpus_objects(entry):
+    expected = entry.get("expected_object", entry["expected"])
+    if isinstance(expected, list):
+        # An array-wrapped object yields its first element
+        expected = expected[0] if expected and isinstance(expected[0], dict) else None
+    if not isinstance(expected, dict):
+        expected = None
+    assert extract_json_object(entry["text"]) == expected
+
+
+def test_fuzzed_responses():
+    """Noisy, truncated and corrupted responses never raise or invent values."""
+    rng = random.Random(20240115)
+    objects = [entry["expected"] for entry in CORPUS if isinstance(entry["expected"], dict)]
+    for _ in range(3000):
+        value = rng.choice(objects)
+        body = json.dumps(value, indent=rng.choice([None, 2]))
+        # Prose prefix, with or without JSON openers, and an arbitrary suffix
+        bracketed = rng.random() < 0.3
+        prefix = rng.choice(BRACKETED_PREFIXES if bracketed else ["", "Sure! ", "```json\n", "Result (see below):\n"])
+        suffix = "".join(rng.choice(NOISE) for _ in range(rng.randint(0, 12)))
+        text = prefix + body + suffix
+        mode = rng.random()
+        if mode < 0.2:
+            text = text[:rng.randint(0, len(text))]
+        elif mode < 0.4:
+            position = rng.randint(0, len(text))
+            text = text[:position] + rng.choice(NOISE) + text[position:]
+
+        result = extract_json(text)
+        found = extract_json_object(text)
+        if mode >= 0.4:
+            assert found == value, text[:120]
+            if not bracketed:
+                assert result == value, text[:120]
+        assert result is None or isinstance(result, (dict, list))
+        assert found is None or isinstance(found, dict)
+
+
+class _CountingDecoder:
+    """Wrap the scanner's decoder, counting calls and the characters each decode read."""
+
+    def __init__(self, decoder):
+        self._decoder = decoder
+        self.calls = 0
+        self.chars = 0
+
+    def raw_decode(self, text, start):
+        self.calls += 1
+        try:
+            value, end = self._decoder.raw_decode(text, start)
+        except json.JSONDecodeError as error:
+            self.chars += error.pos - start
+            raise
+        self.chars += end - start
+        return value, end
+
+
+INDICATOR = '"evidence": {"present": true, "severity": "minor", "notes": "dent [left] {edge}"}, '
+
+
+@pytest.mark.parametrize("text", [
+    # A report cut off by max_tokens: nothing decodes
+    "Here is the report:\n```json\n{\"indicators\": {" + INDICATOR * 400,
+    # Bracketed prose before the object: many candidates fail or are skipped
+    'Note ["x] see [1] and [0.9, 0.8] ' * 400 + '{"status": "OK"}',
+    '[{"a": [1, {"b": ' * 200,
+], ids=["truncated", "bracketed prose", "nested truncated"])
+def test_malformed_input_is_decoded_in_linear_work(text, monkeypatch):
+    decoder = _CountingDecoder(jsonscan._decoder)
+    monkeypatch.setattr(jsonscan, "_decoder", decoder)
+    extract_json_object(text)
+    # Each character is read a bounded number of times: as part of an array,
+    # of an object, and of a decode window that proved too short
+    assert decoder.chars <= 3 * len(text)
+    assert decoder.calls <= text.count("{") + text.count("[")
@@ -0,0 +1,79 @@
+"""Tests for the indexed, memory-mapped local asset backend."""
+
+import os
+import shutil
+
+import pytest
+
+from oci_delivery_agent import local_storage
+from oci_delivery_agent.local_storage import LocalAssetBackend
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def test_index_hits_and_incremental_refresh(tmp_path, monkeypatch):
+    root = str(tmp_path)
+    _write(os.path.join(root, "deliveries", "a.jpg"), b"a" * 10)
+    _write(os.path.join(root, "archive", "2023", "b.jpg"), b"b" * 10)
+    _write(os.path.join(root, ".git", "HEAD"), b"ref")
+
+    scans = []
+    real_scandir = local_storage.os.scandir
+
+    def counting_scandir(path):
+        scans.append(path)
+        return real_scandir(path)
+
+    monkeypatch.setattr(local_storage.os, "scandir", counting_scandir)
+    backend = LocalAssetBackend(root)
+    initial_scans = len(scans)
+    for _ in range(50):
+        backend.find("deliveries/a.jpg")
+        backend.find("archive/2023/b.jpg")
+    assert len(scans) == initial_scans
+    assert backend.find(".git/HEAD") is None
+
+    # A file added by another process is found after one targeted rescan
+    _write(os.path.join(root, "deliveries", "c.jpg"), b"c")
+    before = len(scans)
+    assert backend.find("deliveries/c.jpg") is not None
+    assert scans[before:] == [os.path.join(root, "deliveries")]
+
+    shutil.rmtree(os.path.join(root, "archive"))
+    assert backend.load("archive/2023/b.jpg") is None
+    assert backend.find("archive/2023/b.jpg") is None
+
+
+def test_mmap_reads_and_put_object(workflow_config, tmp_path):
+    from oci_delivery_agent.config import ObjectStorageConfig
+    from oci_delivery_agent.streaming import ObjectTooLargeError
+    from oci_delivery_agent.tools import ObjectStorageClient
+
+    root = str(tmp_path)
+    payload = os.urandom(200_000)
+    _write(os.path.join(root, "deliveries", "photo.jpg"), payload)
+    config = workflow_config(
+        object_storage=ObjectStorageConfig(
+            namespace="test", bucket_name="test", delivery_prefix="deliveries/", max_object_bytes=500_000
+        ),
+        local_asset_root=root,
+    )
+    client = ObjectStorageClient(config)
+
+    data = client.get_object("photo.jpg")["data"]
+    assert isinstance(data, memoryview)
+    assert bytes(data) == payload
+    assert client.get_object_range("photo.jpg", 10, 19) == payload[10:20]
+
+    stored = client.put_object("blurred/photo.jpg", b"blurred-bytes")
+    assert stored["source"] == "local"
+    assert bytes(client.get_object("blurred/photo.jpg")["data"]) == b"blurred-bytes"
+    assert not [name for name in os.listdir(os.path.join(root, "deliveries", "blurred")) if name.startswith(".")]
+
+    _write(os.path.join(root, "deliveries", "huge.jpg"), b"x" * 600_000)
+    with pytest.raises(ObjectTooLargeError):
+        client.get_object("huge.jpg")
@@ -0,0 +1,162 @@
+"""Tests for the buffered, batched quality event writer."""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from oci_delivery_agent.events import (
+    EventBackpressureError,
+    QualityEventWriter,
+    SQLiteEventBackend,
+    get_event_writer,
+    merge_statement,
+    quality_event_row,
+)
+
+
+def _output(object_name, etag, status="OK", quality_index=0.9):
+    return {
+        "metadata": {"object_name": object_name, "etag": etag},
+        "quality_metrics": {"quality_index": quality_index, "timeliness": 1.0},
+        "assessment": {"status": status},
+    }
+
+
+class RecordingBackend:
+    """Wraps a backend and records the size of every batch."""
+
+    def __init__(self, inner=None, gate=None):
+        self.inner = inner
+        self.gate = gate
+        self.batches = []
+
+    def upsert(self, rows):
+        if self.gate is not None:
+            self.gate.wait()
+        self.batches.append(len(rows))
+        if self.inner is not None:
+            self.inner.upsert(rows)
+
+    def close(self):
+        if self.inner is not None:
+            self.inner.close()
+
+
+def test_rows_upserted_in_bounded_batches(tmp_path):
+    path = str(tmp_path / "events.db")
+    backend = RecordingBackend(SQLiteEventBackend(path, "delivery_quality_events"))
+    writer = QualityEventWriter(backend, batch_size=50, flush_interval_seconds=30, max_queue=500)
+
+    for i in range(120):
+        writer.write(quality_event_row(_output(f"photo{i % 100}.jpg", "etag-1")))
+    # A new version of an object is a new row; a rerun of the same version replaces it
+    writer.write(quality_event_row(_output("photo0.jpg", "etag-2")))
+    writer.write(quality_event_row(_output("photo1.jpg", "etag-1", status="Review")))
+    assert writer.flush(timeout=5)
+    writer.close()
+
+    db = sqlite3.connect(path)
+    count = db.execute("SELECT COUNT(*) FROM delivery_quality_events").fetchone()[0]
+    status = db.execute(
+        "SELECT status FROM delivery_quality_events WHERE object_name = 'photo1.jpg' AND etag = 'etag-1'"
+    ).fetchone()[0]
+    db.close()
+
+    assert len(backend.batches) <= 3
+    assert max(backend.batches) <= 50
+    assert count == 101
+    assert status == "Review"
+
+
+def test_partial_batch_flushed_by_interval():
+    backend = RecordingBackend()
+    writer = QualityEventWriter(backend, batch_size=100, flush_interval_seconds=0.05, max_queue=100)
+    for i in range(3):
+        writer.write(quality_event_row(_output(f"photo{i}.jpg", "e")))
+    time.sleep(0.5)
+    writer.close()
+    assert backend.batches == [3]
+
+
+def test_full_queue_pushes_back():
+    gate = threading.Event()
+    writer = QualityEventWriter(
+        RecordingBackend(gate=gate), batch_size=2, flush_interval_seconds=0.01, max_queue=2, enqueue_timeout_seconds=0.05
+    )
+    accepted = 0
+    with pytest.raises(EventBackpressureError):
+        for i in range(20):
+            writer.write(quality_event_row(_output(f"photo{i}.jpg", "e")))
+            accepted += 1
+
+    gate.set()
+    assert writer.flush(timeout=5)
+    assert writer.stats["written"] == accepted
+    writer.close()
+
+
+def test_merge_statement():
+    statement = merge_statement("delivery_quality_events")
+    assert statement.startswith("MERGE INTO delivery_quality_events")
+    assert "dst.etag = src.etag" in statement
+    with pytest.raises(ValueError):
+        merge_statement("events; DROP TABLE x")
+
+
+def test_store_quality_event_persists_through_writer(workflow_config, tmp_path):
+    from oci_delivery_agent.config import EventStoreConfig
+    from oci_delivery_agent.handlers import store_quality_event
+
+    path = str(tmp_path / "events.db")
+    config = workflow_config(events=EventStoreConfig(backend="sqlite", sqlite_path=path))
+    store_quality_event(config, _output("deliveries/a.jpg", "etag-a"))
+    writer = get_event_writer(config)
+    writer.flush(timeout=5)
+    db = sqlite3.connect(path)
+    rows = db.execute("SELECT object_name, etag, quality_index FROM delivery_quality_events").fetchall()
+    db.close()
+    writer.close()
+
+    assert rows == [("deliveries/a.jpg", "etag-a", 0.9)]
+
+
+def test_handler_flush_writes_queued_rows(workflow_config, tmp_path):
+    from oci_delivery_agent.config import EventStoreConfig
+    from oci_delivery_agent.handlers import flush_pending_output, store_quality_event
+
+    path = str(tmp_path / "events.db")
+    # A long interval: without the flush the row would sit in the buffer
+    config = workflow_config(
+        events=EventStoreConfig(backend="sqlite", sqlite_path=path, flush_interval_seconds=60)
+    )
+    store_quality_event(config, _output("deliveries/b.jpg", "etag-b"))
+    assert flush_pending_output(config, timeout=5) == []
+    db = sqlite3.connect(path)
+    count = db.execute("SELECT COUNT(*) FROM delivery_quality_events").fetchone()[0]
+    db.close()
+    get_event_writer(config).close()
+    assert count == 1
+
+
+def test_handler_flush_is_bounded(workflow_config, monkeypatch):
+    from oci_delivery_agent import handlers
+
+    gate = threading.Event()
+    writer = QualityEventWriter(RecordingBackend(gate=gate), batch_size=10, flush_interval_seconds=60)
+    monkeypatch.setattr(handlers, "get_event_writer", lambda config: writer)
+    writer.write(quality_event_row(_output("photo.jpg", "e")))
+
+    started = time.monotonic()
+    assert handlers.flush_pending_output(workflow_config(), timeout=0.1) == ["quality_events"]
+    assert time.monotonic() - started < 1.0
+    gate.set()
+    writer.close(timeout=5)
+
+
+def test_function_sqlite_default_is_writable():
+    from oci_delivery_agent.handlers import load_config
+
+    path = load_config({"OCI_OS_NAMESPACE": "ns", "OCI_OS_BUCKET": "bucket"}).events.sqlite_path
+    assert path.startswith("/tmp/")
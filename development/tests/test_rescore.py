@@ -0,0 +1,133 @@
+"""Tests for offline re-scoring of stored workflow outputs."""
+
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+from oci_delivery_agent.batch import context_from_row
+from oci_delivery_agent.chains import compute_quality_index, delivery_fields
+from oci_delivery_agent.config import (
+    DamageScoringConfig,
+    DamageTypeWeights,
+    EventStoreConfig,
+    QualityIndexWeights,
+)
+from oci_delivery_agent.events import get_event_writer, quality_event_row
+from oci_delivery_agent.rescore import rescore_event_store, rescore_file, rescore_records
+
+NEW_WEIGHTS = QualityIndexWeights(timeliness=0.5, location_accuracy=0.1, damage_score=0.4)
+
+
+def _stored_results(config, delivery_context, count=50):
+    """Results shaped like run_quality_pipeline output, scored under ``config``."""
+    records = []
+    for i in range(count):
+        context = delivery_context(
+            object_name=f"deliveries/photo{i}.jpg",
+            expected_latitude=40.7128,
+            expected_longitude=-74.0060,
+            delivered_time_utc=datetime(2024, 1, 15, 10, 0) + timedelta(minutes=7 * i - 60),
+        )
+        exif = {"GPSInfo": {"latitude": 40.7128 + 0.00002 * i, "longitude": -74.0060}} if i % 4 else {}
+        damage_report = {
+            "indicators": {
+                "leakage": {"present": i % 3 == 0, "severity": "minor"},
+                "boxDeformation": {"present": i % 5 == 0, "severity": "severe"},
+            },
+            "overall": {"score": 0.4},
+        }
+        metrics = compute_quality_index(
+            context=context, exif=exif, damage_report=damage_report,
+            weights=config.quality_weights.normalized(),
+            max_distance_meters=config.geolocation.max_distance_meters, config=config,
+        )
+        metrics["config_version"] = config.scoring_version()
+        records.append({
+            "object_name": context.object_name,
+            "delivery": delivery_fields(context),
+            "metadata": {"object_name": context.object_name, "etag": f"etag-{i}"},
+            "exif": exif,
+            "damage_report": damage_report,
+            "quality_metrics": metrics,
+            "assessment": {"status": "OK"},
+        })
+    return records
+
+
+def test_config_version_is_stable_and_tracks_weights(workflow_config):
+    old = workflow_config()
+    new = workflow_config(quality_weights=NEW_WEIGHTS)
+    assert old.scoring_version() == workflow_config().scoring_version()
+    assert old.scoring_version() != new.scoring_version()
+
+
+def test_rescore_records_matches_scalar_scores(workflow_config, delivery_context):
+    old = workflow_config()
+    new = workflow_config(
+        quality_weights=QualityIndexWeights(timeliness=0.2, location_accuracy=0.2, damage_score=0.6),
+        damage_scoring=DamageScoringConfig(type_weights=DamageTypeWeights(leakage=0.1, box_deformation=0.6)),
+    )
+    records = _stored_results(old, delivery_context)
+    summary = {}
+    rescored = list(rescore_records(records, new, chunk_size=16, summary=summary))
+    assert summary == {"rescored": 50, "unchanged": 0, "failed": 0}
+
+    for record, original in zip(rescored, records):
+        expected = compute_quality_index(
+            context=context_from_row({"object_name": record["object_name"], **record["delivery"]}),
+            exif=record["exif"], damage_report=record["damage_report"],
+            weights=new.quality_weights.normalized(),
+            max_distance_meters=new.geolocation.max_distance_meters, config=new,
+        )
+        metrics = record["quality_metrics"]
+        assert {key: metrics[key] for key in expected} == expected
+        assert metrics["config_version"] == new.scoring_version()
+        # Model outputs are left as they were
+        assert record["damage_report"] == original["damage_report"]
+        assert record["assessment"] == original["assessment"]
+
+    summary = {}
+    list(rescore_records(rescored, new, summary=summary))
+    assert summary["unchanged"] == 50
+
+
+def test_rescore_legacy_file_with_manifest(workflow_config, delivery_context, tmp_path):
+    old_records = _stored_results(workflow_config(), delivery_context, count=10)
+    # Results written before they carried delivery details need the manifest
+    results = tmp_path / "results.jsonl"
+    manifest = tmp_path / "manifest.jsonl"
+    with open(results, "w") as out, open(manifest, "w") as man:
+        for record in old_records:
+            legacy = {key: value for key, value in record.items() if key != "delivery"}
+            out.write(json.dumps(legacy) + "\n")
+            man.write(json.dumps({"object_name": record["object_name"], **record["delivery"]}) + "\n")
+        out.write(json.dumps({"object_name": "missing.jpg", "error": "not found"}) + "\n")
+
+    summary = rescore_file(
+        workflow_config(quality_weights=NEW_WEIGHTS), str(results), str(tmp_path / "rescored.jsonl"),
+        manifest_path=str(manifest),
+    )
+    assert summary == {"rescored": 10, "unchanged": 0, "failed": 1}
+
+
+def test_rescore_event_store_in_place(workflow_config, delivery_context, tmp_path):
+    db_path = str(tmp_path / "events.db")
+    stored = workflow_config(events=EventStoreConfig(backend="sqlite", sqlite_path=db_path))
+    writer = get_event_writer(stored)
+    for record in _stored_results(workflow_config(), delivery_context, count=10):
+        writer.write(quality_event_row(record, object_name=record["object_name"]))
+    writer.flush()
+
+    new_store = workflow_config(
+        quality_weights=NEW_WEIGHTS, events=EventStoreConfig(backend="sqlite", sqlite_path=db_path)
+    )
+    summary = rescore_event_store(new_store)
+    get_event_writer(new_store).close()
+    db = sqlite3.connect(db_path)
+    versions = db.execute(
+        "SELECT config_version, COUNT(*) FROM delivery_quality_events GROUP BY config_version"
+    ).fetchall()
+    db.close()
+
+    assert summary["rescored"] == 10
+    assert versions == [(new_store.scoring_version(), 10)]
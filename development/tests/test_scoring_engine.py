@@ -0,0 +1,119 @@
+"""Tests for the compiled ScoringEngine against the per-call scoring functions."""
+
+import random
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import pytest
+
+from oci_delivery_agent.chains import DeliveryContext, compute_quality_index
+from oci_delivery_agent.config import DamageScoringConfig, QualityIndexWeights
+from oci_delivery_agent.engine import ScoringEngine, get_scoring_engine
+
+SEVERITIES = ("none", "minor", "moderate", "severe", "unknown")
+INDICATORS = ("leakage", "boxDeformation", "packagingIntegrity", "cornerDamage", "labelDamage")
+
+
+def _random_delivery(rng):
+    promised = datetime(2024, 1, 15, 10, 0)
+    context = DeliveryContext(
+        object_name="photo.jpg",
+        expected_latitude=40.7128,
+        expected_longitude=-74.0060,
+        promised_time_utc=promised,
+        delivered_time_utc=promised + timedelta(minutes=rng.randint(-60, 300)),
+    )
+    exif = {"GPSInfo": {"latitude": 40.7128 + rng.uniform(-0.001, 0.001), "longitude": -74.0060}} if rng.random() < 0.8 else {}
+    if rng.random() < 0.2:
+        report = {"overall": {"score": rng.random()}}
+    else:
+        report = {
+            "indicators": {
+                name: {"present": rng.random() < 0.5, "severity": rng.choice(SEVERITIES)}
+                for name in rng.sample(INDICATORS, rng.randint(1, len(INDICATORS)))
+            },
+            "overall": {"score": rng.random()},
+        }
+    return context, exif, report
+
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"damage_scoring": DamageScoringConfig(use_weighted_scoring=False)},
+    {"quality_weights": QualityIndexWeights(timeliness=0.2, location_accuracy=0.3, damage_score=0.5)},
+])
+def test_engine_matches_scalar_functions(workflow_config, overrides):
+    config = workflow_config(**overrides)
+    engine = ScoringEngine(config)
+    weights = config.quality_weights.normalized()
+    rng = random.Random(15)
+
+    for _ in range(5000):
+        context, exif, report = _random_delivery(rng)
+        expected = compute_quality_index(
+            context=context, exif=exif, damage_report=report, weights=weights,
+            max_distance_meters=config.geolocation.max_distance_meters, config=config,
+        )
+        metrics = engine.quality_metrics(context, exif, report)
+        assert metrics.pop("config_version") == config.scoring_version()
+        assert metrics == expected
+
+
+def test_equal_configs_share_an_engine(workflow_config):
+    engine = get_scoring_engine(workflow_config())
+    assert get_scoring_engine(workflow_config()) is engine
+
+    changed = get_scoring_engine(workflow_config(quality_weights=QualityIndexWeights(timeliness=0.9)))
+    assert changed is not engine
+    assert changed.version != engine.version
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda engine: setattr(engine, "max_distance_meters", 1.0),
+    lambda engine: setattr(engine, "extra", 1),
+    lambda engine: engine.type_weights.__setitem__("leakage", 1.0),
+])
+def test_engine_is_read_only(workflow_config, mutate):
+    with pytest.raises((AttributeError, TypeError)):
+        mutate(get_scoring_engine(workflow_config()))
+
+
+def test_config_is_hashed_once(workflow_config, monkeypatch):
+    import gc
+
+    from oci_delivery_agent import engine as engines
+    from oci_delivery_agent.config import WorkflowConfig
+
+    config = workflow_config(quality_weights=QualityIndexWeights(timeliness=0.7))
+    first = get_scoring_engine(config)
+    hashes = []
+    original = WorkflowConfig.scoring_version
+    monkeypatch.setattr(WorkflowConfig, "scoring_version", lambda self: hashes.append(1) or original(self))
+    for _ in range(100):
+        assert get_scoring_engine(config) is first
+    assert hashes == []
+
+    # The identity entry goes with its config
+    key = id(config)
+    del config
+    gc.collect()
+    assert key not in engines._config_engines
+
+
+def test_changed_config_gets_a_new_engine(workflow_config):
+    from dataclasses import FrozenInstanceError
+
+    config = workflow_config()
+    engine = get_scoring_engine(config)
+
+    # Scoring sections cannot drift under the cached engine...
+    with pytest.raises(FrozenInstanceError):
+        config.quality_weights.timeliness = 0.9
+    # ...and replacing one is picked up on the next lookup
+    config.quality_weights = QualityIndexWeights(timeliness=0.9)
+    changed = get_scoring_engine(config)
+    assert changed is not engine
+    assert changed.version == config.scoring_version()
+
+    config.geolocation = replace(config.geolocation, max_distance_meters=5.0)
+    assert get_scoring_engine(config).max_distance_meters == 5.0
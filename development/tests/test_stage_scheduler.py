@@ -0,0 +1,103 @@
+"""Tests for the dependency-driven stage scheduler used by run_quality_pipeline."""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from oci_delivery_agent.scheduler import Stage, StageScheduler
+
+
+def _slow(name):
+    def run(**_):
+        time.sleep(0.2)
+        return {name: True}
+    return run
+
+
+STAGES = [
+    Stage("source", lambda seed: {"payload": seed * 2}, inputs=("seed",), outputs=("payload",)),
+    Stage("exif", _slow("exif"), inputs=("payload",), outputs=("exif",)),
+    Stage("caption", _slow("caption"), inputs=("payload",), outputs=("caption",)),
+    Stage("damage", _slow("damage"), inputs=("payload",), outputs=("damage",)),
+    Stage(
+        "scoring",
+        lambda exif, caption, damage: {"score": exif and caption and damage},
+        inputs=("exif", "caption", "damage"),
+        outputs=("score",),
+    ),
+]
+
+
+def test_independent_stages_overlap():
+    started = time.perf_counter()
+    values = StageScheduler(STAGES, max_workers=4).run({"seed": 21})
+    elapsed = time.perf_counter() - started
+
+    assert values["payload"] == 42
+    assert values["score"] is True
+    # Three 0.2s stages run side by side
+    assert elapsed < 0.45
+
+
+def test_single_worker_honours_dependencies():
+    values = StageScheduler(STAGES, max_workers=1).run({"seed": 1})
+    assert values["score"] is True
+
+
+def test_speculative_stage_cancelled_without_waiting():
+    def slow_damage(payload):
+        time.sleep(1.0)
+        return {"damage_report": {"overall": {"score": 0.9}}}
+
+    def cancel_without_package(values):
+        caption = values.get("caption")
+        if caption is not None and caption.get("packageVisible") is False:
+            return {"damage_report": {"skipped": True}}
+        return None
+
+    stages = [
+        Stage("caption", lambda payload: {"caption": {"packageVisible": False}},
+              inputs=("payload",), outputs=("caption",)),
+        Stage("damage", slow_damage, inputs=("payload",), outputs=("damage_report",),
+              cancel_on=cancel_without_package),
+    ]
+    scheduler = StageScheduler(stages, max_workers=2)
+    started = time.perf_counter()
+    values = scheduler.run({"payload": b"jpeg"})
+
+    assert values["damage_report"] == {"skipped": True}
+    assert scheduler.cancelled == ("damage",)
+    assert time.perf_counter() - started < 0.5
+
+
+@pytest.mark.parametrize("mode, expect_context", [("sequential", True), ("independent", False)])
+def test_pipeline_stage_graph(workflow_config, delivery_context, mode, expect_context):
+    from langchain_community.llms.fake import FakeListLLM
+    from oci_delivery_agent.artifacts import ImageArtifact
+    from oci_delivery_agent.chains import build_pipeline_stages
+    from oci_delivery_agent.config import PipelineConfig
+
+    seen_context = []
+
+    def detect(image, caption_context=None):
+        seen_context.append(caption_context)
+        return {"overall": {"severity": "none", "score": 0.0}}
+
+    tools = {
+        "retrieval": SimpleNamespace(
+            fetch=lambda name: ImageArtifact(b"jpeg", metadata={"object_name": name}),
+            exif_from_prefix=lambda name: {},
+        ),
+        "caption": SimpleNamespace(caption=lambda image: json.dumps({"packageVisible": True})),
+        "damage": SimpleNamespace(detect=detect),
+    }
+    llm = FakeListLLM(responses=['{"status": "OK", "issues": [], "insights": "clean"}'])
+    config = workflow_config(pipeline=PipelineConfig(damage_mode=mode))
+
+    stages = build_pipeline_stages(config, llm, delivery_context(), tools)
+    values = StageScheduler(stages).run({"object_name": "sample.jpg"})
+
+    assert values["assessment"]["status"] == "OK"
+    assert (seen_context[0] is not None) == expect_context
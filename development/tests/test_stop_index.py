@@ -0,0 +1,108 @@
+"""Tests for nearest planned stop lookups and wrong-stop detection."""
+
+import json
+import os
+import random
+import time
+
+import pytest
+
+from oci_delivery_agent.batch import context_from_row, read_manifest
+from oci_delivery_agent.stops import Stop, StopIndex, distance_meters, get_stop_index, stop_match
+
+
+@pytest.fixture(scope="module")
+def stops():
+    rng = random.Random(16)
+    stops = [
+        Stop(f"stop-{i}", rng.uniform(-89.9, 89.9), rng.uniform(-180, 180), route_id=f"route-{i % 40}")
+        for i in range(50000)
+    ]
+    # Clusters near the antimeridian and a pole, where lat/lon grids break down
+    stops += [Stop(f"edge-{i}", rng.uniform(-5, 5), rng.choice([-179.999, 179.999]) + rng.uniform(-0.001, 0.001)) for i in range(50)]
+    stops += [Stop(f"pole-{i}", 89.999, rng.uniform(-180, 180)) for i in range(50)]
+    return stops
+
+
+def test_nearest_matches_linear_scan_in_under_a_millisecond(stops):
+    rng = random.Random(17)
+    index = StopIndex(stops)
+    queries = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(200)]
+    queries += [(0.0, 180.0), (89.9999, 0.0), (stops[7].latitude, stops[7].longitude)]
+
+    for lat, lon in queries:
+        stop, distance = index.nearest(lat, lon)
+        best = min(distance_meters(lat, lon, s.latitude, s.longitude) for s in stops)
+        assert distance == pytest.approx(best, abs=1e-6)
+        assert distance_meters(lat, lon, stop.latitude, stop.longitude) == pytest.approx(distance, abs=1e-6)
+
+    started = time.perf_counter()
+    for lat, lon in queries:
+        index.nearest(lat, lon)
+    assert (time.perf_counter() - started) * 1000 / len(queries) < 1.0
+
+
+def test_empty_index_has_no_nearest_stop():
+    assert StopIndex([]).nearest(0.0, 0.0) is None
+
+
+@pytest.fixture
+def stops_file(tmp_path):
+    path = tmp_path / "stops.csv"
+    path.write_text(
+        "stop_id,latitude,longitude,route_id\n"
+        "A,40.7128,-74.0060,r1\nB,40.7150,-74.0060,r1\nC,40.7200,-74.0100,r1\n"
+    )
+    return str(path)
+
+
+@pytest.fixture
+def manifest_at_stop_a(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    path.write_text(json.dumps({
+        "object_name": "a.jpg", "stop_id": "A",
+        "promised_time": "2024-01-15T10:00:00", "delivered_time": "2024-01-15T10:05:00",
+    }) + "\n")
+    return str(path)
+
+
+def test_manifest_stop_id_resolves_coordinates(stops_file, manifest_at_stop_a):
+    context = next(read_manifest(manifest_at_stop_a, get_stop_index(stops_file)))
+    assert (context.expected_latitude, context.expected_longitude, context.stop_id) == (40.7128, -74.0060, "A")
+
+    # A stop_id without a stops file is rejected
+    with pytest.raises(ValueError):
+        next(read_manifest(manifest_at_stop_a))
+
+
+def test_photo_at_another_stop_is_flagged(stops_file, manifest_at_stop_a):
+    index = get_stop_index(stops_file)
+    context = next(read_manifest(manifest_at_stop_a, index))
+
+    at_b = stop_match(index, {"GPSInfo": {"latitude": 40.7150, "longitude": -74.0060}}, context, 50.0)
+    near_a = stop_match(index, {"GPSInfo": {"latitude": 40.7129, "longitude": -74.0060}}, context, 50.0)
+    assert at_b["wrong_stop"]
+    assert at_b["stop_id"] == "B"
+    assert not near_a["wrong_stop"]
+    assert stop_match(index, {}, context, 50.0) is None
+
+    # Without a stop_id the expected stop is the one nearest the expected coordinates
+    unnamed = context_from_row({
+        "object_name": "c.jpg", "expected_latitude": 40.7200, "expected_longitude": -74.0100,
+        "promised_time": "2024-01-15T10:00:00", "delivered_time": "2024-01-15T10:05:00",
+    })
+    match = stop_match(index, {"GPSInfo": {"latitude": 40.7128, "longitude": -74.0060}}, unnamed, 50.0)
+    assert match["expected_stop_id"] == "C"
+    assert match["wrong_stop"]
+
+
+def test_stops_file_reloaded_only_when_changed(stops_file):
+    index = get_stop_index(stops_file)
+    assert get_stop_index(stops_file) is index
+
+    with open(stops_file, "a") as handle:
+        handle.write("D,41.0,-74.0,r2\n")
+    os.utime(stops_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+    reloaded = get_stop_index(stops_file)
+    assert reloaded is not index
+    assert reloaded.get("D") is not None
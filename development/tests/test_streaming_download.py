@@ -0,0 +1,119 @@
+"""Tests for streaming, size-bounded object downloads."""
+
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+from oci_delivery_agent.streaming import DownloadStalledError, ObjectTooLargeError, read_stream
+
+ASSET_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets', 'deliveries')
+BODY = os.urandom(300_000)
+
+
+class CountingStream(io.BytesIO):
+    """BytesIO that records how many bytes were handed out."""
+
+    def __init__(self, data, delay=0.0):
+        super().__init__(data)
+        self.bytes_read = 0
+        self.delay = delay
+
+    def read(self, size=-1):
+        if self.delay:
+            time.sleep(self.delay)
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+@pytest.mark.parametrize("expected_size", [len(BODY), None])
+def test_body_and_digest_in_one_pass(expected_size):
+    data, digest = read_stream(
+        CountingStream(BODY), max_bytes=1_000_000, expected_size=expected_size, chunk_bytes=64 * 1024
+    )
+    assert bytes(data) == BODY
+    assert digest == hashlib.sha256(BODY).hexdigest()
+
+
+def test_declared_oversized_object_rejected_before_reading():
+    declared = CountingStream(BODY)
+    with pytest.raises(ObjectTooLargeError):
+        read_stream(declared, max_bytes=100_000, expected_size=len(BODY))
+    assert declared.bytes_read == 0
+
+
+def test_undeclared_oversized_object_rejected_within_a_chunk():
+    undeclared = CountingStream(BODY)
+    with pytest.raises(ObjectTooLargeError):
+        read_stream(undeclared, max_bytes=100_000, chunk_bytes=16 * 1024)
+    assert undeclared.bytes_read <= 100_000 + 16 * 1024
+
+
+def test_stalled_chunk_detected():
+    with pytest.raises(DownloadStalledError):
+        read_stream(CountingStream(BODY, delay=0.05), max_bytes=1_000_000, chunk_timeout=0.01)
+
+
+class FakeObjectStorage:
+    """Object Storage client whose responses stream ``body``."""
+
+    def __init__(self, body):
+        self.body = body
+        self.responses = []
+
+    def get_object(self, **kwargs):
+        body = self.body
+
+        class FakeBody:
+            raw = CountingStream(body)
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        class FakeResponse:
+            headers = {"Content-Length": str(len(body)), "Content-Type": "image/jpeg"}
+            data = FakeBody()
+
+        self.responses.append(FakeResponse())
+        return self.responses[-1]
+
+
+@pytest.fixture
+def retrieval_tool(workflow_config):
+    from oci_delivery_agent.config import ObjectStorageConfig
+    from oci_delivery_agent.tools import ObjectRetrievalTool
+
+    with open(os.path.join(ASSET_DIR, "damage1.jpg"), "rb") as handle:
+        body = handle.read()
+
+    def build(max_object_bytes):
+        config = workflow_config(
+            object_storage=ObjectStorageConfig(namespace="ns", bucket_name="bucket", max_object_bytes=max_object_bytes),
+            local_asset_root=ASSET_DIR,
+        )
+        tool = ObjectRetrievalTool(config)
+        fake = FakeObjectStorage(body)
+        tool._client._client = fake
+        return tool, fake
+
+    return build
+
+
+def test_retrieval_keeps_streamed_digest(retrieval_tool):
+    tool, fake = retrieval_tool(64 * 1024 * 1024)
+    artifact = tool.fetch("damage1.jpg")
+
+    assert artifact._digest == hashlib.sha256(fake.body).hexdigest()
+    assert artifact.metadata["source"] == "oci"
+    assert fake.responses[0].data.closed
+
+
+def test_retrieval_enforces_size_limit(retrieval_tool):
+    tool, fake = retrieval_tool(1024)
+    with pytest.raises(ObjectTooLargeError):
+        tool.fetch("damage1.jpg")
+    assert fake.responses[0].data.raw.bytes_read == 0
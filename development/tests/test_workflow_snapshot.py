@@ -0,0 +1,79 @@
+"""Tests for the warm-invocation snapshot of config, LLM, tools and prompt chains."""
+
+import json
+import os
+import time
+
+import pytest
+
+from oci_delivery_agent import snapshot as snapshots
+
+
+class _Factory:
+    """LLM factory that counts builds and records the model its config names."""
+
+    def __init__(self):
+        self.calls = 0
+        self.models = []
+
+    def __call__(self, config, environ):
+        from langchain.llms.fake import FakeListLLM
+
+        self.calls += 1
+        self.models.append(config.genai.model_ocid)
+        return FakeListLLM(responses=["ok"])
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    monkeypatch.delenv("DELIVERY_CONFIG_FILE", raising=False)
+    monkeypatch.setenv("WEIGHT_DAMAGE", "0.4")
+    monkeypatch.setattr(snapshots, "_snapshot", None)
+    return _Factory()
+
+
+def test_warm_lookups_reuse_the_snapshot(factory, monkeypatch):
+    monkeypatch.setenv("OCI_TEXT_MODEL_OCID", "model-a")
+    first = snapshots.get_workflow_snapshot(factory)
+    for _ in range(1000):
+        assert snapshots.get_workflow_snapshot(factory) is first
+    assert factory.calls == 1
+    assert set(first.chains) == {"caption_summary", "review"}
+    assert set(first.tools) == {"retrieval", "exif", "caption", "damage"}
+
+    # A setting the config never reads does not rebuild
+    monkeypatch.setenv("SNAPSHOT_TEST_UNRELATED", "changed")
+    assert snapshots.get_workflow_snapshot(factory) is first
+
+
+def test_changed_settings_rebuild_the_snapshot(factory, monkeypatch):
+    monkeypatch.setenv("OCI_TEXT_MODEL_OCID", "model-a")
+    first = snapshots.get_workflow_snapshot(factory)
+
+    monkeypatch.setenv("WEIGHT_DAMAGE", "0.6")
+    second = snapshots.get_workflow_snapshot(factory)
+    assert second is not first
+    assert second.config.quality_weights.damage_score == 0.6
+    assert factory.calls == 2
+
+    # Settings read by the LLM factory count too
+    monkeypatch.setenv("OCI_TEXT_MODEL_OCID", "model-b")
+    assert snapshots.get_workflow_snapshot(factory) is not second
+    assert factory.models[-1] == "model-b"
+
+
+def test_config_file_overrides_environment_and_reloads(factory, monkeypatch, tmp_path):
+    path = tmp_path / "delivery.json"
+    path.write_text(json.dumps({"WEIGHT_DAMAGE": 0.7, "OCI_TEXT_MODEL_OCID": "model-file"}))
+    monkeypatch.setenv("DELIVERY_CONFIG_FILE", str(path))
+
+    first = snapshots.get_workflow_snapshot(factory)
+    assert first.config.quality_weights.damage_score == 0.7
+    assert factory.models[-1] == "model-file"
+    assert snapshots.get_workflow_snapshot(factory) is first
+
+    path.write_text(json.dumps({"WEIGHT_DAMAGE": 0.55}))
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10**9))
+    second = snapshots.get_workflow_snapshot(factory)
+    assert second is not first
+    assert second.config.quality_weights.damage_score == 0.55
@@ -6,9 +6,20 @@ from PIL import Image
 import numpy as np
 import oci
 import os
+import sys
 from datetime import datetime
 from typing import Dict, Any, List, Tuple
 
+# Ensure src/ modules are importable when running in OCI Functions
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_PATH = os.path.join(CURRENT_DIR, "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+# Signers and SDK clients are shared across warm invocations of this container
+from oci_delivery_agent import clients  # noqa: E402
+from oci_delivery_agent.streaming import ObjectTooLargeError, read_stream  # noqa: E402
+
 # Check if OpenCV is available
 try:
     import cv2
@@ -18,50 +29,20 @@ except ImportError:
     cv2 = None
 
 
+# Object downloads are streamed in chunks and rejected once over the limit so
+# an oversized upload cannot exhaust the function's memory.
+MAX_OBJECT_BYTES = int(float(os.environ.get("OBJECT_MAX_MB", "64")) * 1024 * 1024)
+READ_CHUNK_BYTES = int(os.environ.get("OBJECT_READ_CHUNK_KB", "1024")) * 1024
+CHUNK_TIMEOUT_SECONDS = float(os.environ.get("OBJECT_CHUNK_TIMEOUT_SECONDS", "30"))
+
+
 def get_oci_vision_client():
-    """Get OCI Vision AI client with resource principal or config file authentication."""
+    """Get the shared OCI Vision AI client (resource principal or config file authentication)."""
     try:
-        signer = None
-        config: Dict[str, Any] = {}
         service_endpoint = "https://vision.aiservice.us-chicago-1.oci.oraclecloud.com"
-        
-        try:
-            from oci.auth.signers import get_resource_principals_signer
-
-            signer = get_resource_principals_signer()
-            signer_region = getattr(signer, "region", None)
-            resolved_region = os.environ.get("OCI_REGION") or signer_region or "us-chicago-1"
-            config = {"region": resolved_region}
-            if os.environ.get("DEBUG_VISION"):
-                print(f"Using resource principal authentication for Vision client (region={resolved_region})")
-                print(f"Vision API endpoint: {service_endpoint}")
-        except Exception as rp_error:
-            if os.environ.get("DEBUG_VISION"):
-                print(f"Resource principal signer unavailable for Vision: {rp_error}")
-            try:
-                config = oci.config.from_file()
-                if os.environ.get("DEBUG_VISION"):
-                    print("Falling back to local OCI configuration for Vision")
-                    print(f"Vision API endpoint: {service_endpoint}")
-            except Exception as config_error:
-                try:
-                    config = oci.config.from_file("~/.oci/config")
-                    if os.environ.get("DEBUG_VISION"):
-                        print("Using ~/.oci/config for Vision client")
-                        print(f"Vision API endpoint: {service_endpoint}")
-                except Exception:
-                    return None
-
-        if signer is not None:
-            return oci.ai_vision.AIServiceVisionClient(
-                config=config, 
-                signer=signer,
-                service_endpoint=service_endpoint
-            )
-        return oci.ai_vision.AIServiceVisionClient(
-            config=config,
-            service_endpoint=service_endpoint
-        )
+        if os.environ.get("DEBUG_VISION"):
+            print(f"Vision API endpoint: {service_endpoint}")
+        return clients.get_vision_client(service_endpoint)
     except Exception as e:
         print(f"Failed to initialize Vision client: {e}")
         return None
@@ -340,37 +321,31 @@ def blur_faces_in_image(image_bytes: bytes, faces: List[Dict[str, Any]], blur_in
 
 
 def get_oci_storage_client():
-    """Get OCI Object Storage client using resource principal or config file."""
+    """Get the shared OCI Object Storage client (resource principal or config file)."""
     try:
-        signer = None
-        config: Dict[str, Any] = {}
-        try:
-            from oci.auth.signers import get_resource_principals_signer
-
-            signer = get_resource_principals_signer()
-            signer_region = getattr(signer, "region", None)
-            resolved_region = os.environ.get("OCI_REGION") or signer_region or "us-ashburn-1"
-            config = {"region": resolved_region}
-            print(f"Using resource principal authentication for Object Storage client (region={resolved_region})")
-        except Exception as rp_error:
-            print(f"Resource principal signer unavailable for Object Storage: {rp_error}")
-            try:
-                config = oci.config.from_file()
-                print("Falling back to local OCI configuration for Object Storage")
-            except Exception as config_error:
-                try:
-                    config = oci.config.from_file("~/.oci/config")
-                    print("Using ~/.oci/config for Object Storage client")
-                except Exception:
-                    return None
-
-        if signer is not None:
-            return oci.object_storage.ObjectStorageClient(config=config, signer=signer)
-        return oci.object_storage.ObjectStorageClient(config)
+        # The read timeout bounds each socket read of a streamed object body
+        return clients.get_object_storage_client(read_timeout=CHUNK_TIMEOUT_SECONDS)
     except Exception:
         return None
 
 
+def read_object_bounded(response_obj) -> bytearray:
+    """Stream an Object Storage response body into a size-capped buffer."""
+    content_length = response_obj.headers.get("Content-Length")
+    try:
+        data, _ = read_stream(
+            response_obj.data.raw,
+            max_bytes=MAX_OBJECT_BYTES,
+            expected_size=int(content_length) if content_length is not None else None,
+            chunk_bytes=READ_CHUNK_BYTES,
+            chunk_timeout=CHUNK_TIMEOUT_SECONDS,
+            hash_while_reading=False,
+        )
+    finally:
+        response_obj.data.close()
+    return data
+
+
 def handler(ctx, data=None):
     """
     Face blurring function with OCI Vision Face Detection and Object Storage.
@@ -473,9 +448,15 @@ def handler(ctx, data=None):
                 bucket_name=bucket_name,
                 object_name=object_name
             )
-            image_bytes = response_obj.data.content
+            image_bytes = read_object_bounded(response_obj)
             if os.environ.get("DEBUG_VISION"):
                 print(f"Retrieved image: {len(image_bytes)} bytes")
+        except ObjectTooLargeError as e:
+            return response.Response(
+                ctx,
+                response_data={"error": str(e)},
+                status_code=413
+            )
         except Exception as e:
             return response.Response(
                 ctx,
@@ -525,7 +506,7 @@ def handler(ctx, data=None):
                 )
         else:
             print("No faces detected, returning original image")
-            blurred_bytes = image_bytes
+            blurred_bytes = bytes(image_bytes)
         
         # Store blurred image
         blur_prefix = os.environ.get("BLUR_PREFIX", "blurred/")
@@ -0,0 +1,219 @@
+"""Process-wide OCI authentication and client registry.
+
+OCI Functions keep the container (and this module) alive across warm
+invocations, so signers and SDK clients are built once and shared. Each SDK
+client owns a pooled ``requests`` session, which keeps TLS connections open
+between calls to the same service endpoint. Clients are dropped, and their
+sessions closed, when the signer they were built with is replaced, and the
+least recently used one goes once more than ``MAX_CLIENTS`` are cached.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Refresh resource principal tokens this many seconds before they expire.
+SIGNER_REFRESH_MARGIN_SECONDS = 300.0
+# Clients kept at once; each (service, endpoint) pair in use needs one.
+MAX_CLIENTS = 16
+
+_lock = threading.RLock()
+_auth: Optional["_AuthState"] = None
+_clients: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+
+
+class _AuthState:
+    """Resolved OCI credentials plus the expiry of any security token."""
+
+    def __init__(self, config: Dict[str, Any], signer: Any = None):
+        self.config = config
+        self.signer = signer
+        self.expires_at = _token_expiry(signer)
+
+    def needs_refresh(self, now: float) -> bool:
+        return self.expires_at is not None and now >= self.expires_at - SIGNER_REFRESH_MARGIN_SECONDS
+
+
+def _token_expiry(signer: Any) -> Optional[float]:
+    """Return the ``exp`` claim of a signer's security token, when it has one."""
+    if signer is None or not hasattr(signer, "get_security_token"):
+        return None
+    try:
+        token = signer.get_security_token()
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
+
+
+def _build_auth() -> _AuthState:  # pragma: no cover - requires OCI SDK & credentials
+    import oci
+
+    if os.environ.get("OCI_RESOURCE_PRINCIPAL_VERSION"):
+        try:
+            from oci.auth.signers import get_resource_principals_signer
+
+            signer = get_resource_principals_signer()
+            region = os.environ.get("OCI_REGION") or getattr(signer, "region", None) or "us-ashburn-1"
+            os.environ.setdefault("OCI_REGION", region)
+            print(f"Using resource principal authentication for OCI clients (region={region})")
+            return _AuthState({"region": region}, signer)
+        except Exception as rp_error:
+            print(f"Resource principal signer unavailable: {rp_error}")
+
+    try:
+        return _AuthState(oci.config.from_file())
+    except Exception as config_error:
+        print(f"Warning: Could not load OCI config file: {config_error}")
+        try:
+            return _AuthState(oci.config.from_file("~/.oci/config"))
+        except Exception as fallback_error:
+            raise RuntimeError(
+                "Could not initialize OCI authentication via resource principals or config files"
+            ) from fallback_error
+
+
+def _refresh_auth(state: _AuthState) -> _AuthState:  # pragma: no cover - requires OCI SDK
+    """Refresh the signer in place so clients holding it stay valid."""
+    refresh = getattr(state.signer, "refresh_security_token", None)
+    if refresh is not None:
+        try:
+            refresh()
+            state.expires_at = _token_expiry(state.signer)
+            return state
+        except Exception as refresh_error:
+            print(f"Warning: Could not refresh resource principal token: {refresh_error}")
+    # Rebuilding the signer invalidates every client constructed with the old one.
+    _evict_clients()
+    return _build_auth()
+
+
+def _close_client(client: Any) -> None:
+    """Close the pooled HTTP session of an SDK client that is no longer cached.
+
+    A request already in flight on it still completes; the session only
+    drops its idle connections.
+    """
+    session = getattr(getattr(client, "base_client", None), "session", None)
+    if session is not None:
+        try:
+            session.close()
+        except Exception as close_error:
+            print(f"Warning: Could not close OCI client session: {close_error}")
+
+
+def _evict_clients() -> None:
+    while _clients:
+        _close_client(_clients.popitem(last=False)[1])
+
+
+def get_auth() -> Tuple[Dict[str, Any], Any]:
+    """Return the shared ``(config, signer)`` pair, refreshing tokens near expiry."""
+    global _auth
+    with _lock:
+        if _auth is None:
+            _auth = _build_auth()
+        elif _auth.needs_refresh(time.time()):
+            _auth = _refresh_auth(_auth)
+        return _auth.config, _auth.signer
+
+
+def get_client(service: str, endpoint: Optional[str], factory: Callable[..., Any]) -> Any:
+    """Return the cached client for ``service``/``endpoint``, building it once.
+
+    ``factory`` receives the keyword arguments ``config`` and (when resource
+    principals are in use) ``signer``.
+    """
+    key = (service, endpoint or "")
+    with _lock:
+        config, signer = get_auth()
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+        kwargs: Dict[str, Any] = {"config": config}
+        if signer is not None:
+            kwargs["signer"] = signer
+        client = _clients[key] = factory(**kwargs)
+        while len(_clients) > MAX_CLIENTS:
+            _close_client(_clients.popitem(last=False)[1])
+        return client
+
+
+def normalize_genai_hostname(hostname: str) -> str:
+    """Strip an action path that is sometimes pasted into OCI_GENAI_HOSTNAME."""
+    if '/20231130/actions/generateText' in hostname:
+        hostname = hostname.replace('/20231130/actions/generateText', '')
+    return hostname
+
+
+def get_genai_client(hostname: str) -> Any:  # pragma: no cover - requires OCI SDK & credentials
+    """Shared Generative AI inference client for ``hostname``."""
+    import oci
+    from oci.generative_ai_inference import GenerativeAiInferenceClient
+
+    hostname = normalize_genai_hostname(hostname)
+    return get_client(
+        "generative_ai_inference",
+        hostname,
+        lambda **auth: GenerativeAiInferenceClient(
+            service_endpoint=hostname,
+            retry_strategy=oci.retry.NoneRetryStrategy(),
+            timeout=(10, 240),
+            **auth,
+        ),
+    )
+
+
+def get_object_storage_client(read_timeout: Optional[float] = None) -> Any:  # pragma: no cover - requires OCI SDK & credentials
+    """Shared Object Storage client for the configured region.
+
+    ``read_timeout`` bounds each socket read, which interrupts a download
+    whose body stops arriving.
+    """
+    import oci
+
+    def build(**auth: Any) -> Any:
+        if read_timeout is not None:
+            auth["timeout"] = (10, read_timeout)
+        return oci.object_storage.ObjectStorageClient(**auth)
+
+    endpoint = None if read_timeout is None else f"read_timeout={read_timeout}"
+    return get_client("object_storage", endpoint, build)
+
+
+def get_vision_client(service_endpoint: Optional[str] = None) -> Any:  # pragma: no cover - requires OCI SDK
+    """Shared OCI AI Vision client, optionally pinned to ``service_endpoint``."""
+    import oci
+
+    def build(**auth: Any) -> Any:
+        if service_endpoint:
+            auth["service_endpoint"] = service_endpoint
+        return oci.ai_vision.AIServiceVisionClient(**auth)
+
+    return get_client("ai_vision", service_endpoint, build)
+
+
+def get_notification_client() -> Any:  # pragma: no cover - requires OCI SDK & credentials
+    """Shared OCI Notifications data plane client (publishing to topics)."""
+    import oci
+
+    return get_client(
+        "notification_data_plane",
+        None,
+        lambda **auth: oci.ons.NotificationDataPlaneClient(timeout=(10, 30), **auth),
+    )
+
+
+def reset_clients() -> None:
+    """Drop cached credentials and clients (tests and credential rotation)."""
+    global _auth
+    with _lock:
+        _auth = None
+        _evict_clients()
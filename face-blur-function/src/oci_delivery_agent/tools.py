@@ -1,12 +1,13 @@
 """LangChain tools wrapping OCI services for the delivery workflow."""
 from __future__ import annotations
 
+import asyncio
 import base64
 import io
 import json
 import os
+import weakref
 from datetime import datetime
-from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from langchain.tools import BaseTool
@@ -14,6 +15,7 @@ from PIL import Image, ExifTags
 import numpy as np
 
 from .config import WorkflowConfig
+from .local_storage import get_local_backend
 
 try:  # pragma: no cover - optional dependency for real OCI calls
     import oci
@@ -27,6 +29,24 @@ except Exception:  # pragma: no cover - fall back if opencv not installed
     cv2 = None
     CV2_AVAILABLE = False
 
+# Blocking calls admitted at once per service from async callers. The OCI SDK
+# and OpenCV are synchronous, so admitted calls run in worker threads.
+ASYNC_SERVICE_LIMITS = {"object_storage": 16, "genai": 8, "compute": 4}
+_async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _run_blocking(service: str, func, *args: Any) -> Any:
+    """Run a blocking call in a worker thread under the service's semaphore."""
+    loop = asyncio.get_running_loop()
+    semaphores = _async_semaphores.get(loop)
+    if semaphores is None:
+        semaphores = {name: asyncio.Semaphore(limit) for name, limit in ASYNC_SERVICE_LIMITS.items()}
+        _async_semaphores[loop] = semaphores
+    async with semaphores[service]:
+        return await asyncio.to_thread(func, *args)
+
 
 class ObjectStorageClient:
     """Wrapper that prefers live OCI access but supports local testing."""
@@ -35,6 +55,7 @@ class ObjectStorageClient:
         self._config = config
         self._client = self._build_oci_client()
         self._namespace = None  # Cache namespace for put operations
+        self._local = get_local_backend(config.local_asset_root)
 
     def _build_oci_client(self):  # pragma: no cover - requires OCI SDK & credentials
         if oci is None:
@@ -75,19 +96,16 @@ class ObjectStorageClient:
         return f"{prefix}{object_name}" if prefix else object_name
 
     def _load_local_file(self, object_name: str) -> Optional[Dict[str, Any]]:
-        root = Path(self._config.local_asset_root or ".")
-        candidate = root / object_name
-        if not candidate.exists():
-            candidate = root / self._resolve_object_name(object_name)
-        if not candidate.exists():
+        loaded = self._local.load(object_name, self._resolve_object_name(object_name))
+        if loaded is None:
             return None
-        payload = candidate.read_bytes()
+        path, payload = loaded
         return {
             "data": payload,
             "metadata": {
                 "content_type": "image/jpeg",
                 "size": len(payload),
-                "object_name": str(candidate),
+                "object_name": path,
                 "retrieved_at": datetime.utcnow().isoformat(),
                 "source": "local",
             },
@@ -167,18 +185,15 @@ class ObjectStorageClient:
                 print(f"Failed to upload to OCI, falling back to local: {e}")
                 # Fall through to local save
         
-        # Local fallback
-        root = Path(self._config.local_asset_root or ".")
-        output_path = root / resolved_name
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_bytes(data)
+        # Local fallback: atomic write, indexed for later reads
+        output_path = self._local.put(resolved_name, data)
         
         return {
             "object_name": resolved_name,
-            "local_path": str(output_path),
+            "local_path": output_path,
             "size": len(data),
             "uploaded_at": datetime.utcnow().isoformat(),
-            "storage_path": f"file://{output_path.absolute()}",
+            "storage_path": f"file://{output_path}",
             "source": "local"
         }
 
@@ -876,8 +891,8 @@ class FaceBlurringTool(BaseTool):
                 "faces_blurred": False
             })
     
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str) -> str:
+        return await _run_blocking("compute", self._run, encoded_payload)
 
 
 class ObjectRetrievalTool(BaseTool):
@@ -894,8 +909,8 @@ class ObjectRetrievalTool(BaseTool):
         payload = base64.b64encode(result["data"]).decode("utf-8")
         return json.dumps({"payload": payload, "metadata": result["metadata"]})
 
-    async def _arun(self, object_name: str) -> str:  # pragma: no cover - async not implemented
-        raise NotImplementedError
+    async def _arun(self, object_name: str) -> str:
+        return await _run_blocking("object_storage", self._run, object_name)
 
 
 class ExifExtractionTool(BaseTool):
@@ -907,8 +922,8 @@ class ExifExtractionTool(BaseTool):
         exif = extract_exif(image_bytes)
         return json.dumps(exif, default=str)
 
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover - async not implemented
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str) -> str:
+        return await _run_blocking("compute", self._run, encoded_payload)
 
 
 class ImageCaptionTool(BaseTool):
@@ -925,8 +940,8 @@ class ImageCaptionTool(BaseTool):
         caption = self.client.generate_caption(image_bytes)
         return caption
 
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str) -> str:
+        return await _run_blocking("genai", self._run, encoded_payload)
 
 
 class DamageDetectionTool(BaseTool):
@@ -944,8 +959,8 @@ class DamageDetectionTool(BaseTool):
         # detect_damage now returns indicators dict directly
         return json.dumps(result)
 
-    async def _arun(self, encoded_payload: str) -> str:  # pragma: no cover
-        raise NotImplementedError
+    async def _arun(self, encoded_payload: str) -> str:
+        return await _run_blocking("genai", self._run, encoded_payload)
 
 
 def toolset(config: WorkflowConfig) -> Dict[str, BaseTool]: